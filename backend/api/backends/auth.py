@@ -1,26 +1,62 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+from django.db.models import Case, Q, Value, When
 
 
 class UsernameOrEmailBackend(ModelBackend):
     """
     Custom authentication backend to allow login with either username or email.
     Gives precedence to username (especially for admins with no email).
+
+    - The user is looked up with a single query, matching either the username or the email.
+    - The password is hashed once per attempt, also when no user matches, so the timing doesn't tell it apart.
+    - `aauthenticate()`, used by the async login view, hashes in a worker thread: neither the event loop nor the
+      thread the sync views run in wait on it.
     """
-    def authenticate(self, request, username=None, password=None, **kwargs):
+    def get_login_queryset(self, identifier):
+        """
+        Returns the users matching the identifier, the username match first.
+        """
         from ..models import User
-        
+
+        username_first = Case(When(username=identifier, then=Value(0)), default=Value(1))
+        return User.objects.filter(Q(username=identifier) | Q(email=identifier)).order_by(username_first, 'id')
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
         if not username or not password:
             return None
-        
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(email=username)
-            except User.DoesNotExist:
-                return None
+
+        user = self.get_login_queryset(username).first()
+
+        if user is None:
+            make_password(password)
+            return None
 
         if user.check_password(password):
             return user
-        
-        return None
\ No newline at end of file
+
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if not username or not password:
+            return None
+
+        user = await self.get_login_queryset(username).afirst()
+
+        if user is None:
+            await sync_to_async(make_password, thread_sensitive=False)(password)
+            return None
+
+        is_correct, must_update = await sync_to_async(verify_password, thread_sensitive=False)(password, user.password)
+
+        if not is_correct:
+            return None
+
+        # Hash upgrades (e.g. more iterations) aren't password changes
+        if must_update:
+            await sync_to_async(user.set_password, thread_sensitive=False)(password)
+            user._password = None
+            await user.asave(update_fields=['password'])
+
+        return user
@@ -1,4 +1,16 @@
 from rest_framework.views import exception_handler
+from rest_framework.exceptions import APIException
+from rest_framework import status
+
+
+class ConflictError(APIException):
+    """
+    Raised when a write conflicts with the current state of a resource, e.g. a slot booked concurrently
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The request conflicts with the current state of the resource.'
+    default_code = 'conflict'
+
 
 def customExceptionHandler(exc, context):
     """
@@ -0,0 +1,174 @@
+import asyncio
+import copy
+from django.utils.functional import LazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the role and active status of its user, and the precise time they logged in (`auth_time`,
+    `iat` is truncated to the second), copied into every access token it issues.
+    Revocations are checked in the cache (Redis) instead of the blacklist table, which stays the reference.
+    """
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        token['auth_time'] = token.current_time.timestamp()
+        return token
+
+    def check_blacklist(self):
+        from ..utils import is_token_revoked
+
+        revoked = is_token_revoked(self.payload[api_settings.JTI_CLAIM])
+
+        if revoked is None:  # Cache unavailable
+            return super().check_blacklist()
+
+        if revoked:
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        from ..utils import revoke_token
+
+        blacklisted = super().blacklist()
+        revoke_token(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return blacklisted
+
+
+class LazyTokenUser(LazyObject):
+    """
+    User of a request authenticated by an access token with the `role` and `is_active` claims.
+
+    `pk`, `id`, `role`, `is_active` and `is_authenticated` are read from the token, so the role permissions cost no
+    query. Any other attribute (or an `isinstance()` check) loads the user, through the per-process user cache.
+    In async code, load it with `await user.aresolve()` first.
+    """
+    def __init__(self, validated_token, loader):
+        super().__init__()
+        pk = validated_token[api_settings.USER_ID_CLAIM]
+
+        # Set in the instance dict, so reading them doesn't go through the wrapped user
+        self.__dict__.update(
+            _loader=loader,
+            pk=pk,
+            id=pk,
+            role=validated_token['role'],
+            is_active=validated_token['is_active'],
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+
+    def _setup(self):
+        self._wrapped = self._loader()
+
+    def resolve(self):
+        """
+        Returns the loaded user model instance.
+        """
+        if self._wrapped is empty:
+            self._setup()
+        return self._wrapped
+
+    async def aresolve(self):
+        from asgiref.sync import sync_to_async
+
+        if self._wrapped is empty:
+            await sync_to_async(self._setup)()
+        return self._wrapped
+
+    def __bool__(self):
+        return True
+
+    def __copy__(self):
+        return copy.copy(self.resolve())
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.resolve(), memo)
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the `role` and `is_active` claims of the access token, and returns a
+    `LazyTokenUser` loaded only when a view needs the model: as its Admin, Client or Barber model, picked by the
+    role, in a single query (or none, from the user cache). Serializers then get the role model from
+    `request.user` without another JOIN. Tokens issued before the claims existed load the user right away.
+
+    The claims are only trusted until the user is deactivated or deleted, which revokes the tokens already issued
+    (see `revoke_user_tokens()`). Writes (unsafe methods) always load the user from the database, never the cache.
+    """
+    fresh_user = False
+
+    def authenticate(self, request):
+        self.fresh_user = request.method not in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        from ..utils import is_user_token_revoked
+
+        if any(claim not in validated_token for claim in (api_settings.USER_ID_CLAIM, 'role', 'is_active')):
+            return self.get_role_user(validated_token)
+
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        authenticated_at = validated_token.get('auth_time', validated_token.get('iat', 0))
+        revoked = is_user_token_revoked(validated_token[api_settings.USER_ID_CLAIM], authenticated_at)
+
+        if revoked:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        fresh = self.fresh_user or revoked is None
+        user = LazyTokenUser(validated_token, lambda: self.load_user(validated_token, fresh=fresh))
+
+        # Revocations unknown: check the user in the database now, unless in async code (it loads on first use then)
+        if revoked is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                user.resolve()
+
+        return user
+
+    def load_user(self, validated_token, fresh=False):
+        """
+        Returns the user of the token from the user cache, or loads and caches it. A `fresh` user is always loaded.
+        """
+        from ..utils import user_cache, remember_instance
+
+        pk, jti = validated_token[api_settings.USER_ID_CLAIM], validated_token.get(api_settings.JTI_CLAIM)
+        user = None if fresh else user_cache.get(pk, jti)
+
+        if user is None:
+            user = self.get_role_user(validated_token)
+            user_cache.set(pk, jti, user)
+
+        # Serializers looking the user up by its ID get the same instance
+        remember_instance(user)
+        return user
+
+    def get_role_user(self, validated_token):
+        """
+        Loads the user of the token as its role model, raises AuthenticationFailed if missing or inactive.
+        """
+        from ..models import User
+
+        # Authenticators are instantiated for each request
+        self.user_model = User.get_role_model(validated_token.get('role')) or User
+
+        try:
+            return super().get_user(validated_token)
+        except AuthenticationFailed:
+            if self.user_model is User:
+                raise
+
+        # Users without a row in their role's table (e.g. an admin created as a plain User) load as User,
+        # other failures (inactive user) are raised again by the same checks
+        self.user_model = User
+        return super().get_user(validated_token)
@@ -0,0 +1,210 @@
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient
+from api.backends.tokens import RoleRefreshToken
+from api.middleware import QueryTimer
+from api.models import Admin, Barber, Client, Roles
+
+
+# Endpoints that only read data despite being POSTs, benchmarked with these bodies
+READ_ONLY_POSTS = {
+    'get_barber_slots_public': lambda sample: {'date': str(timezone.localdate())},
+    'login_user': lambda sample: {'username': sample['client'].username, 'password': sample['password']},
+}
+
+# Role the requests of each URL prefix are authenticated as (None is anonymous)
+PREFIX_ROLES = {
+    'admin/': Roles.ADMIN,
+    'metrics/': Roles.ADMIN,
+    'barber/': Roles.BARBER,
+    'client/': Roles.CLIENT,
+    'image/': Roles.CLIENT,
+    'auth/me/': Roles.CLIENT,
+}
+
+
+def iter_api_urls(patterns=None, prefix=''):
+    """
+    Yields (route, URL pattern) for every named URL of the API, includes flattened.
+    """
+    if patterns is None:
+        from api.urls import urlpatterns as patterns
+
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_api_urls(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield prefix + str(pattern.pattern), pattern
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks every URL of `api/urls/*` through the test client against the current database (e.g. seeded with
+    `manage.py seed_load`), and reports the p50/p95 latency, query count and peak memory per endpoint as JSON.
+
+    - URLs are requested with GET, or with a known read-only body for the POSTs listed in READ_ONLY_POSTS;
+      URLs that can only modify data are listed as skipped.
+    - Requests are authenticated with real JWT access tokens, as the user of the role matching the URL prefix.
+    - The public response cache is disabled unless --with-cache is given, so runs measure the database path.
+    """
+    help = 'Benchmarks every API endpoint and reports p50/p95 latency, query count and peak memory as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='untimed requests per endpoint')
+        parser.add_argument('--filter', default='', help='only benchmark the URL names containing this string')
+        parser.add_argument('--prefix', default='load', help='prefix of the `seed_load` users to request as, falls back to any active user')
+        parser.add_argument('--password', default='LoadTest123', help='password of the client used for the login benchmark')
+        parser.add_argument('--with-cache', action='store_true', help='keep the public response cache enabled')
+        parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        sample = self.get_sample(options['prefix'], options['password'])
+        client = APIClient(SERVER_NAME=self.get_host())
+        report = {'endpoints': {}, 'skipped': {}}
+
+        cache_timeout = settings.PUBLIC_CACHE_TIMEOUT if options['with_cache'] else 0
+
+        with override_settings(PUBLIC_CACHE_TIMEOUT=cache_timeout):
+            for route, pattern in iter_api_urls():
+                name = pattern.name
+
+                if options['filter'] not in name:
+                    continue
+
+                request = self.build_request(route, pattern, sample)
+
+                if request is None:
+                    report['skipped'][name] = 'no read-only method, POST/PATCH/DELETE would modify the data'
+                    continue
+
+                report['endpoints'][name] = self.bench(client, request, options['warmup'], options['repeat'])
+                self.stderr.write(f"{name:40} p50 {report['endpoints'][name]['p50_ms']:8.2f} ms  {report['endpoints'][name]['queries']:4} queries")
+
+        report['settings'] = {'repeat': options['repeat'], 'warmup': options['warmup'], 'with_cache': options['with_cache'], 'database': connections['default'].vendor}
+        output = json.dumps(report, indent=2, default=str)
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def get_host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')]
+        return hosts[0] if hosts else 'localhost'
+
+    def get_sample(self, prefix, password):
+        """
+        Returns the users and object IDs the URL parameters are filled with.
+        """
+        def pick(model, username):
+            return model.objects.filter(username=username).first() or model.objects.filter(is_active=True).order_by('id').first()
+
+        admin, barber, client = pick(Admin, f'{prefix}_admin'), pick(Barber, f'{prefix}_barber_0'), pick(Client, f'{prefix}_client_0')
+
+        if not (admin and barber and client):
+            raise CommandError('An active admin, barber and client are needed, seed the database first with `manage.py seed_load`.')
+
+        uidb64 = urlsafe_base64_encode(force_bytes(client.pk))
+        appointment = client.appointments_created.order_by('-date').first()
+        review = client.client_reviews.first()
+        service = barber.services_offered.first()
+        availability = barber.availabilities_assigned.order_by('-date').first()
+
+        return {
+            Roles.ADMIN: admin,
+            Roles.BARBER: barber,
+            Roles.CLIENT: client,
+            'client': client,
+            'password': password,
+            'kwargs': {
+                'barber_id': barber.pk,
+                'client_id': client.pk,
+                'appointment_id': appointment.pk if appointment else 0,
+                'review_id': review.pk if review else 0,
+                'service_id': service.pk if service else 0,
+                'availability_id': availability.pk if availability else 0,
+                'uidb64': uidb64,
+                'token': default_token_generator.make_token(client),
+            },
+        }
+
+    def build_request(self, route, pattern, sample):
+        """
+        Returns the (method, path, body, user) to benchmark a URL with, or None if it has no read-only method.
+        """
+        view = getattr(pattern.callback, 'cls', None)
+        path = reverse(pattern.name, kwargs={key: sample['kwargs'][key] for key in pattern.pattern.converters})
+        user = next((sample[role] for url_prefix, role in PREFIX_ROLES.items() if route.startswith(url_prefix)), None)
+
+        if view is None or hasattr(view, 'get'):
+            return 'get', path, None, user
+
+        if pattern.name in READ_ONLY_POSTS:
+            return 'post', path, READ_ONLY_POSTS[pattern.name](sample), user
+
+        return None
+
+    def bench(self, client, request, warmup, repeat):
+        """
+        Requests an endpoint `warmup + repeat` times, then once more under tracemalloc for its peak memory.
+        """
+        method, path, body, user = request
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RoleRefreshToken.for_user(user).access_token}'} if user else {}
+
+        def send():
+            if method == 'post':
+                return client.post(path, body, format='json', **headers)
+            return client.get(path, **headers)
+
+        for _ in range(warmup):
+            send()
+
+        durations, queries = [], []
+        for _ in range(repeat):
+            timer = QueryTimer()
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timer))
+                started = time.perf_counter()
+                response = send()
+                durations.append(time.perf_counter() - started)
+            queries.append(timer.count)
+
+        tracemalloc.start()
+        send()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': response.status_code,
+            'p50_ms': round(percentile(durations, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(durations, 0.95) * 1000, 2),
+            'mean_ms': round(statistics.mean(durations) * 1000, 2),
+            'queries': max(queries),
+            'response_bytes': len(response.content),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api.models import Barber
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the denormalized rating aggregates (count, sum, histogram) of every barber from the reviews table.
+    """
+    help = 'Rebuilds the review count, rating sum and rating histogram of every barber from their reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barber', type=int, action='append', dest='barber_ids', help='only rebuild the given barber ID (repeatable)')
+
+    def handle(self, *args, barber_ids=None, **options):
+        barbers = Barber.objects.all()
+
+        if barber_ids:
+            barbers = barbers.filter(pk__in=barber_ids)
+
+        updated = barbers.rebuild_rating_aggregates()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the rating aggregates of {updated} barber(s).'))
@@ -0,0 +1,222 @@
+import datetime
+import math
+import random
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from api.models import (
+    User,
+    Barber,
+    Client,
+    Roles,
+    Service,
+    Availability,
+    Appointment,
+    AppointmentService,
+    AppointmentStatus,
+    Review,
+    RevenueEntry,
+)
+from api.utils import invalidate_public_cache, BARBERS_CACHE_SCOPE
+
+
+# Bookable hours of the seeded availabilities and appointments
+SEED_SLOTS = [datetime.time(hour, 0) for hour in range(9, 18)]
+
+SEED_SERVICES = [('Haircut', 18), ('Beard trim', 10), ('Shave', 12), ('Hair wash', 6), ('Coloring', 35), ('Kids cut', 12)]
+
+
+class Command(BaseCommand):
+    """
+    Generates synthetic barbers, clients, services, availabilities, appointments (with line items) and reviews in bulk,
+    to see how the API behaves at production-like volumes. Seed a throwaway database, the data is never cleaned up.
+    """
+    help = 'Seeds the database with synthetic load-testing data (e.g. 200 barbers, 50k clients, 1M appointments, 100k reviews).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barbers', type=int, default=200)
+        parser.add_argument('--clients', type=int, default=50_000)
+        parser.add_argument('--appointments', type=int, default=1_000_000)
+        parser.add_argument('--reviews', type=int, default=100_000)
+        parser.add_argument('--services', type=int, default=4, help='services offered by each barber (max %d)' % len(SEED_SERVICES))
+        parser.add_argument('--future-ratio', type=float, default=0.05, help='share of the appointment days after today (ONGOING)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='load', help='prefix of the seeded usernames, must not be in use yet')
+        parser.add_argument('--password', default='LoadTest123', help='password of every seeded user')
+        parser.add_argument('--seed', type=int, default=0, help='random seed, for reproducible datasets')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        prefix = options['prefix']
+
+        if options['barbers'] < 1 or options['clients'] < 1:
+            raise CommandError('At least one barber and one client are required.')
+
+        if not 1 <= options['services'] <= len(SEED_SERVICES):
+            raise CommandError(f'--services must be between 1 and {len(SEED_SERVICES)}.')
+
+        if options['reviews'] > options['barbers'] * options['clients']:
+            raise CommandError('There can be at most one review per client and barber.')
+
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Users prefixed with "{prefix}_" already exist, choose another --prefix.')
+
+        password = make_password(options['password'])  # Hashed once, shared by every seeded user
+
+        User.objects.create_superuser(username=f'{prefix}_admin', password=options['password'])
+        barber_ids = self.create_users(Barber, Roles.BARBER, options['barbers'], password)
+        client_ids = self.create_users(Client, Roles.CLIENT, options['clients'], password)
+        services = self.create_services(barber_ids)
+        days = self.get_days(len(barber_ids), len(client_ids))
+        self.create_availabilities(barber_ids, [day for day in days if day >= timezone.localdate()])
+        self.create_appointments(barber_ids, client_ids, services, days)
+        self.create_reviews(barber_ids, client_ids)
+
+        # Bulk inserts send no signals
+        invalidate_public_cache(BARBERS_CACHE_SCOPE)
+
+        self.stdout.write(self.style.SUCCESS(f'Seeded "{prefix}" dataset, log in as "{prefix}_admin" / any "{prefix}_barber_N" or "{prefix}_client_N" user.'))
+
+    def log(self, message):
+        self.stdout.write(f'[{timezone.now():%H:%M:%S}] {message}')
+
+    def batches(self, items):
+        for index in range(0, len(items), self.batch_size):
+            yield items[index:index + self.batch_size]
+
+    def create_users(self, model, role, count, password):
+        """
+        Creates `count` users of the given role. bulk_create refuses multi-table inherited models, so the parent
+        rows are bulk created first, then the child rows are inserted with the parent IDs.
+        """
+        prefix = f"{self.options['prefix']}_{role.value.lower()}"
+        now = timezone.now()
+        ids = []
+
+        for batch in self.batches(range(count)):
+            with transaction.atomic():
+                parents = User.objects.bulk_create([
+                    User(username=f'{prefix}_{index}', email=f'{prefix}_{index}@load.test', password=password, role=role.value, is_active=True, date_joined=now)
+                    for index in batch
+                ])
+                children = [model(user_ptr_id=parent.pk, name=f'{role.value.title()}{index}', surname='Load') for index, parent in zip(batch, parents)]
+                model._base_manager._insert(children, fields=model._meta.local_concrete_fields)
+
+            ids += [parent.pk for parent in parents]
+
+        self.log(f'{count} {role.value.lower()}s created.')
+        return ids
+
+    def create_services(self, barber_ids):
+        """
+        Creates the services of every barber, returns them as {barber ID: [services]}.
+        """
+        services = Service.objects.bulk_create(
+            [Service(barber_id=barber_id, name=name, price=Decimal(price)) for barber_id in barber_ids for name, price in SEED_SERVICES[:self.options['services']]],
+            batch_size=self.batch_size,
+        )
+
+        by_barber = {}
+        for service in services:
+            by_barber.setdefault(service.barber_id, []).append(service)
+
+        self.log(f'{len(services)} services created.')
+        return by_barber
+
+    def get_days(self, barbers, clients):
+        """
+        Returns the days spanned by the appointments: each day has one appointment per barber and slot,
+        but never two for the same client, with `--future-ratio` of the days after today.
+        """
+        per_day = min(barbers * len(SEED_SLOTS), clients)
+        count = max(math.ceil(self.options['appointments'] / per_day), 1)
+        first = timezone.localdate() - datetime.timedelta(days=count - int(count * self.options['future_ratio']))
+
+        return [first + datetime.timedelta(days=offset) for offset in range(count)]
+
+    def create_availabilities(self, barber_ids, days):
+        """
+        Opens every seeded slot of the given days for every barber.
+        """
+        template = Availability(slots=[slot.strftime('%H:%M') for slot in SEED_SLOTS])
+        availabilities = [Availability(barber_id=barber_id, date=day, slot_mask=template.slot_mask) for day in days for barber_id in barber_ids]
+        Availability.objects.bulk_create(availabilities, batch_size=self.batch_size)
+        self.log(f'{len(availabilities)} availabilities created.')
+
+    def iter_appointments(self, barber_ids, client_ids, days):
+        """
+        Yields the unsaved appointments, day by day, filling every barber's slots with distinct clients.
+        """
+        today = timezone.localdate()
+        per_day = min(len(barber_ids) * len(SEED_SLOTS), len(client_ids))
+        cells = [(barber_id, slot) for slot in SEED_SLOTS for barber_id in barber_ids][:per_day]
+        remaining = self.options['appointments']
+
+        for day_index, day in enumerate(days):
+            for cell_index, (barber_id, slot) in enumerate(cells[:remaining]):
+                if day >= today:
+                    status = AppointmentStatus.ONGOING.value
+                else:
+                    status = AppointmentStatus.CANCELLED.value if self.random.random() < 0.1 else AppointmentStatus.COMPLETED.value
+
+                client_id = client_ids[(day_index * per_day + cell_index) % len(client_ids)]
+                yield Appointment(client_id=client_id, barber_id=barber_id, date=day, slot=slot, status=status, reminder_email_sent=day < today)
+
+            remaining -= min(len(cells), remaining)
+
+    def create_appointments(self, barber_ids, client_ids, services, days):
+        """
+        Creates the appointments with 1 to 3 line items each, and writes the completed ones to the revenue ledger.
+        """
+        created = 0
+        batch = []
+
+        def flush():
+            with transaction.atomic():
+                appointments = Appointment.objects.bulk_create(batch)
+                AppointmentService.objects.bulk_create([
+                    AppointmentService(appointment_id=appointment.pk, name=service.name, price=service.price, original_service=service)
+                    for appointment in appointments
+                    for service in self.random.sample(services[appointment.barber_id], self.random.randint(1, min(3, len(services[appointment.barber_id]))))
+                ], batch_size=self.batch_size)
+                RevenueEntry.record_completed([appointment.pk for appointment in appointments if appointment.status == AppointmentStatus.COMPLETED.value])
+
+        for appointment in self.iter_appointments(barber_ids, client_ids, days):
+            batch.append(appointment)
+
+            if len(batch) == self.batch_size:
+                flush()
+                created += len(batch)
+                batch = []
+                self.log(f'{created} appointments created.')
+
+        if batch:
+            flush()
+            created += len(batch)
+            self.log(f'{created} appointments created.')
+
+    def create_reviews(self, barber_ids, client_ids):
+        """
+        Creates one review per (client, barber) pair up to `--reviews`, then rebuilds the barbers' rating aggregates.
+        """
+        count = self.options['reviews']
+        reviews = (
+            Review(client_id=client_ids[index // len(barber_ids) % len(client_ids)], barber_id=barber_ids[index % len(barber_ids)], rating=self.random.choice([3, 4, 4, 5, 5, 5]), comment='Seeded review')
+            for index in range(count)
+        )
+
+        batch = []
+        for review in reviews:
+            batch.append(review)
+            if len(batch) == self.batch_size:
+                Review.objects.bulk_create(batch)
+                batch = []
+        Review.objects.bulk_create(batch)
+
+        # Bulk inserts bypass Review.save(), which maintains the aggregates
+        Barber.objects.filter(pk__in=barber_ids).rebuild_rating_aggregates()
+        self.log(f'{count} reviews created.')
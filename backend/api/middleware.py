@@ -0,0 +1,146 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .utils.identity import identity_map_scope
+from .utils.metrics import request_metrics, format_server_timing, UNMATCHED_ENDPOINT
+
+
+class QueryTimer:
+    """
+    Database execute wrapper that counts the queries run through a connection and sums their duration.
+    """
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+# Query timer of the request being measured, None outside of one. Context variables follow the request into the
+# thread `sync_to_async` runs its ORM calls in, which the concurrent requests of an ASGI worker share
+_request_timer = ContextVar('request_query_timer', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper, installed once on every connection (see `install_query_timer`), that adds the query to
+    the timer of the request running it, if any.
+    """
+    timer = _request_timer.get()
+
+    if timer is None:
+        return execute(sql, params, many, context)
+
+    return timer(execute, sql, params, many, context)
+
+
+@contextmanager
+def track_queries(timer):
+    """
+    Context manager that counts the queries run by its block, and by the `sync_to_async` calls it awaits, in `timer`.
+    """
+    token = _request_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _request_timer.reset(token)
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware that measures every request: database query count and time, Python time and response size.
+
+    - Adds a `Server-Timing` header, so the breakdown shows up in the browser dev tools.
+    - Records the measures per URL name in the in-process registry exposed by the `/api/metrics/` endpoint.
+    - Disabled by setting REQUEST_METRICS to False.
+    - Runs natively under ASGI: the queries are attributed to the request through a context variable, so the
+      concurrent requests whose ORM calls run in the same `sync_to_async` thread (and connection) count their own.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS', True)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+
+        with track_queries(timer):
+            response = self.get_response(request)
+
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+
+        with track_queries(timer):
+            response = await self.get_response(request)
+
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    def record(self, request, response, timer, duration):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.url_name if match and match.url_name else UNMATCHED_ENDPOINT
+        size = len(response.content) if not response.streaming else 0
+
+        response['Server-Timing'] = format_server_timing(duration, timer.duration, timer.count)
+        request_metrics.record(endpoint, request.method, response.status_code, duration, timer.duration, timer.count, size)
+
+        return response
+
+
+class IdentityMapMiddleware:
+    """
+    Middleware that gives every request its own identity map (see `IdentityMap`), dropped once the response is
+    returned, and records the fetches it saved for the `/api/metrics/` endpoint.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with identity_map_scope() as identity_map:
+            response = self.get_response(request)
+
+        request_metrics.record_identity_map(identity_map)
+        return response
+
+    async def __acall__(self, request):
+        with identity_map_scope() as identity_map:
+            response = await self.get_response(request)
+
+        request_metrics.record_identity_map(identity_map)
+        return response
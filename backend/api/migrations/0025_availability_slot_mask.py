@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:10
+
+from django.db import migrations, models
+
+
+def slots_to_slot_mask(apps, schema_editor):
+    """
+    Encodes the JSON "HH:MM" slot lists as minutes-of-the-day bitmasks.
+    """
+    Availability = apps.get_model('api', 'Availability')
+
+    for availability in Availability.objects.all().iterator():
+        mask = 0
+        for slot in availability.slots or []:
+            hour, minute = map(int, slot.split(':'))
+            mask |= 1 << (hour * 60 + minute)
+
+        availability.slot_mask = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        availability.save(update_fields=['slot_mask'])
+
+
+def slot_mask_to_slots(apps, schema_editor):
+    """
+    Decodes the minutes-of-the-day bitmasks back to JSON "HH:MM" slot lists.
+    """
+    Availability = apps.get_model('api', 'Availability')
+
+    for availability in Availability.objects.all().iterator():
+        mask = int.from_bytes(bytes(availability.slot_mask or b''), 'little')
+        availability.slots = [f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(mask.bit_length()) if mask >> minute & 1]
+        availability.save(update_fields=['slots'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_platformstatistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availability',
+            name='slot_mask',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AlterField(
+            model_name='availability',
+            name='slots',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(slots_to_slot_mask, slot_mask_to_slots),
+        migrations.RemoveField(
+            model_name='availability',
+            name='slots',
+        ),
+    ]
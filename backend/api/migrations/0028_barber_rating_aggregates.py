@@ -0,0 +1,67 @@
+# Generated by Django 5.2.1 on 2026-10-18 05:49
+
+from django.db import migrations, models
+from django.db.models import Count, Sum, Q
+
+
+def compute_rating_aggregates(apps, schema_editor):
+    """
+    Fills the rating aggregates of every barber from the existing reviews.
+    """
+    Barber = apps.get_model('api', 'Barber')
+    Review = apps.get_model('api', 'Review')
+
+    aggregates = Review.objects.filter(barber__isnull=False).values('barber_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{rating}_count': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)},
+    )
+
+    for aggregate in aggregates:
+        Barber.objects.filter(pk=aggregate.pop('barber_id')).update(**aggregate)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barber',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(compute_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.1 on 2026-10-18 05:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_revenue_ledger(apps, schema_editor):
+    """
+    Writes a ledger entry for every completed appointment from its line items, and fills the running totals.
+    """
+    Appointment = apps.get_model('api', 'Appointment')
+    RevenueEntry = apps.get_model('api', 'RevenueEntry')
+    DailyRevenue = apps.get_model('api', 'DailyRevenue')
+    Barber = apps.get_model('api', 'Barber')
+    Client = apps.get_model('api', 'Client')
+
+    appointments = Appointment.objects.filter(status='COMPLETED').annotate(amount=Sum('line_items__price'))
+    RevenueEntry.objects.bulk_create(
+        [
+            RevenueEntry(appointment_id=appointment.id, barber_id=appointment.barber_id, client_id=appointment.client_id, date=appointment.date, amount=appointment.amount or 0)
+            for appointment in appointments.iterator()
+        ],
+        batch_size=1000,
+    )
+
+    for row in RevenueEntry.objects.values('date').annotate(total=Sum('amount'), appointments_count=Count('id')):
+        DailyRevenue.objects.create(**row)
+
+    for row in RevenueEntry.objects.filter(barber__isnull=False).values('barber_id').annotate(total=Sum('amount')):
+        Barber.objects.filter(pk=row['barber_id']).update(revenue_total=row['total'])
+
+    for row in RevenueEntry.objects.filter(client__isnull=False).values('client_id').annotate(total=Sum('amount')):
+        Client.objects.filter(pk=row['client_id']).update(spent_total=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_barber_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('appointments_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='barber',
+            name='revenue_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='spent_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.CreateModel(
+            name='RevenueEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('appointment', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_entry', to='api.appointment')),
+                ('barber', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_entries', to='api.barber')),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='spending_entries', to='api.client')),
+            ],
+        ),
+        migrations.RunPython(backfill_revenue_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_revenue_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRevocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True)),
+                ('revoked_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -1,2 +1,5 @@
 from .user import *
-from .appointment import *
\ No newline at end of file
+from .appointment import *
+from .ledger import *
+from .statistics import *
+from .outbox import *
\ No newline at end of file
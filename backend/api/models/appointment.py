@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, connections
 from django.db.models import Q, Sum
 from enum import Enum
 from .user import Barber, Client
@@ -16,6 +16,46 @@ class AppointmentStatus(Enum):
         return [(status.value, status.name) for status in cls]
 
 
+class AppointmentQuerySet(models.QuerySet):
+    """
+    Custom queryset for appointments, used to load the data needed by `Appointment.to_dict()` in bulk.
+    """
+    def with_line_items(self):
+        """
+        Annotates the total price of the line items and prefetches them, so serializing each appointment costs no extra queries.
+        """
+        return self.annotate(line_items_total=Sum('line_items__price')).prefetch_related('line_items')
+
+    def _claim(self, field, unclaimed, claimed):
+        """
+        Flips `field` from `unclaimed` to `claimed` on the rows of this queryset with a single UPDATE ... RETURNING,
+        and returns the claimed rows as dicts (id, barber_id, client_id), so concurrent runs never claim the same appointment twice.
+        """
+        connection = connections[self.db]
+        unclaimed_sql, params = self.filter(**{field: unclaimed}).values('id').query.sql_with_params()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        column = connection.ops.quote_name(self.model._meta.get_field(field).column)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET {column} = %s WHERE {column} = %s AND id IN ({unclaimed_sql}) RETURNING id, barber_id, client_id',
+                [claimed, unclaimed, *params],
+            )
+            return [{'id': id, 'barber_id': barber_id, 'client_id': client_id} for id, barber_id, client_id in cursor.fetchall()]
+
+    def claim_reminders(self):
+        """
+        Flips `reminder_email_sent` on the unsent appointments of this queryset, returning the claimed rows.
+        """
+        return self._claim('reminder_email_sent', False, True)
+
+    def claim_completions(self):
+        """
+        Flips the ONGOING appointments of this queryset to COMPLETED, returning the claimed rows.
+        """
+        return self._claim('status', AppointmentStatus.ONGOING.value, AppointmentStatus.COMPLETED.value)
+
+
 class Service(models.Model):
     """
     Represents a specific service that a barber offers to clients.
@@ -39,7 +79,7 @@ class Service(models.Model):
         """
         return {
             'id': self.id,
-            'barber_id': self.barber.id,
+            'barber_id': self.barber_id,
             'name': self.name,
             'price': float(self.price),
         }
@@ -63,11 +103,16 @@ class Appointment(models.Model):
     status = models.CharField( max_length=10, choices=AppointmentStatus.choices(), default=AppointmentStatus.ONGOING.value)
     reminder_email_sent = models.BooleanField(default=False)
 
+    objects = AppointmentQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['client', 'date'], condition=~Q(status=AppointmentStatus.CANCELLED.value), name='unique_appointment_per_client_date_if_not_cancelled'),
             models.UniqueConstraint(fields=['barber', 'date', 'slot'], condition=~Q(status=AppointmentStatus.CANCELLED.value), name='unique_appointment_per_barber_date_slot_if_not_cancelled'),
         ]
+        indexes = [
+            models.Index(fields=['date', 'slot', 'id'], name='appointment_date_slot_id_idx'),  # Keyset pagination ordering
+        ]
 
     @property
     def service_ids(self):
@@ -87,8 +132,13 @@ class Appointment(models.Model):
     def amount_spent(self):
         """
         Returns the total price of all services in this appointment.
+        Uses the `line_items_total` annotation when loaded through `with_line_items()`.
         """
-        total = self.line_items.aggregate(total=Sum('price'))['total']
+        if hasattr(self, 'line_items_total'):
+            total = self.line_items_total
+        else:
+            total = self.line_items.aggregate(total=Sum('price'))['total']
+
         return float(total) if total else 0.0
     
     def to_dict(self):
@@ -97,8 +147,8 @@ class Appointment(models.Model):
         """
         return {
             'id': self.id,
-            'client_id': self.client.id if self.client else None,
-            'barber_id': self.barber.id if self.barber else None,
+            'client_id': self.client_id,
+            'barber_id': self.barber_id,
             'amount_spent': self.amount_spent,
             'services': self.services_list,
             'date': self.date,
@@ -135,17 +185,54 @@ class Availability(models.Model):
     Stores a barber's available time slots for client bookings on a particular date.
 
     - Each availability record is linked to one barber and one date.
-    - The 'slots' field contains a list of available 1-hour time slots in "HH:MM" format.
+    - The 'slots' property exposes the available 1-hour time slots as a list of "HH:MM" strings.
+    - Slots are stored compactly in 'slot_mask', a bitmask over the minutes of the day (bit N set = slot starting at minute N).
     - Used by admins to manage and update barbers' availability for appointments.
     """
     barber = models.ForeignKey(Barber, on_delete=models.CASCADE, related_name='availabilities_assigned',)
     date = models.DateField()
-    slots = models.JSONField()  # Example: ["09:00", "10:00", "11:00"]
+    slot_mask = models.BinaryField(default=b'')  # Example: bits 540, 600, 660 set for ["09:00", "10:00", "11:00"]
     
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['barber', 'date'], name='unique_availability_date_per_barber')
         ]
+        indexes = [
+            models.Index(fields=['date', 'barber'], name='availability_date_barber_idx'),  # Shop-wide date range scans
+        ]
+
+    @property
+    def mask(self):
+        """
+        Returns the slots as an integer bitmask over the minutes of the day.
+        """
+        from ..utils import bytes_to_mask
+        return bytes_to_mask(self.slot_mask)
+
+    @mask.setter
+    def mask(self, value):
+        from ..utils import mask_to_bytes
+        self.slot_mask = mask_to_bytes(value)
+
+    @property
+    def slots(self):
+        """
+        Returns the ordered list of available slots in "HH:MM" format.
+        """
+        from ..utils import mask_to_slots
+        return mask_to_slots(self.mask)
+
+    @slots.setter
+    def slots(self, value):
+        from ..utils import slots_to_mask
+        self.mask = slots_to_mask(value)
+
+    def has_slot(self, slot_time):
+        """
+        Returns True if the given datetime.time is one of the available slots.
+        """
+        from ..utils import time_to_minute
+        return bool(self.mask >> time_to_minute(slot_time) & 1)
 
     def to_dict(self):
         """
@@ -153,7 +240,7 @@ class Availability(models.Model):
         """
         return {
             'id': self.id,
-            'barber_id': self.barber.id,
+            'barber_id': self.barber_id,
             'date': self.date,
             'slots': self.slots,
         }
@@ -180,6 +267,50 @@ class Review(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['client', 'barber'], name='unique_client_review_per_barber')
         ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='review_created_at_id_idx'),  # Keyset pagination ordering
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_rating = instance.__dict__.get('rating')  # Rating currently counted in the barber's aggregates
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the review and updates the rating aggregates of its barber in the same transaction.
+        """
+        from django.db import transaction
+
+        adding = self._state.adding
+        stored_rating = getattr(self, '_stored_rating', None)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if self.barber_id and adding:
+                Barber.update_rating_aggregates(self.barber_id, added=self.rating)
+            elif self.barber_id and stored_rating is not None and stored_rating != self.rating:
+                Barber.update_rating_aggregates(self.barber_id, added=self.rating, removed=stored_rating)
+
+        self._stored_rating = self.rating
+
+    def delete(self, *args, **kwargs):
+        """
+        Deletes the review and removes its rating from the aggregates of its barber in the same transaction.
+        """
+        from django.db import transaction
+
+        stored_rating = getattr(self, '_stored_rating', self.rating)
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+
+            if self.barber_id and stored_rating is not None:
+                Barber.update_rating_aggregates(self.barber_id, removed=stored_rating)
+
+        return result
 
     def to_dict(self):
         """
@@ -187,8 +318,8 @@ class Review(models.Model):
         """
         return {
             'id': self.id,
-            'client_id': self.client.id if self.client else None,
-            'barber_id': self.barber.id if self.barber else None,
+            'client_id': self.client_id,
+            'barber_id': self.barber_id,
             'rating': self.rating,
             'comment': self.comment,
             'created_at': self.created_at.strftime('%Y-%m-%d'),
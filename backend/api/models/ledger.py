@@ -0,0 +1,124 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import models
+from django.db.models import F, Sum, Case, When, Value
+from .user import Barber, Client
+from .appointment import Appointment
+
+
+class RevenueEntry(models.Model):
+    """
+    Records the revenue earned by a single completed appointment, in the revenue ledger.
+
+    - Written in bulk by the `complete_ongoing_appointments` task, in the same transaction that completes the appointments.
+    - The amount is the sum of the appointment's line items, so later changes to the barber's services never rewrite history.
+    - Feeds the per-barber, per-client and per-day running totals, so revenue reads are single-row lookups.
+    """
+    appointment = models.OneToOneField(Appointment, null=True, blank=True, on_delete=models.SET_NULL, related_name='revenue_entry')
+    barber = models.ForeignKey(Barber, null=True, blank=True, on_delete=models.SET_NULL, related_name='revenue_entries')
+    client = models.ForeignKey(Client, null=True, blank=True, on_delete=models.SET_NULL, related_name='spending_entries')
+
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=8, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def record_completed(cls, appointment_ids):
+        """
+        Writes the ledger entries of the given just-completed appointments and adds them to the running totals.
+        Must run in the transaction that completed them. Returns the created entries.
+        """
+        from ..utils import user_cache
+
+        appointments = (
+            Appointment.objects.filter(id__in=appointment_ids)
+            .annotate(amount=Sum('line_items__price'))
+            .values('id', 'barber_id', 'client_id', 'date', 'amount')
+        )
+
+        entries = [
+            cls(appointment_id=appointment['id'], barber_id=appointment['barber_id'], client_id=appointment['client_id'], date=appointment['date'], amount=appointment['amount'] or 0)
+            for appointment in appointments
+        ]
+
+        if not entries:
+            return []
+
+        cls.objects.bulk_create(entries, batch_size=1000)
+
+        barbers, clients, days, counts = defaultdict(Decimal), defaultdict(Decimal), defaultdict(Decimal), defaultdict(int)
+        for entry in entries:
+            days[entry.date] += entry.amount
+            counts[entry.date] += 1
+            if entry.barber_id:
+                barbers[entry.barber_id] += entry.amount
+            if entry.client_id:
+                clients[entry.client_id] += entry.amount
+
+        _add_to_totals(Barber, 'pk', {'revenue_total': barbers})
+        _add_to_totals(Client, 'pk', {'spent_total': clients})
+        user_cache.invalidate(*barbers, *clients)
+
+        DailyRevenue.objects.bulk_create([DailyRevenue(date=date) for date in days], ignore_conflicts=True)
+        _add_to_totals(DailyRevenue, 'date', {'total': days, 'appointments_count': counts})
+
+        return entries
+
+    def to_dict(self):
+        """
+        Returns a JSON-serializable dict representation of the ledger entry.
+        """
+        return {
+            'id': self.id,
+            'appointment_id': self.appointment_id,
+            'barber_id': self.barber_id,
+            'client_id': self.client_id,
+            'date': self.date,
+            'amount': float(self.amount),
+        }
+
+
+class DailyRevenue(models.Model):
+    """
+    Stores the running revenue total of a single day, maintained by `RevenueEntry.record_completed()`.
+    """
+    date = models.DateField(unique=True)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    appointments_count = models.PositiveIntegerField(default=0)
+
+    def to_dict(self):
+        """
+        Returns a JSON-serializable dict representation of the day's revenue.
+        """
+        return {
+            'date': self.date,
+            'total': float(self.total),
+            'appointments_count': self.appointments_count,
+        }
+
+
+def _add_to_totals(model, key, deltas):
+    """
+    Increments the running total fields of many rows with a single UPDATE, given {field: {key value: delta}}.
+    Rows keyed by PK are dropped from the identity map, which would keep handing out their old totals.
+    """
+    from ..utils import forget_instances
+
+    keys = set().union(*deltas.values())
+
+    if not keys:
+        return 0
+
+    if key == 'pk':
+        forget_instances(model, *keys)
+
+    output_fields = {field: model._meta.get_field(field) for field in deltas}
+
+    return model.objects.filter(**{f'{key}__in': keys}).update(**{
+        field: F(field) + Case(
+            *[When(**{key: value}, then=Value(delta)) for value, delta in values.items()],
+            default=Value(0),
+            output_field=output_fields[field],
+        )
+        for field, values in deltas.items()
+    })
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from enum import Enum
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class EmailStatus(Enum):
+    """
+    Enumeration of possible delivery statuses for an outgoing email.
+    """
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+    @classmethod
+    def choices(cls):
+        return [(status.value, status.name) for status in cls]
+
+
+class EmailOutbox(models.Model):
+    """
+    Stores an outgoing transactional email until the `drain_email_outbox` task delivers it.
+
+    - Written in the same transaction as the business change (registration, invite, password reset), so no SMTP in the request path.
+    - Failed deliveries are retried with exponential backoff, and marked FAILED after MAX_ATTEMPTS.
+    """
+    MAX_ATTEMPTS = 5
+    RETRY_BACKOFF = 60  # Seconds before the first retry, doubled after each failed attempt
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.EmailField()
+    recipients = models.JSONField(default=list)  # Example: ["client@email.com"]
+    status = models.CharField(max_length=10, choices=EmailStatus.choices(), default=EmailStatus.PENDING.value)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='emailoutbox_due_idx'),  # Drain scans
+        ]
+
+    @classmethod
+    def due(cls):
+        """
+        Returns the pending emails whose next delivery attempt is due, oldest first.
+        """
+        return cls.objects.filter(status=EmailStatus.PENDING.value, next_attempt_at__lte=timezone.now()).order_by('next_attempt_at', 'id')
+
+    def to_message(self):
+        """
+        Returns the Django EmailMessage to deliver.
+        """
+        from django.core.mail import EmailMessage
+        return EmailMessage(self.subject, self.body, self.from_email, self.recipients)
+
+    @classmethod
+    def claim_due(cls, limit):
+        """
+        Claims up to `limit` due emails for delivery, in a short transaction of its own (SKIP LOCKED, concurrent drains
+        claim different rows). The attempt is counted and its retry scheduled up front, so no lock is held while
+        sending, and an email whose drain crashes is retried after the backoff like a failed one.
+        """
+        with transaction.atomic():
+            emails = list(cls.due().select_for_update(skip_locked=True)[:limit])
+            now = timezone.now()
+
+            for email in emails:
+                email.attempts += 1
+                email.next_attempt_at = now + timedelta(seconds=cls.RETRY_BACKOFF * 2 ** (email.attempts - 1))
+
+            cls.objects.bulk_update(emails, ['attempts', 'next_attempt_at'])
+
+        return emails
+
+    def mark_sent(self):
+        """
+        Records a successful delivery of a claimed email.
+        """
+        self.status = EmailStatus.SENT.value
+        self.sent_at = timezone.now()
+        self.last_error = ''
+        self.save(update_fields=['status', 'sent_at', 'last_error'])
+
+    def mark_failed(self, error):
+        """
+        Records a failed delivery of a claimed email, retried at the time scheduled by `claim_due()`, or given up after
+        MAX_ATTEMPTS.
+        """
+        self.last_error = str(error)
+
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = EmailStatus.FAILED.value
+
+        self.save(update_fields=['status', 'last_error'])
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q, Avg, Sum, Count
+from .user import User, Roles
+from .appointment import Appointment, AppointmentStatus, Review
+from .ledger import DailyRevenue
+
+
+class PlatformStatistics(models.Model):
+    """
+    Stores a snapshot of the platform-wide statistics shown on the admin dashboard.
+
+    - Only a single row (pk=1) is kept, refreshed periodically by the `refresh_platform_statistics` task.
+    - Read instead of the live aggregates only when `PLATFORM_STATISTICS_SNAPSHOT` is enabled in the settings.
+    """
+    SNAPSHOT_PK = 1
+
+    total_clients = models.PositiveIntegerField(default=0)
+    total_barbers = models.PositiveIntegerField(default=0)
+    total_appointments = models.PositiveIntegerField(default=0)
+    completed_appointments = models.PositiveIntegerField(default=0)
+    cancelled_appointments = models.PositiveIntegerField(default=0)
+    ongoing_appointments = models.PositiveIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_reviews = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def compute(cls):
+        """
+        Computes the live statistics with one conditional aggregate per table.
+        """
+        users = User.objects.filter(is_active=True).aggregate(
+            total_clients=Count('id', filter=Q(role=Roles.CLIENT.value)),
+            total_barbers=Count('id', filter=Q(role=Roles.BARBER.value)),
+        )
+
+        appointments = Appointment.objects.aggregate(
+            total_appointments=Count('id'),
+            completed_appointments=Count('id', filter=Q(status=AppointmentStatus.COMPLETED.value)),
+            cancelled_appointments=Count('id', filter=Q(status=AppointmentStatus.CANCELLED.value)),
+            ongoing_appointments=Count('id', filter=Q(status=AppointmentStatus.ONGOING.value)),
+        )
+
+        revenue = DailyRevenue.objects.aggregate(total=Sum('total'))['total']
+
+        reviews = Review.objects.aggregate(total_reviews=Count('id'), average_rating=Avg('rating'))
+
+        return {
+            **users,
+            **appointments,
+            'total_revenue': float(revenue) if revenue else 0.0,
+            'total_reviews': reviews['total_reviews'],
+            'average_rating': round(float(reviews['average_rating']), 2) if reviews['average_rating'] else 0.0,
+        }
+
+    @classmethod
+    def refresh(cls):
+        """
+        Recomputes the live statistics and stores them in the snapshot row.
+        """
+        snapshot, _created = cls.objects.update_or_create(pk=cls.SNAPSHOT_PK, defaults=cls.compute())
+        return snapshot
+
+    @classmethod
+    def get_current(cls):
+        """
+        Returns the statistics from the snapshot row if enabled and present, otherwise computes them live.
+        """
+        if getattr(settings, 'PLATFORM_STATISTICS_SNAPSHOT', False):
+            snapshot = cls.objects.filter(pk=cls.SNAPSHOT_PK).first()
+
+            if snapshot:
+                return snapshot.to_dict()
+
+        return cls.compute()
+
+    def to_dict(self):
+        """
+        Returns a JSON-serializable dict representation of the statistics.
+        """
+        return {
+            'total_clients': self.total_clients,
+            'total_barbers': self.total_barbers,
+            'total_appointments': self.total_appointments,
+            'completed_appointments': self.completed_appointments,
+            'cancelled_appointments': self.cancelled_appointments,
+            'ongoing_appointments': self.ongoing_appointments,
+            'total_revenue': float(self.total_revenue),
+            'total_reviews': self.total_reviews,
+            'average_rating': self.average_rating,
+        }
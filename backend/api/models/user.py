@@ -1,7 +1,9 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db.models import Q, UniqueConstraint, Avg, Sum
+from django.db.models import Q, F, UniqueConstraint, Sum, Count, OuterRef, Subquery, Prefetch
+from django.db.models.functions import Coalesce
 from django.db import models
+from django.utils.functional import cached_property
 from enum import Enum
 
 class Roles(Enum):
@@ -58,6 +60,88 @@ class UserManager(BaseUserManager):
         return admin
 
 
+class BarberQuerySet(models.QuerySet):
+    """
+    Custom queryset for barbers, used to load the data needed by `Barber.to_dict()` in bulk.
+    """
+    def with_profile_data(self):
+        """
+        Annotates the appointment/revenue/rating statistics and prefetches the latest reviews and upcoming appointments,
+        so a list of barbers is serialized with a fixed number of queries, regardless of its size.
+        """
+        from .appointment import Appointment, Review, AppointmentStatus
+
+        completed = Appointment.objects.filter(barber=OuterRef('pk'), status=AppointmentStatus.COMPLETED.value).values('barber')
+
+        return self.annotate(
+            completed_appointments_count=Subquery(completed.annotate(count=Count('id')).values('count')),
+        ).prefetch_related(
+            Prefetch('barber_reviews', queryset=Review.objects.order_by('-created_at')[:3], to_attr='prefetched_latest_reviews'),
+            Prefetch('appointments_received', queryset=Barber.get_upcoming_appointments_queryset(Appointment.objects.all()), to_attr='prefetched_upcoming_appointments'),
+        )
+
+
+    def rebuild_rating_aggregates(self):
+        """
+        Recomputes the denormalized rating aggregates (count, sum, histogram) of these barbers from their reviews,
+        with a single UPDATE. Returns the number of barbers updated.
+        """
+        from ..utils import user_cache
+        from .appointment import Review
+
+        reviews = Review.objects.filter(barber=OuterRef('pk')).values('barber')
+
+        def aggregate(expression):
+            return Coalesce(Subquery(reviews.annotate(value=expression).values('value')), 0)
+
+        # Bulk rebuilds are rare, forgetting every cached user is cheaper than listing the barbers
+        user_cache.clear()
+
+        return self.update(
+            review_count=aggregate(Count('id')),
+            rating_sum=aggregate(Sum('rating')),
+            **{field: aggregate(Count('id', filter=Q(rating=rating))) for rating, field in Barber.RATING_HISTOGRAM_FIELDS.items()},
+        )
+
+
+class BarberManager(UserManager.from_queryset(BarberQuerySet)):
+    """
+    User manager for barbers, exposing the `BarberQuerySet` methods.
+    """
+    pass
+
+
+class ClientQuerySet(models.QuerySet):
+    """
+    Custom queryset for clients, used to load the data needed by `Client.to_dict()` in bulk.
+    """
+    def with_profile_data(self):
+        """
+        Annotates the appointment counts and prefetches the upcoming appointment, latest reviews and recent appointments,
+        so a list of clients is serialized with a fixed number of queries, regardless of its size.
+        """
+        from .appointment import Appointment, Review, AppointmentStatus
+
+        appointments = Appointment.objects.filter(client=OuterRef('pk')).values('client')
+        completed = appointments.filter(status=AppointmentStatus.COMPLETED.value)
+
+        return self.annotate(
+            total_appointments_count=Subquery(appointments.annotate(count=Count('id')).values('count')),
+            completed_appointments_count=Subquery(completed.annotate(count=Count('id')).values('count')),
+        ).prefetch_related(
+            Prefetch('appointments_created', queryset=Appointment.objects.filter(status=AppointmentStatus.ONGOING.value).order_by('id').with_line_items()[:1], to_attr='prefetched_upcoming_appointment'),
+            Prefetch('client_reviews', queryset=Review.objects.order_by('-created_at')[:3], to_attr='prefetched_latest_reviews'),
+            Prefetch('appointments_created', queryset=Appointment.objects.exclude(status=AppointmentStatus.CANCELLED.value).order_by('-date', '-slot').with_line_items()[:3], to_attr='prefetched_recent_appointments'),
+        )
+
+
+class ClientManager(UserManager.from_queryset(ClientQuerySet)):
+    """
+    User manager for clients, exposing the `ClientQuerySet` methods.
+    """
+    pass
+
+
 class User(AbstractUser):
     """
     Custom user model using our custom manager.
@@ -86,6 +170,9 @@ class User(AbstractUser):
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = []
+
+    # Fields only written with F() updates, which a full save() of an instance loaded earlier must not overwrite
+    COUNTER_FIELDS = ()
     
     class Meta:
         constraints = [
@@ -96,6 +183,24 @@ class User(AbstractUser):
             )
         ]
     
+    @staticmethod
+    def get_role_model(role):
+        """
+        Returns the Admin, Client or Barber model of a role value, None if unknown.
+        """
+        return {Roles.ADMIN.value: Admin, Roles.CLIENT.value: Client, Roles.BARBER.value: Barber}.get(role)
+
+    def save(self, *args, **kwargs):
+        # Existing rows are saved without their counters, unless they are listed in `update_fields`
+        if self.COUNTER_FIELDS and not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name not in self.COUNTER_FIELDS
+            ]
+
+        super().save(*args, **kwargs)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -122,83 +227,76 @@ class Admin(User):
 
         super().save(*args, **kwargs)
 
+    @cached_property
+    def statistics(self):
+        """
+        Returns the platform-wide statistics, computed once per instance (or read from the snapshot row if enabled).
+        """
+        from .statistics import PlatformStatistics
+        return PlatformStatistics.get_current()
+
     @property
     def total_clients(self):
         """
         Returns the sum of all the registered clients in the platform
         """
-        from .user import Client
-        return Client.objects.filter(is_active=True).count()
+        return self.statistics['total_clients']
     
     @property
     def total_barbers(self):
         """
         Returns the sum of all the registered barbers in the platform
         """
-        from .user import Barber
-        return Barber.objects.filter(is_active=True).count()
+        return self.statistics['total_barbers']
     
     @property
     def total_appointments(self):
         """
         Returns the sum of all the booked appointments in the platform
         """
-        from .appointment import Appointment
-        return Appointment.objects.count()
+        return self.statistics['total_appointments']
 
     @property
     def completed_appointments(self):
         """
         Returns the sum of all the completed appointments in the platform
         """
-        from .appointment import Appointment, AppointmentStatus
-        return Appointment.objects.filter(status=AppointmentStatus.COMPLETED.value).count()
+        return self.statistics['completed_appointments']
     
     @property
     def cancelled_appointments(self):
         """
         Returns the sum of all the cancelled appointments in the platform
         """
-        from .appointment import Appointment, AppointmentStatus
-        return Appointment.objects.filter(status=AppointmentStatus.CANCELLED.value).count()
+        return self.statistics['cancelled_appointments']
     
     @property
     def ongoing_appointments(self):
         """
         Returns the sum of all the ongoing appointments in the platform
         """
-        from .appointment import Appointment, AppointmentStatus
-        return Appointment.objects.filter(status=AppointmentStatus.ONGOING.value).count()
+        return self.statistics['ongoing_appointments']
     
     @property
     def total_revenue(self):
         """
         Returns the sum of the services in all completed appointments, for total platform revenue
         """
-        from .appointment import Appointment, AppointmentStatus
-        revenue = (
-            Appointment.objects.filter(status=AppointmentStatus.COMPLETED.value)
-            .annotate(price_sum=Sum('services__price'))
-            .aggregate(total=Sum('price_sum'))['total']
-        )
-        return float(revenue) if revenue else 0.0
+        return self.statistics['total_revenue']
 
     @property
     def total_reviews(self):
         """
         Returns the sum of all reviews posted in the platform
         """
-        from .appointment import Review
-        return Review.objects.count()
+        return self.statistics['total_reviews']
     
     @property
     def average_rating(self):
         """
         Returns the average rating of all reviewes posted in the platrofm
         """
-        from .appointment import Review
-        avg = Review.objects.aggregate(avg=Avg('rating'))['avg']
-        return round(float(avg), 2) if avg else 0.0
+        return self.statistics['average_rating']
     
     def to_dict(self):
         base = super().to_dict()
@@ -232,6 +330,13 @@ class Client(User):
     surname = models.CharField(max_length=50)
     phone_number = models.CharField(validators=[_phone_number_validator()], max_length=16, blank=True, null=True)
 
+    # Running total of the revenue ledger, maintained by `RevenueEntry.record_completed()`
+    spent_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    COUNTER_FIELDS = ('spent_total',)
+
+    objects = ClientManager()
+
     def save(self, *args, **kwargs):
         if not self.pk:
             self.role = Roles.CLIENT.value
@@ -246,6 +351,9 @@ class Client(User):
         """
         Returns the sum of all the  appointments for this client.
         """
+        if hasattr(self, 'total_appointments_count'):
+            return self.total_appointments_count or 0
+
         return self.appointments_created.count()
     
     @property
@@ -253,6 +361,9 @@ class Client(User):
         """
         Returns the sum of all the completed appointments for this client.
         """
+        if hasattr(self, 'completed_appointments_count'):
+            return self.completed_appointments_count or 0
+
         from .appointment import AppointmentStatus
         return self.appointments_created.filter(status=AppointmentStatus.COMPLETED.value).count()
     
@@ -261,8 +372,12 @@ class Client(User):
         """
         Returns the single ongoing Appointment instance for this client, or None.
         """
-        from .appointment import AppointmentStatus
-        appointment = self.appointments_created.filter(status=AppointmentStatus.ONGOING.value).first()
+        if hasattr(self, 'prefetched_upcoming_appointment'):
+            appointment = next(iter(self.prefetched_upcoming_appointment), None)
+        else:
+            from .appointment import AppointmentStatus
+            appointment = self.appointments_created.filter(status=AppointmentStatus.ONGOING.value).with_line_items().first()
+
         return appointment.to_dict() if appointment else None
 
     @property
@@ -270,28 +385,32 @@ class Client(User):
         """
         Returns a list of dicts representing all reviews made by this client.
         """
-        return [review.to_dict() for review in self.client_reviews.order_by('-created_at')[:3]]
+        if hasattr(self, 'prefetched_latest_reviews'):
+            reviews = self.prefetched_latest_reviews
+        else:
+            reviews = self.client_reviews.order_by('-created_at')[:3]
+
+        return [review.to_dict() for review in reviews]
     
     @property
     def total_spent(self):
         """
-        Returns the sum of the services in all completed appointments for this barber.
+        Returns the sum of the line items in all completed appointments for this client.
         """
-        from .appointment import AppointmentStatus
-        spent = (
-            self.appointments_created.filter(status=AppointmentStatus.COMPLETED.value)
-            .annotate(price_sum=Sum('services__price'))
-            .aggregate(total=Sum('price_sum'))['total']
-        )
-        return float(spent) if spent else 0.0
+        return float(self.spent_total)
 
     @property
     def recent_appointments(self):
         """
         Returns a list of dicts representing the latest 3 appointments for this client (excluding cancelled).
         """
-        from .appointment import AppointmentStatus
-        return [appointment.to_dict() for appointment in self.appointments_created.exclude(status=AppointmentStatus.CANCELLED.value).order_by('-date', '-slot')[:3]]
+        if hasattr(self, 'prefetched_recent_appointments'):
+            appointments = self.prefetched_recent_appointments
+        else:
+            from .appointment import AppointmentStatus
+            appointments = self.appointments_created.exclude(status=AppointmentStatus.CANCELLED.value).order_by('-date', '-slot').with_line_items()[:3]
+
+        return [appointment.to_dict() for appointment in appointments]
     
     def to_dict(self):
         base = super().to_dict()
@@ -318,6 +437,24 @@ class Barber(User):
     surname = models.CharField(max_length=50)
     description = models.TextField(blank=True, null=True)
 
+    # Rating aggregates, maintained incrementally by Review.save()/delete() (rebuild with `manage.py rebuild_rating_aggregates`)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    RATING_HISTOGRAM_FIELDS = {rating: f'rating_{rating}_count' for rating in range(1, 6)}
+
+    # Running total of the revenue ledger, maintained by `RevenueEntry.record_completed()`
+    revenue_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    COUNTER_FIELDS = ('review_count', 'rating_sum', *RATING_HISTOGRAM_FIELDS.values(), 'revenue_total')
+
+    objects = BarberManager()
+
     def save(self, *args, **kwargs):
         if not self.pk:
             self.role = Roles.BARBER.value
@@ -327,23 +464,33 @@ class Barber(User):
         
         super().save(*args, **kwargs)
     
-    @property
-    def upcoming_appointments(self):
+    @staticmethod
+    def get_upcoming_appointments_queryset(appointments):
         """
-        Returns a list of dicts, each representing an upcoming (ongoing) appointment for this barber.
+        Filters the given appointments queryset to the upcoming (ongoing and not yet due) ones, with their line items loaded.
         """
         from .appointment import AppointmentStatus
         from django.utils import timezone
 
         now = timezone.now()
 
-        appointments = self.appointments_received.filter(status=AppointmentStatus.ONGOING.value)
-        
-        appointments = appointments.filter(
+        appointments = appointments.filter(status=AppointmentStatus.ONGOING.value)
+
+        return appointments.filter(
             Q(date__gt=now.date()) |
             Q(date=now.date(), slot__gte=now.time())
-        ).order_by('date', 'slot')
-        
+        ).order_by('date', 'slot').with_line_items()
+
+    @property
+    def upcoming_appointments(self):
+        """
+        Returns a list of dicts, each representing an upcoming (ongoing) appointment for this barber.
+        """
+        if hasattr(self, 'prefetched_upcoming_appointments'):
+            appointments = self.prefetched_upcoming_appointments
+        else:
+            appointments = self.get_upcoming_appointments_queryset(self.appointments_received.all())
+
         return [appointment.to_dict() for appointment in appointments]
     
     @property
@@ -351,36 +498,71 @@ class Barber(User):
         """
         Returns the sum of all the completed appointments for this barber.
         """
+        if hasattr(self, 'completed_appointments_count'):
+            return self.completed_appointments_count or 0
+
         from .appointment import AppointmentStatus
         return self.appointments_received.filter(status=AppointmentStatus.COMPLETED.value).count()
     
     @property
     def total_revenue(self):
-        from .appointment import AppointmentStatus
         """
-        Returns the sum of the services in all completed appointments for this barber.
+        Returns the sum of the line items in all completed appointments for this barber.
         """
-        revenue = (
-            self.appointments_received.filter(status=AppointmentStatus.COMPLETED.value)
-            .annotate(price_sum=Sum('services__price'))
-            .aggregate(total=Sum('price_sum'))['total']
-        )
-        return float(revenue) if revenue else 0.0
+        return float(self.revenue_total)
     
     @property
     def latest_reviews(self):
         """
         Returns a list of dicts representing this barber's reviews.
         """
-        return [review.to_dict() for review in self.barber_reviews.order_by('-created_at')[:3]]
+        if hasattr(self, 'prefetched_latest_reviews'):
+            reviews = self.prefetched_latest_reviews
+        else:
+            reviews = self.barber_reviews.order_by('-created_at')[:3]
+
+        return [review.to_dict() for review in reviews]
     
     @property
     def average_rating(self):
         """
-        Returns the average rating of this barber, or None if no reviews exist.
+        Returns the average rating of this barber, or 0.0 if no reviews exist.
+        """
+        return round(self.rating_sum / self.review_count, 2) if self.review_count else 0.0
+
+    @property
+    def rating_histogram(self):
+        """
+        Returns the number of reviews for each rating, from 1 to 5.
+        """
+        return {str(rating): getattr(self, field) for rating, field in self.RATING_HISTOGRAM_FIELDS.items()}
+
+    @classmethod
+    def update_rating_aggregates(cls, barber_id, added=None, removed=None):
+        """
+        Atomically adds and/or removes a rating from the aggregates of the given barber with F expressions.
         """
-        avg = self.barber_reviews.aggregate(avg=Avg('rating'))['avg']
-        return round(float(avg), 2) if avg else 0.0
+        updates = {}
+
+        if added is not None:
+            updates[cls.RATING_HISTOGRAM_FIELDS[added]] = F(cls.RATING_HISTOGRAM_FIELDS[added]) + 1
+
+        if removed is not None:
+            updates[cls.RATING_HISTOGRAM_FIELDS[removed]] = updates.get(cls.RATING_HISTOGRAM_FIELDS[removed], F(cls.RATING_HISTOGRAM_FIELDS[removed])) - 1
+
+        from ..utils import user_cache, forget_instances
+
+        count_delta = (added is not None) - (removed is not None)
+        sum_delta = (added or 0) - (removed or 0)
+
+        user_cache.invalidate(barber_id)
+        forget_instances(cls, barber_id)
+
+        return cls.objects.filter(pk=barber_id).update(
+            review_count=F('review_count') + count_delta,
+            rating_sum=F('rating_sum') + sum_delta,
+            **updates,
+        )
     
     def to_dict(self):
         """
@@ -396,5 +578,16 @@ class Barber(User):
             'total_revenue': self.total_revenue,
             'latest_reviews': self.latest_reviews,
             'average_rating': self.average_rating,
+            'review_count': self.review_count,
+            'rating_histogram': self.rating_histogram,
         })
-        return base
\ No newline at end of file
+        return base
+
+
+class UserRevocation(models.Model):
+    """
+    Revokes the access tokens issued to a user up to `revoked_at`, written when the user is deactivated or deleted.
+    Keeps the user ID without a foreign key, so it outlives a deleted user until its tokens expire.
+    """
+    user_id = models.BigIntegerField(unique=True)
+    revoked_at = models.DateTimeField(db_index=True)
@@ -1,5 +1,4 @@
 import uuid
-from datetime import timedelta, datetime
 from rest_framework import serializers
 from ..utils import (
     AdminValidationMixin,
@@ -11,10 +10,10 @@ from ..utils import (
     GetAppointmentsMixin,
     GetBarbersMixin,
     GetClientsMixin,
+    CursorPaginationSerializer,
 )
 from ..models import(
     Barber,
-    Availability,
 )
 
 
@@ -71,28 +70,31 @@ class DeleteAdminProfileSerializer(AdminValidationMixin, serializers.Serializer)
         self.validated_data['admin'].delete()
 
 
-class GetAllBarbersSerializer(GetBarbersMixin, serializers.Serializer):
+class GetAllBarbersSerializer(GetBarbersMixin, CursorPaginationSerializer):
     """
     Returns all barbers registered and their data 
     """
     def to_representation(self, instance):
-        return {'barbers': self.get_barbers_private(show_all=True)}
+        barbers = self.get_barbers_queryset(show_all=True)
+        return self.get_list_representation('barbers', barbers, self._CURSOR_ORDERING, self.get_barber_private)
 
 
-class GetAllClientsSerializer(GetClientsMixin, serializers.Serializer):
+class GetAllClientsSerializer(GetClientsMixin, CursorPaginationSerializer):
     """
     Returns all clients registered and their data 
     """
     def to_representation(self, instance):
-        return {'clients': self.get_clients_private(show_all=True)}
+        clients = self.get_clients_queryset(show_all=True)
+        return self.get_list_representation('clients', clients, self._CURSOR_ORDERING, self.get_client_private)
 
 
-class GetAllAppointmentsSerializer(GetAppointmentsMixin, serializers.Serializer):
+class GetAllAppointmentsSerializer(GetAppointmentsMixin, CursorPaginationSerializer):
     """
     Admin only: Returns all appointments registered in the system
     """
     def to_representation(self, instance):
-        return {'appointments': self.get_appointments_public(show_all=True)}
+        appointments = self.get_appointments_queryset(show_all=True)
+        return self.get_list_representation('appointments', appointments, self._CURSOR_ORDERING, self.get_appointment_public)
     
 
 class InviteBarberSerializer(EmailValidationMixin, serializers.Serializer):
@@ -157,57 +159,45 @@ class CreateBarberAvailabilitySerializer(BarberValidationMixin, AvailabilityVali
 
     def validate(self, attrs):
         attrs = self.validate_barber(attrs)
+        attrs = self.validate_availability_range(attrs)
+        return attrs
+    
+    def create(self, validated_data):
+        return self.upsert_availabilities([validated_data['barber']], validated_data)
 
-        start_date = attrs['start_date']
-        end_date = attrs.get('end_date', start_date) # Defaults back to start_date if omitted
 
-        if end_date < start_date:
-            raise serializers.ValidationError("end_date cannot be before start_date")
-        
-        attrs['end_date'] = end_date  # ensure always present and >= start
-        attrs['slot_interval'] = attrs.get('slot_interval', 30)
+class CreateBarbersAvailabilitySerializer(AvailabilityValidationMixin, serializers.Serializer):
+    """
+    Admin only: Create the same availability for many barbers at once, e.g. to publish a whole shop's schedule.
+
+    - barber_ids    (OPTIONAL): list of barber IDs, all active barbers if omitted
+    - start_date, end_date, start_time, end_time, slot_interval, days_of_week: same as for a single barber
+    """
+    barber_ids = serializers.ListField(required=False, allow_empty=False, child=serializers.IntegerField())
+    start_date = serializers.DateField(required=True)
+    end_date = serializers.DateField(required=False)
+    start_time = serializers.TimeField(required=True)
+    end_time = serializers.TimeField(required=True)
+    slot_interval = serializers.IntegerField(required=False, min_value=1, default=30)
+    days_of_week = serializers.ListField(required=False, allow_null=True, allow_empty=True, child=serializers.IntegerField(min_value=0, max_value=6))
+
+    def validate(self, attrs):
+        barbers = Barber.objects.filter(is_active=True)
+
+        if 'barber_ids' in attrs:
+            barber_ids = set(attrs['barber_ids'])
+            barbers = list(barbers.filter(id__in=barber_ids))
+            missing = barber_ids - {barber.id for barber in barbers}
+
+            if missing:
+                raise serializers.ValidationError(f'Barbers with IDs: "{sorted(missing)}" do not exist or are inactive.')
 
+        attrs['barbers'] = list(barbers)
+        attrs = self.validate_availability_range(attrs)
         return attrs
-    
+
     def create(self, validated_data):
-        barber = validated_data['barber']
-        start_date = validated_data['start_date']
-        end_date = validated_data['end_date']
-        start_time = validated_data['start_time']
-        end_time = validated_data['end_time']
-        interval = validated_data['slot_interval']
-        days_of_week = validated_data.get('days_of_week')
-
-        # Single day mode, ignores days_of_week
-        if start_date == end_date:
-            target_dates = [start_date]
-
-        # Multi day mode, filters by days_of_week if provided
-        else:
-            span = (end_date - start_date).days + 1
-            raw_dates = [start_date + timedelta(days=days) for days in range(span)]
-
-            if days_of_week:
-                target_dates = [day for day in raw_dates if day.weekday() in days_of_week]
-            else:
-                target_dates = raw_dates
-
-        availabilities = []
-        for date in target_dates:
-            slots = self.generate_slots(start_time, end_time, interval)
-
-            if not slots:
-                continue
-
-            # Uniqueness enforced by update_or_create (overwrite for admin)
-            availability, _created = Availability.objects.update_or_create(
-                barber=barber,
-                date=date,
-                defaults={"slots": slots}
-            )
-            availabilities.append(availability)
-
-        return availabilities
+        return self.upsert_availabilities(validated_data['barbers'], validated_data)
 
 
 class UpdateBarberAvailabilitySerializer(BarberValidationMixin, AvailabilityValidationMixin, serializers.Serializer):
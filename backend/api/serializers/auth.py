@@ -1,12 +1,15 @@
-from django.contrib.auth import authenticate
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, authenticate
 from django.core.exceptions import ObjectDoesNotExist
-from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+from rest_framework_simplejwt.tokens import TokenError
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import PermissionDenied
 from rest_framework import serializers
+from ..backends.tokens import RoleRefreshToken
 from ..models import User, Client
 from ..utils import (
+    AsyncSerializerMixin,
     UserValidationMixin,
     UsernameValidationMixin,
     EmailValidationMixin, 
@@ -16,7 +19,7 @@ from ..utils import (
     BarberValidationMixin,
 )
 
-class GetCurrentUserSerializer(UserValidationMixin, serializers.Serializer):
+class GetCurrentUserSerializer(AsyncSerializerMixin, UserValidationMixin, serializers.Serializer):
     """
     Returns common information related to the profile of a given user
     """
@@ -24,9 +27,16 @@ class GetCurrentUserSerializer(UserValidationMixin, serializers.Serializer):
         attrs = self.validate_user(attrs)
         return attrs
 
+    async def avalidate(self, attrs):
+        attrs = await self.avalidate_user(attrs)
+        return attrs
+
     def to_representation(self, validated_data):
-        user = validated_data['user']
-        return {'me': user.to_dict()}
+        # Only the common fields, `request.user` is loaded as its role model whose to_dict() adds the profile
+        return {'me': User.to_dict(validated_data['user'])}
+
+    async def ato_representation(self, validated_data):
+        return self.to_representation(validated_data)
     
 
 class RegisterClientSerializer(UsernameValidationMixin, EmailValidationMixin, PasswordValidationMixin, PhoneNumberValidationMixin, serializers.Serializer):
@@ -138,7 +148,7 @@ class VerifyClientEmailSerializer(UIDTokenValidationSerializer):
         return client
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(AsyncSerializerMixin, serializers.Serializer):
     """
     Login using either email or username, not both.
     """
@@ -146,20 +156,29 @@ class LoginSerializer(serializers.Serializer):
     username = serializers.CharField(required=False)
     password = serializers.CharField(required=True, write_only=True)
 
-    def validate(self, data):
+    def get_identifier(self, data):
         email = data.get('email')
         username = data.get('username')
-        password = data.get('password')
 
         if not email and not username:
             raise serializers.ValidationError("You must provide either an email or username.")
         if email and username:
             raise serializers.ValidationError("Provide only one of email or username, not both.")
 
-        identifier = username or email
+        return username or email
+
+    def validate(self, data):
+        user = authenticate(username=self.get_identifier(data), password=data.get('password'))
+        return self.login(data, user)
 
-        user = authenticate(username=identifier, password=password)
+    async def avalidate(self, data):
+        user = await aauthenticate(username=self.get_identifier(data), password=data.get('password'))
+        return await sync_to_async(self.login)(data, user)
 
+    def login(self, data, user):
+        """
+        Checks the authenticated user and issues its tokens (the refresh token is recorded as outstanding).
+        """
         if not user:
             raise PermissionDenied('Invalid credentials.')
 
@@ -167,7 +186,7 @@ class LoginSerializer(serializers.Serializer):
             raise PermissionDenied('Account inactive. Please verify your email.')
 
         data['user'] = user
-        data['refresh'] = RefreshToken.for_user(user)
+        data['refresh'] = RoleRefreshToken.for_user(user)
 
         return data
 
@@ -176,7 +195,8 @@ class LoginSerializer(serializers.Serializer):
         refresh = instance['refresh']
 
         return {
-            'user': user.to_dict(),
+            # Just what identifies the user, the client fetches the rest from `/auth/me/` and its profile endpoint
+            'user': {'id': user.id, 'role': user.role, 'username': user.username},
             'token': {
                 'access_token': str(refresh.access_token),
                 'refresh_token': str(refresh),
@@ -186,6 +206,9 @@ class LoginSerializer(serializers.Serializer):
             }
         }
 
+    async def ato_representation(self, instance):
+        return self.to_representation(instance)
+
 
 class LogoutSerializer(serializers.Serializer):
     """
@@ -195,7 +218,7 @@ class LogoutSerializer(serializers.Serializer):
 
     def validate_refresh_token(self, value):
         try:
-            self.token = RefreshToken(value)
+            self.token = RoleRefreshToken(value)
         except TokenError:
             raise serializers.ValidationError("Invalid or expired refresh token.")
         
@@ -248,6 +271,7 @@ class RefreshTokenCustomSerializer(TokenRefreshSerializer):
     """
     Custom refresh token serializer for field name 'refresh_token'
     """
+    token_class = RoleRefreshToken
     refresh = None
     refresh_token = serializers.CharField(required=True, write_only=True)
 
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from ..utils import (
+    AsyncSerializerMixin,
     BarberValidationMixin,
     UsernameValidationMixin,
     ServiceValidationMixin,
@@ -8,6 +9,7 @@ from ..utils import (
     GetServicesMixin,
     GetAppointmentsMixin,
     GetReviewsMixin,
+    CursorPaginationSerializer,
 )
 from ..models import (
     Service,
@@ -79,20 +81,28 @@ class DeleteBarberProfileSerializer(BarberValidationMixin, serializers.Serialize
         self.validated_data['barber'].delete()
 
 
-class GetBarberAvailabilitiesSerializer(BarberValidationMixin, GetAvailabilitiesMixin, serializers.Serializer):
+class GetBarberAvailabilitiesSerializer(AsyncSerializerMixin, BarberValidationMixin, GetAvailabilitiesMixin, serializers.Serializer):
     """
     Barber only: Returns all availabilities for a given barber
     """
     def validate(self, attrs):
         attrs = self.validate_barber(attrs)
         return attrs
+
+    async def avalidate(self, attrs):
+        attrs = await self.avalidate_barber(attrs)
+        return attrs
     
     def to_representation(self, validated_data):
         barber = validated_data['barber']
         return {'availabilities': self.get_availabilities_public(barber.id)}
 
+    async def ato_representation(self, validated_data):
+        barber = validated_data['barber']
+        return {'availabilities': await self.aget_availabilities_public(barber.id)}
 
-class GetBarberSlotsSerializer(BarberValidationMixin, GetAvailabilitiesMixin, serializers.Serializer):
+
+class GetBarberSlotsSerializer(AsyncSerializerMixin, BarberValidationMixin, GetAvailabilitiesMixin, serializers.Serializer):
     """
     Barber only: Returns all slots for a given barber and date
     """
@@ -102,6 +112,10 @@ class GetBarberSlotsSerializer(BarberValidationMixin, GetAvailabilitiesMixin, se
         attrs = self.validate_barber(attrs)
         return attrs
 
+    async def avalidate(self, attrs):
+        attrs = await self.avalidate_barber(attrs)
+        return attrs
+
     def to_representation(self, validated_data):
         barber = validated_data['barber']
         date = validated_data['date']
@@ -118,19 +132,41 @@ class GetBarberSlotsSerializer(BarberValidationMixin, GetAvailabilitiesMixin, se
         slots = self._filter_slots(availability)
         return {"slots": slots}
 
+    async def ato_representation(self, validated_data):
+        barber = validated_data['barber']
+        date = validated_data['date']
+
+        from ..models import Availability
+
+        try:
+            availability = await Availability.objects.aget(barber=barber, date=date)
+        except Availability.DoesNotExist:
+            return {"slots": []}
+
+        booked_masks = await self._aget_booked_masks([availability])
+        return {"slots": self._filter_slots(availability, booked_masks.get((availability.barber_id, availability.date), 0))}
 
-class GetBarberServicesSerializer(BarberValidationMixin, GetServicesMixin, serializers.Serializer):
+
+class GetBarberServicesSerializer(AsyncSerializerMixin, BarberValidationMixin, GetServicesMixin, serializers.Serializer):
     """
     Barber only: Returns all services offered by a given barber
     """
     def validate(self, attrs):
         attrs = self.validate_barber(attrs)
         return attrs
+
+    async def avalidate(self, attrs):
+        attrs = await self.avalidate_barber(attrs)
+        return attrs
     
     def to_representation(self, validated_data):
         barber = validated_data['barber']
         return {'services': self.get_services_public(barber.id)}
 
+    async def ato_representation(self, validated_data):
+        barber = validated_data['barber']
+        return {'services': await self.aget_services_public(barber.id)}
+
 
 class CreateBarberServiceSerializer(BarberValidationMixin, ServiceValidationMixin, serializers.Serializer):
     """
@@ -194,7 +230,7 @@ class DeleteBarberServiceSerializer(BarberValidationMixin, ServiceValidationMixi
         self.validated_data['service'].delete()
 
 
-class GeBarberAppointmentsSerializer(BarberValidationMixin, GetAppointmentsMixin, serializers.Serializer):
+class GeBarberAppointmentsSerializer(BarberValidationMixin, GetAppointmentsMixin, CursorPaginationSerializer):
     """
     Barber only: Returns all appointments for a given barber
     """
@@ -204,10 +240,11 @@ class GeBarberAppointmentsSerializer(BarberValidationMixin, GetAppointmentsMixin
 
     def to_representation(self, validated_data):
         barber = validated_data['barber']
-        return {'appointments': self.get_appointments_public(barber_id=barber.id)}
+        appointments = self.get_appointments_queryset(barber_id=barber.id)
+        return self.get_list_representation('appointments', appointments, self._CURSOR_ORDERING, self.get_appointment_public)
     
 
-class GetBarberReviewsSerializer(BarberValidationMixin, GetReviewsMixin, serializers.Serializer):
+class GetBarberReviewsSerializer(BarberValidationMixin, GetReviewsMixin, CursorPaginationSerializer):
     """
     Barber only: Returns all reviews received by a given barber
     """
@@ -217,4 +254,5 @@ class GetBarberReviewsSerializer(BarberValidationMixin, GetReviewsMixin, seriali
 
     def to_representation(self, validated_data):
         barber = validated_data['barber']
-        return {'reviews': self.get_reviews_public(barber_id=barber.id)}
\ No newline at end of file
+        reviews = self.get_reviews_queryset(barber_id=barber.id)
+        return self.get_list_representation('reviews', reviews, self._CURSOR_ORDERING, self.get_review_public)
\ No newline at end of file
@@ -10,12 +10,11 @@ from ..utils import (
     GetBarbersMixin,
     GetAppointmentsMixin,
     GetReviewsMixin,
+    CursorPaginationSerializer,
     phone_number_validator,
+    unschedule_appointment_events,
 )
 from ..models import (
-    Appointment, 
-    Service, 
-    AppointmentService,
     Review,
     AppointmentStatus, 
 )
@@ -86,7 +85,7 @@ class DeleteClientProfileSerializer(ClientValidationMixin, serializers.Serialize
         self.validated_data['client'].delete()
 
 
-class GetClientAppointmentsSerializer(ClientValidationMixin, GetAppointmentsMixin, serializers.Serializer):
+class GetClientAppointmentsSerializer(ClientValidationMixin, GetAppointmentsMixin, CursorPaginationSerializer):
     """
     Client only: Returns all appointments for a given client
     """
@@ -96,7 +95,8 @@ class GetClientAppointmentsSerializer(ClientValidationMixin, GetAppointmentsMixi
     
     def to_representation(self, validated_data):
         client = validated_data['client']
-        return {'appointments': self.get_appointments_public(client_id=client.id)}
+        appointments = self.get_appointments_queryset(client_id=client.id)
+        return self.get_list_representation('appointments', appointments, self._CURSOR_ORDERING, self.get_appointment_public)
     
 
 class CreateClientAppointmentSerializer(ClientValidationMixin, BarberValidationMixin, AppointmentValidationMixin, serializers.Serializer):
@@ -105,7 +105,7 @@ class CreateClientAppointmentSerializer(ClientValidationMixin, BarberValidationM
     """
     date = serializers.DateField(required=True)
     slot = serializers.TimeField(required=True)
-    services = serializers.PrimaryKeyRelatedField(required=True, queryset=Service.objects.all(), many=True)
+    services = serializers.ListField(required=True, child=serializers.IntegerField())
 
     def validate(self, attrs):
         attrs = self.validate_client(attrs)
@@ -116,29 +116,7 @@ class CreateClientAppointmentSerializer(ClientValidationMixin, BarberValidationM
         return attrs
 
     def create(self, validated_data):
-        client = validated_data['client']
-        barber = validated_data['barber']
-        date = validated_data['date']
-        slot = validated_data['slot']
-        services = validated_data['services']
-
-        appointment = Appointment(
-            client=client, 
-            barber=barber, 
-            date=date, 
-            slot=slot
-        )
-        appointment.save()
-
-        for service in services:
-            AppointmentService.objects.create(
-                appointment=appointment,
-                name=service.name,
-                price=service.price,
-                original_service=service
-            )
-
-        return appointment
+        return self.book_appointment(validated_data)
 
 
 class CancelClientAppointmentSerializer(ClientValidationMixin, AppointmentValidationMixin, serializers.Serializer):
@@ -154,11 +132,12 @@ class CancelClientAppointmentSerializer(ClientValidationMixin, AppointmentValida
         appointment = self.validated_data['appointment']
         appointment.status = AppointmentStatus.CANCELLED.value
         appointment.save()
+        unschedule_appointment_events(appointment.id)
 
         return appointment
 
 
-class GetClientReviewsSerializer(ClientValidationMixin, GetReviewsMixin, serializers.Serializer):
+class GetClientReviewsSerializer(ClientValidationMixin, GetReviewsMixin, CursorPaginationSerializer):
     """
     Client only: Returns all reviews posted by a given client
     """
@@ -168,7 +147,8 @@ class GetClientReviewsSerializer(ClientValidationMixin, GetReviewsMixin, seriali
 
     def to_representation(self, validated_data):
         client = validated_data['client']
-        return {'reviews': self.get_reviews_public(client_id=client.id)}
+        reviews = self.get_reviews_queryset(client_id=client.id)
+        return self.get_list_representation('reviews', reviews, self._CURSOR_ORDERING, self.get_review_public)
 
 
 class CreateClientReviewSerializer(ClientValidationMixin, BarberValidationMixin, ReviewValidationMixin, serializers.Serializer):
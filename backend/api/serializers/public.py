@@ -1,41 +1,114 @@
 from rest_framework import serializers
 from ..utils import(
+    AsyncSerializerMixin,
     BarberValidationMixin,
     ClientValidationMixin,
     GetBarbersMixin,
     GetClientsMixin,
+    GetAvailabilitiesMixin,
+    CursorPaginationSerializer,
 )
 
 
-class GetBarbersPublicSerializer(GetBarbersMixin, serializers.Serializer):
+class GetBarbersPublicSerializer(AsyncSerializerMixin, GetBarbersMixin, CursorPaginationSerializer):
     """
     Returns all barbers registered and their public data 
     """
     def to_representation(self, instance):
-        return {'barbers': self.get_barbers_public()}
+        barbers = self.get_barbers_queryset()
+        return self.get_list_representation('barbers', barbers, self._CURSOR_ORDERING, self.get_barber_public)
 
+    async def ato_representation(self, instance):
+        barbers = self.get_barbers_queryset()
+        return await self.aget_list_representation('barbers', barbers, self._CURSOR_ORDERING, self.get_barber_public)
 
-class GetBarberProfilePublicSerializer(BarberValidationMixin, GetBarbersMixin, serializers.Serializer):
+
+class GetBarberProfilePublicSerializer(AsyncSerializerMixin, BarberValidationMixin, GetBarbersMixin, serializers.Serializer):
     """
     Returns all the public information related to the profile of a given barber
     """
     def validate(self, attrs):
         attrs = self.validate_barber(attrs)
         return attrs
+
+    async def avalidate(self, attrs):
+        # The profile data is loaded along, so building the profile doesn't query
+        attrs = await self.avalidate_barber(attrs, queryset=self.get_barbers_queryset())
+        return attrs
     
     def to_representation(self, validated_data):
         barber = validated_data['barber']
         return {'profile': self.get_barber_public(barber)}
+
+    async def ato_representation(self, validated_data):
+        return self.to_representation(validated_data)
     
 
-class GetClientProfilePublicSerializer(ClientValidationMixin, GetClientsMixin, serializers.Serializer):
+class GetClientProfilePublicSerializer(AsyncSerializerMixin, ClientValidationMixin, GetClientsMixin, serializers.Serializer):
     """
     Returns all the public information related to the profile of a given client
     """
     def validate(self, attrs):
         attrs = self.validate_client(attrs)
         return attrs
+
+    async def avalidate(self, attrs):
+        # The profile data is loaded along, so building the profile doesn't query
+        attrs = await self.avalidate_client(attrs, queryset=self.get_clients_queryset())
+        return attrs
     
     def to_representation(self, validated_data):
         client = validated_data['client']
-        return {'profile': self.get_client_public(client)}
\ No newline at end of file
+        return {'profile': self.get_client_public(client)}
+
+    async def ato_representation(self, validated_data):
+        return self.to_representation(validated_data)
+
+
+class SearchSlotsPublicSerializer(AsyncSerializerMixin, GetAvailabilitiesMixin, serializers.Serializer):
+    """
+    Returns the earliest free slots across all active barbers, for clients who don't mind which barber they get
+
+    - date      (OPTIONAL): first date to search from, defaults to today
+    - service   (OPTIONAL): only barbers offering a service with this name
+    - limit     (OPTIONAL): number of slots to return, defaults to 10
+    """
+    SEARCH_HORIZON_DAYS = 60
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    date = serializers.DateField(required=False)
+    service = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT)
+
+    def validate_date(self, value):
+        import datetime
+
+        if value < datetime.date.today():
+            raise serializers.ValidationError('Date cannot be in the past.')
+        
+        return value
+
+    def to_representation(self, instance):
+        import datetime
+
+        start_date = self.validated_data.get('date') or datetime.date.today()
+        slots = self.search_free_slots(
+            start_date=start_date,
+            limit=self.validated_data['limit'],
+            service_name=self.validated_data.get('service'),
+            horizon_days=self.SEARCH_HORIZON_DAYS,
+        )
+        return {'slots': slots}
+
+    async def ato_representation(self, instance):
+        import datetime
+
+        start_date = self.validated_data.get('date') or datetime.date.today()
+        slots = await self.asearch_free_slots(
+            start_date=start_date,
+            limit=self.validated_data['limit'],
+            service_name=self.validated_data.get('service'),
+            horizon_days=self.SEARCH_HORIZON_DAYS,
+        )
+        return {'slots': slots}
@@ -0,0 +1,157 @@
+import logging
+from celery.signals import task_prerun, task_postrun
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .middleware import record_query
+from .models import (
+    User,
+    Admin,
+    Barber,
+    Client,
+    Roles,
+    Service,
+    Availability,
+    Appointment,
+    AppointmentService,
+    Review,
+)
+from .utils import (
+    invalidate_public_cache,
+    barber_cache_scope,
+    client_cache_scope,
+    BARBERS_CACHE_SCOPE,
+    request_metrics,
+    user_cache,
+    revoke_user_tokens,
+    get_identity_map,
+    open_identity_map,
+    close_identity_map,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Admin)
+@receiver([post_save, post_delete], sender=Barber)
+@receiver([post_save, post_delete], sender=Client)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached user and the cached public responses showing a barber or client whose account changed.
+    """
+    user_cache.invalidate(instance.pk)
+
+    if instance.role == Roles.BARBER.value:
+        invalidate_public_cache(BARBERS_CACHE_SCOPE, barber_cache_scope(instance.pk))
+    elif instance.role == Roles.CLIENT.value:
+        invalidate_public_cache(client_cache_scope(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Admin)
+@receiver([post_save, post_delete], sender=Barber)
+@receiver([post_save, post_delete], sender=Client)
+def revoke_user_access(sender, instance, created=False, **kwargs):
+    """
+    Revokes the access tokens of a deactivated or deleted user, which still carry `is_active` until they expire.
+    """
+    if kwargs['signal'] is post_delete or (not created and not instance.is_active):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=Availability)
+def invalidate_barber_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached public responses of the barber offering the service or availability.
+    """
+    invalidate_public_cache(BARBERS_CACHE_SCOPE, barber_cache_scope(instance.barber_id))
+
+
+@receiver([post_save, post_delete], sender=Appointment)
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_appointment_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached public responses of both the barber and the client of the appointment or review.
+    """
+    invalidate_public_cache(BARBERS_CACHE_SCOPE, barber_cache_scope(instance.barber_id), client_cache_scope(instance.client_id))
+
+
+@receiver([post_save, post_delete], sender=AppointmentService)
+def invalidate_line_item_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached public responses showing the appointment of the line item (services and amount spent).
+    """
+    # Line items are created right after their appointment, which is usually still cached on the instance
+    if AppointmentService.appointment.is_cached(instance):
+        appointment = {'barber_id': instance.appointment.barber_id, 'client_id': instance.appointment.client_id}
+    else:
+        appointment = Appointment.objects.filter(pk=instance.appointment_id).values('barber_id', 'client_id').first()
+
+    if appointment:
+        invalidate_public_cache(BARBERS_CACHE_SCOPE, barber_cache_scope(appointment['barber_id']), client_cache_scope(appointment['client_id']))
+
+
+@receiver(connection_created)
+def count_database_connection(sender, connection, **kwargs):
+    """
+    Counts the database connections opened, for the `/api/metrics/` endpoint. Pooled connections are sent this signal
+    every time they are taken from the pool, which counts the ones it opens itself.
+    """
+    if getattr(connection, 'pool', None) is None:
+        request_metrics.record_connection()
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Installs the execute wrapper counting the queries of each request (see `RequestMetricsMiddleware`) on every
+    database connection, once.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Admin)
+@receiver([post_save, post_delete], sender=Barber)
+@receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=Service)
+def forget_identity_map_instance(sender, instance, **kwargs):
+    """
+    Drops a saved or deleted row from the identity map of the current request or task, the next lookup fetches it again.
+    """
+    identity_map = get_identity_map()
+
+    if identity_map is not None:
+        identity_map.discard(instance)
+
+
+# Tokens of the identity maps opened by the running Celery tasks, by task ID
+_task_identity_map_tokens = {}
+
+
+@task_prerun.connect
+def open_task_identity_map(task_id=None, **kwargs):
+    """
+    Gives every Celery task its own identity map.
+    """
+    _task_identity_map_tokens[task_id] = open_identity_map()
+
+
+@task_postrun.connect
+def close_task_identity_map(task_id=None, task=None, **kwargs):
+    """
+    Drops the identity map of a finished Celery task, logging the fetches it saved.
+    """
+    token = _task_identity_map_tokens.pop(task_id, None)
+
+    if token is None:
+        return
+
+    identity_map = close_identity_map(token)
+
+    if identity_map is not None and identity_map.hits:
+        logger.info('Task "%s": the identity map saved %d fetches.', task.name if task else '?', identity_map.hits)
@@ -1,21 +1,73 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
+from django.core.mail import get_connection
 from celery import shared_task
 from .models import (
     Appointment, 
     AppointmentStatus,
+    PlatformStatistics,
+    EmailOutbox,
+    RevenueEntry,
+    UserRevocation,
 )
 from .utils import(
-    send_client_reminder_email,
-    send_barber_reminder_email,
+    queue_appointment_reminder_emails,
+    invalidate_appointments_cache,
+    load_revoked_tokens,
+    pop_due_appointment_events,
+    get_next_appointment_event_at,
+    DISPATCH_BATCH_SIZE,
+    REMINDER_EVENT,
+    COMPLETION_EVENT,
 )
 
 
+# Number of outbox emails delivered by one drain task, over a single mail connection
+EMAIL_OUTBOX_BATCH_SIZE = 50
+
+# Number of expired outstanding tokens (and their blacklist entries) deleted by one prune task
+TOKEN_PRUNE_BATCH_SIZE = 1000
+
+
+def _complete_appointments(appointments):
+    """
+    Claims the ONGOING appointments of the queryset as COMPLETED and writes their revenue to the ledger, in one transaction.
+    """
+    with transaction.atomic():
+        completed = appointments.claim_completions()
+        RevenueEntry.record_completed([appointment['id'] for appointment in completed])
+
+        # Bulk updates send no signals, invalidate the public cache of the barbers and clients involved
+        invalidate_appointments_cache(completed)
+
+    return len(completed)
+
+
+def _send_reminders(appointments):
+    """
+    Claims the unsent reminders of the queryset in SQL and queues their emails in the outbox, in one transaction.
+    The outbox drain delivers them in batches over one connection and retries failed ones, so an SMTP error never
+    loses a claimed reminder, and a slow SMTP server never stalls this tick.
+    """
+    with transaction.atomic():
+        claimed = appointments.claim_reminders()
+
+        if claimed:
+            appointment_ids = [appointment['id'] for appointment in claimed]
+            queue_appointment_reminder_emails(Appointment.objects.filter(id__in=appointment_ids).select_related('client', 'barber'))
+
+    invalidate_appointments_cache(claimed)
+    return len(claimed)
+
+
 @shared_task
 def complete_ongoing_appointments():
     """
     Background task that automaically marks ONGOING appointments to COMPLETE when they are due.
+    Sweeps the table as a safety net of `dispatch_appointment_events` (schedule lost, appointments booked before it).
     """
     now = timezone.localtime(timezone.now())  # Italy time!
     
@@ -25,29 +77,149 @@ def complete_ongoing_appointments():
     # Only mark ONGOING as COMPLETE if (date < date_today) OR if (date == date_today AND slot <= time_now)
     appointments = Appointment.objects.filter(status=AppointmentStatus.ONGOING.value).filter((Q(date__lt=date_today) | Q(date=date_today, slot__lte=time_now)))
 
-    return appointments.update(status=AppointmentStatus.COMPLETED.value)
+    return _complete_appointments(appointments)
+
+
+def _slot_window(start, end):
+    """
+    Returns the filter matching appointments whose (date, slot) falls in the (start, end] window, even across midnight.
+    """
+    if start.date() == end.date():
+        return Q(date=start.date(), slot__gt=start.time(), slot__lte=end.time())
+    
+    return Q(date=start.date(), slot__gt=start.time()) | Q(date=end.date(), slot__lte=end.time())
 
 
 @shared_task
 def send_appointment_reminders():
     """
     Background task that automaically sends reminder emails for appointments 1 hour before they are due.
+    Sweeps the table as a safety net of `dispatch_appointment_events` (schedule lost, appointments booked before it).
     """
     now = timezone.localtime(timezone.now())  # Italy time!
 
-    date_today = now.date()
-    time_hour_later = now + timedelta(hours=1)
-
-    # Only get appointments with ONGOING and COMPLETED status, for today, for which reminder not sent, whose datetime is within the next hour
+    # Only get appointments with ONGOING and COMPLETED status, for which reminder not sent, whose datetime is within the next hour
     statuses = [AppointmentStatus.ONGOING.value, AppointmentStatus.COMPLETED.value]
-    appointments = Appointment.objects.filter(status__in=statuses, reminder_email_sent=False, date=date_today)
-
-    for appointment in appointments:
-        appointment_date = timezone.make_aware(datetime.combine(appointment.date, appointment.slot), timezone.get_current_timezone())
-        
-        if (now - timedelta(minutes=10)) < appointment_date <= time_hour_later:
-            send_client_reminder_email(appointment.client, appointment.barber, appointment_date)
-            send_barber_reminder_email(appointment.barber, appointment.client, appointment_date)
-            
-            appointment.reminder_email_sent = True
-            appointment.save(update_fields=['reminder_email_sent'])
\ No newline at end of file
+    appointments = Appointment.objects.filter(status__in=statuses, client__isnull=False, barber__isnull=False).filter(_slot_window(now - timedelta(minutes=10), now + timedelta(hours=1)))
+
+    return _send_reminders(appointments)
+
+
+@shared_task
+def dispatch_appointment_events():
+    """
+    Background task that handles the appointment reminders and completions whose instant is due in the Redis schedule,
+    so idle periods cost no database queries. Re-arms itself for the next event due before the following beat tick.
+    """
+    now = timezone.now()
+    due = pop_due_appointment_events(now)
+
+    completed = 0
+    if due[COMPLETION_EVENT]:
+        completed = _complete_appointments(Appointment.objects.filter(id__in=due[COMPLETION_EVENT], status=AppointmentStatus.ONGOING.value))
+
+    reminded = 0
+    if due[REMINDER_EVENT]:
+        statuses = [AppointmentStatus.ONGOING.value, AppointmentStatus.COMPLETED.value]
+        reminded = _send_reminders(Appointment.objects.filter(id__in=due[REMINDER_EVENT], status__in=statuses, client__isnull=False, barber__isnull=False))
+
+    if len(due[COMPLETION_EVENT]) + len(due[REMINDER_EVENT]) == DISPATCH_BATCH_SIZE:
+        dispatch_appointment_events.delay()
+    else:
+        next_due = get_next_appointment_event_at()
+        if next_due is not None and next_due - now.timestamp() < settings.APPOINTMENT_DISPATCH_INTERVAL:
+            dispatch_appointment_events.apply_async(countdown=max(next_due - now.timestamp(), 0))
+
+    return {'completed': completed, 'reminded': reminded}
+
+
+@shared_task
+def deliver_appointment_reminders(appointment_ids):
+    """
+    Background task that queues the client and barber reminder emails of a batch of claimed appointments in the outbox.
+    Kept for the batches enqueued before the reminders went through the outbox.
+    """
+    appointments = Appointment.objects.filter(id__in=appointment_ids).select_related('client', 'barber')
+    return queue_appointment_reminder_emails(appointments)
+
+
+@shared_task
+def refresh_platform_statistics():
+    """
+    Background task that periodically refreshes the platform statistics snapshot read by the admin dashboard.
+    """
+    snapshot = PlatformStatistics.refresh()
+    return snapshot.to_dict()
+
+
+@shared_task
+def drain_email_outbox():
+    """
+    Background task that delivers the due emails of the outbox in batches, retrying failed ones with exponential backoff.
+    The batch is claimed first (see `EmailOutbox.claim_due()`), then sent over one connection outside of any
+    transaction, so concurrent drains never send the same email twice and no row stays locked during SMTP.
+    """
+    emails = EmailOutbox.claim_due(EMAIL_OUTBOX_BATCH_SIZE)
+
+    if not emails:
+        return 0
+
+    connection = get_connection()
+
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            email.mark_failed(error)
+        return 0
+
+    sent = 0
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([email.to_message()])
+            except Exception as error:
+                email.mark_failed(error)
+            else:
+                email.mark_sent()
+                sent += 1
+    finally:
+        connection.close()
+
+    # Keep draining while full batches come out
+    if len(emails) == EMAIL_OUTBOX_BATCH_SIZE:
+        drain_email_outbox.delay()
+
+    return sent
+
+
+@shared_task
+def prune_expired_tokens():
+    """
+    Background task that deletes the expired outstanding refresh tokens, along with their blacklist entries, in bounded
+    batches: an expired token is rejected by its signature check alone, so neither table needs to keep it.
+    Once done, deletes the user revocations older than the access tokens they revoke, and reloads the revoked tokens
+    cache from the blacklist and revocation tables, in case a revocation never made it there.
+    """
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now()).order_by('id')
+    ids = list(expired.values_list('id', flat=True)[:TOKEN_PRUNE_BATCH_SIZE])
+
+    deleted = {}
+    if ids:
+        # The blacklist entries are deleted by cascade, with the same IN list
+        _total, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+
+    # Keep pruning while full batches come out
+    if len(ids) == TOKEN_PRUNE_BATCH_SIZE:
+        prune_expired_tokens.delay()
+    else:
+        UserRevocation.objects.filter(revoked_at__lte=timezone.now() - jwt_settings.ACCESS_TOKEN_LIFETIME).delete()
+        load_revoked_tokens()
+
+    return {
+        'outstanding': deleted.get('token_blacklist.OutstandingToken', 0),
+        'blacklisted': deleted.get('token_blacklist.BlacklistedToken', 0),
+    }
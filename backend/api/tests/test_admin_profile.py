@@ -2,8 +2,11 @@ import datetime
 from decimal import Decimal
 from django.urls import reverse
 from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
+from api.tasks import drain_email_outbox
 from api.models import (
     Admin,
     Barber,
@@ -271,7 +274,8 @@ class AdminProfileTest(APITestCase):
         newbarber = Barber.objects.get(email=email)
         self.assertFalse(newbarber.is_active)
         
-        # Email send side effect: should have been called (if using real mail system)
+        # Email send side effect: queued in the outbox, then delivered by the drain task
+        drain_email_outbox()
         self.assertGreaterEqual(len(mail.outbox), 1)
         self.assertIn(email, mail.outbox[-1].to)
 
@@ -389,6 +393,67 @@ class AdminProfileTest(APITestCase):
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
 
 
+    def test_create_availability_range_uses_constant_queries(self):
+        """
+        A long date range should be written with the same number of queries as a short one.
+        """
+        self.login_as_admin()
+        url = reverse("create_barber_availability", kwargs={"barber_id": self.barber.id})
+        today = datetime.date.today()
+        Availability.objects.create(barber=self.barber, date=today, slots=["09:00"])
+
+        def post_range(days):
+            data = {
+                "start_date": str(today),
+                "end_date": str(today + datetime.timedelta(days=days)),
+                "start_time": "10:00",
+                "end_time": "12:00",
+                "slot_interval": 60,
+            }
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.post(url, data, format="json")
+            self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(post_range(2), post_range(60))
+        self.assertEqual(Availability.objects.filter(barber=self.barber).count(), 61)
+        self.assertEqual(Availability.objects.get(barber=self.barber, date=today).slots, ["10:00", "11:00"])
+
+
+    def test_create_availability_for_many_barbers(self):
+        """
+        Admin can publish the same availability for several barbers, or every active barber if none are given.
+        """
+        self.login_as_admin()
+        url = reverse("create_barbers_availability")
+        other_barber = Barber.objects.create_user(
+            username="barbtwo",
+            password="BarberTwo1!",
+            email="barber2@email.com",
+            is_active=True,
+        )
+        today = datetime.date.today()
+        data = {
+            "start_date": str(today),
+            "end_date": str(today + datetime.timedelta(days=6)),
+            "start_time": "10:00",
+            "end_time": "11:00",
+            "slot_interval": 30,
+            "days_of_week": [today.weekday()],
+        }
+        resp = self.client.post(url, data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        for barber in (self.barber, other_barber):
+            avail = Availability.objects.get(barber=barber)
+            self.assertEqual(avail.date, today)
+            self.assertEqual(avail.slots, ["10:00", "10:30"])
+        self.assertFalse(Availability.objects.filter(barber=self.barber_inactive).exists())
+
+        # Inactive or unknown barbers are rejected as a whole
+        resp = self.client.post(url, {**data, "barber_ids": [self.barber.id, self.barber_inactive.id]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
     def test_update_availability_success(self):
         """
         Admin can patch the slots of an availability by id, using start_time/end_time [slot_interval optional].
@@ -552,4 +617,178 @@ class AdminProfileTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         self.assertIn("appointments", response.data)
-        self.assertTrue(any(a["id"] == appointment_1.id for a in response.data["appointments"]))
\ No newline at end of file
+        self.assertTrue(any(a["id"] == appointment_1.id for a in response.data["appointments"]))
+
+    def test_admin_get_all_appointments_query_count_is_constant(self):
+        """
+        The number of queries for the appointments list does not grow with the number of appointments.
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        service_1 = Service.objects.create(barber=self.barber, name="Trim", price=Decimal("20.00"))
+        service_2 = Service.objects.create(barber=self.barber, name="Beard", price=Decimal("7.50"))
+
+        def _create_appointments(days):
+            for day in days:
+                appointment = Appointment.objects.create(
+                    client=self.client_user,
+                    barber=self.barber,
+                    date=datetime.date.today() - datetime.timedelta(days=day),
+                    slot=datetime.time(9, 0),
+                    status=AppointmentStatus.COMPLETED.value
+                )
+                for service in [service_1, service_2]:
+                    AppointmentService.objects.create(appointment=appointment, name=service.name, price=service.price, original_service=service)
+
+        self.login_as_admin()
+        _create_appointments(range(1, 3))
+
+        with CaptureQueriesContext(connection) as few_appointments:
+            response = self.client.get(self.all_appointments_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        _create_appointments(range(3, 13))
+
+        with CaptureQueriesContext(connection) as many_appointments:
+            response = self.client.get(self.all_appointments_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data["appointments"]), 12)
+        self.assertEqual(len(few_appointments.captured_queries), len(many_appointments.captured_queries))
+
+        # Output must match the per-appointment serialization
+        for appointment in Appointment.objects.all():
+            self.assertIn(appointment.to_dict(), response.data["appointments"])
+
+
+    def test_admin_get_all_appointments_cursor_pagination(self):
+        """
+        Admin can page through appointments with cursor/limit, the unpaginated list stays available.
+        """
+        for day in range(7):
+            Appointment.objects.create(
+                client=self.client_user,
+                barber=self.barber,
+                date=datetime.date.today() - datetime.timedelta(days=day),
+                slot=datetime.time(9, 0),
+                status=AppointmentStatus.COMPLETED.value
+            )
+
+        self.login_as_admin()
+
+        # Unpaginated response is unchanged
+        response = self.client.get(self.all_appointments_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["appointments"]), 7)
+        self.assertNotIn("next_cursor", response.data)
+
+        # Follow the cursors until the last page
+        pages = []
+        params = {"limit": 3}
+        while True:
+            response = self.client.get(self.all_appointments_url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([a["id"] for a in response.data["appointments"]])
+
+            if not response.data["next_cursor"]:
+                break
+            params = {"limit": 3, "cursor": response.data["next_cursor"]}
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        # The page query starts the index scan at the cursor with a bound on its first column
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.all_appointments_url, params)
+        page_query = next(query["sql"] for query in queries if 'FROM "api_appointment"' in query["sql"] and "LIMIT" in query["sql"])
+        self.assertIn('"api_appointment"."date" >=', page_query)
+        expected = list(Appointment.objects.order_by("date", "slot", "id").values_list("id", flat=True))
+        self.assertEqual([id for page in pages for id in page], expected)
+
+        # Invalid cursor or limit is rejected
+        response = self.client.get(self.all_appointments_url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.all_appointments_url, {"limit": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_admin_statistics_one_query_per_table(self):
+        """
+        Live admin statistics are computed with one aggregate query per table.
+        """
+        from api.models import PlatformStatistics
+
+        with self.assertNumQueries(4):
+            statistics = PlatformStatistics.compute()
+
+        self.assertEqual(statistics["total_clients"], 1)
+        self.assertEqual(statistics["total_barbers"], 1)
+
+
+    def test_admin_statistics_snapshot(self):
+        """
+        With the snapshot enabled, the dashboard reads the statistics refreshed by the periodic task.
+        """
+        from django.test import override_settings
+        from api.tasks import refresh_platform_statistics
+
+        refresh_platform_statistics()
+
+        Client.objects.create_user(
+            username="lateclient",
+            password="ClientPw11",
+            email="late@x.com",
+            name="Late",
+            surname="Client",
+            is_active=True,
+        )
+
+        self.login_as_admin()
+
+        with override_settings(PLATFORM_STATISTICS_SNAPSHOT=True):
+            response = self.client.get(self.manage_profile_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["profile"]["total_clients"], 1)
+
+            refresh_platform_statistics()
+
+            response = self.client.get(self.manage_profile_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["profile"]["total_clients"], 2)
+
+        # Without the snapshot statistics are always live
+        response = self.client.get(self.manage_profile_url)
+        self.assertEqual(response.data["profile"], self.admin.to_dict())
+
+
+    def test_request_metrics_server_timing_and_prometheus_endpoint(self):
+        """
+        Every response carries a Server-Timing header, and only admins can scrape the per-endpoint histograms.
+        """
+        import re
+        from api.utils import request_metrics
+
+        request_metrics.reset()
+        self.login_as_admin()
+
+        response = self.client.get(self.get_all_barbers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+, total;dur=[\d.]+$')
+        queries = int(re.search(r'desc="(\d+) queries"', response["Server-Timing"]).group(1))
+        self.assertGreater(queries, 0)
+
+        response = self.client.get(reverse("get_metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+        metrics = response.content.decode()
+        self.assertIn('barbermanager_requests_total{endpoint="get_all_barbers",method="GET",status="200"} 1', metrics)
+        self.assertIn(f'barbermanager_request_db_queries_sum{{endpoint="get_all_barbers"}} {queries}.000000', metrics)
+        self.assertIn('barbermanager_request_duration_seconds_bucket{endpoint="get_all_barbers",le="+Inf"} 1', metrics)
+        self.assertIn('barbermanager_response_size_bytes_count{endpoint="get_all_barbers"} 1', metrics)
+        self.assertIn("barbermanager_public_cache_hits", metrics)
+        self.assertIn("barbermanager_db_connections_opened", metrics)
+
+        self.login_as_client()
+        response = self.client.get(reverse("get_metrics"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
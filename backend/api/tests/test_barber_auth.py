@@ -6,6 +6,7 @@ from django.core import mail
 from django.conf import settings
 import re
 from api.models import User, Barber, Roles
+from api.tasks import drain_email_outbox
 
 @patch('django.core.mail.send_mail', return_value=1) 
 class BarberAuthFlowTest(APITestCase):
@@ -51,6 +52,9 @@ class BarberAuthFlowTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data.get('detail'), 'Barber invited successfully.')
 
+        # Deliver the invite queued in the outbox
+        drain_email_outbox()
+
         # Look for a link of the form: FRONTEND_URL/register/UID/TOKEN
         match = re.search(re.escape(settings.FRONTEND_URL) + r'/register/(?P<uidb64>[^/]+)/(?P<token>[^/\s]+)', mail.outbox[0].body)
         self.assertIsNotNone(match, "Verification link not found in email body")
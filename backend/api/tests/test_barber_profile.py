@@ -114,6 +114,25 @@ class BarberProfileTest(APITestCase):
         self.assertEqual(self.barber_user.description, "Changed3")
 
 
+    def test_update_profile_keeps_concurrent_rating_updates(self):
+        """
+        Saving a profile loaded before a review was added doesn't overwrite the rating aggregates.
+        """
+        self.login_as_barber()
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+
+        stale = Barber.objects.get(pk=self.barber_user.pk)
+        Barber.update_rating_aggregates(self.barber_user.pk, added=4)
+        stale.save()
+
+        resp = self.client.patch(self.profile_url, {"name": "Changed"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        self.barber_user.refresh_from_db()
+        self.assertEqual(self.barber_user.name, "Changed")
+        self.assertEqual((self.barber_user.review_count, self.barber_user.rating_sum, self.barber_user.rating_4_count), (1, 4, 1))
+
+
     def test_update_profile_username_unique_constraint(self):
         """
         Username cannot be changed to one in use.
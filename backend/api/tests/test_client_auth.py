@@ -6,6 +6,7 @@ from django.core import mail
 from django.conf import settings
 import re
 from api.models import User, Client
+from api.tasks import drain_email_outbox
 
 @patch('django.core.mail.send_mail', return_value=1) 
 class ClientAuthFlowTest(APITestCase):
@@ -43,6 +44,10 @@ class ClientAuthFlowTest(APITestCase):
         data = {'email': email, 'password': password, 'username': username, 'name': name, 'surname': surname}
         response = self.client.post(self.register_url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Deliver the verification email queued in the outbox
+        self.assertEqual(len(mail.outbox), 0)
+        drain_email_outbox()
         self.assertEqual(len(mail.outbox), 1)
 
         # Verify user is created but inactive
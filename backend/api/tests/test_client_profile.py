@@ -1,4 +1,5 @@
 import datetime
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -12,6 +13,7 @@ from api.models import (
     Appointment,
     Review,
     AppointmentStatus,
+    RevenueEntry,
     Roles
 )
 
@@ -138,6 +140,29 @@ class ClientProfileTest(APITestCase):
         self.assertEqual(self.client_user.phone_number, patch["phone_number"])
 
 
+    def test_update_profile_keeps_concurrent_revenue_updates(self):
+        """
+        Saving profiles loaded before an appointment completed doesn't overwrite the revenue running totals.
+        """
+        self.login_as_client()
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+        stale_barber = Barber.objects.get(pk=self.barber_user.pk)
+
+        service = Service.objects.create(barber=self.barber_user, name="Cut", price=50)
+        appointment = Appointment.objects.create(client=self.client_user, barber=self.barber_user, date=datetime.date.today(), slot=datetime.time(10, 0), status=AppointmentStatus.COMPLETED.value)
+        self.add_services(appointment, [service])
+        RevenueEntry.record_completed([appointment.pk])
+
+        resp = self.client.patch(self.profile_url, {"name": "Changed"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        stale_barber.save()
+
+        self.client_user.refresh_from_db()
+        self.barber_user.refresh_from_db()
+        self.assertEqual(self.client_user.name, "Changed")
+        self.assertEqual((self.client_user.spent_total, self.barber_user.revenue_total), (50, 50))
+
+
     def test_update_profile_username_unique_constraint(self):
         """
         Username cannot be changed to one in use.
@@ -647,4 +672,121 @@ class ClientProfileTest(APITestCase):
         url = reverse("manage_client_reviews", kwargs={"review_id": 34901})
         resp = self.client.delete(url)
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("does not exist", str(resp.data["detail"]))
\ No newline at end of file
+        self.assertIn("does not exist", str(resp.data["detail"]))
+
+
+    @override_settings(USER_CACHE_TIMEOUT=0)
+    def test_create_appointment_query_count_does_not_grow_with_services(self):
+        """
+        Services are resolved with one query and their line items inserted in bulk (the client is loaded by both
+        requests, without the user cache).
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        services = [Service.objects.create(barber=self.barber_user, name=f"S{i}", price=5 + i) for i in range(4)]
+        today = datetime.date.today()
+        Availability.objects.create(barber=self.barber_user, date=today, slots=["09:00"])
+        Availability.objects.create(barber=self.barber_user, date=today + datetime.timedelta(days=1), slots=["09:00"])
+        url = reverse("create_client_appointment", kwargs={"barber_id": self.barber_user.id})
+
+        self.login_as_client()
+        with CaptureQueriesContext(connection) as one_service:
+            resp = self.client.post(url, {"date": today, "slot": "09:00", "services": [services[0].id]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        Appointment.objects.filter(client=self.client_user).update(status=AppointmentStatus.COMPLETED.value)
+
+        with CaptureQueriesContext(connection) as many_services:
+            resp = self.client.post(url, {"date": today + datetime.timedelta(days=1), "slot": "09:00", "services": [s.id for s in services]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(len(one_service.captured_queries), len(many_services.captured_queries))
+        self.assertEqual(AppointmentService.objects.filter(appointment__date=today + datetime.timedelta(days=1)).count(), 4)
+
+
+    def test_create_appointment_returns_409_when_slot_taken_concurrently(self):
+        """
+        A slot booked by someone else between validation and booking returns 409, not a 500.
+        """
+        from unittest.mock import patch
+        from api.utils import AppointmentValidationMixin
+
+        service = Service.objects.create(barber=self.barber_user, name="Cut", price=9)
+        today = datetime.date.today()
+        Availability.objects.create(barber=self.barber_user, date=today, slots=["09:00"])
+        url = reverse("create_client_appointment", kwargs={"barber_id": self.barber_user.id})
+        data = {"date": today, "slot": "09:00", "services": [service.id]}
+        validate = AppointmentValidationMixin.validate_appointment_date_and_slot
+
+        def validate_then_lose_race(serializer, attrs):
+            attrs = validate(serializer, attrs)
+            Appointment.objects.create(client=self.client_user_other, barber=self.barber_user, date=today, slot=datetime.time(9, 0))
+            return attrs
+
+        self.login_as_client()
+
+        # Caught by the re-check under the availability lock
+        with patch.object(AppointmentValidationMixin, "validate_appointment_date_and_slot", validate_then_lose_race):
+            resp = self.client.post(url, data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("already exists", str(resp.data["detail"]))
+
+        # Caught by the unique constraint if the re-check is bypassed
+        Appointment.objects.all().delete()
+        with patch.object(AppointmentValidationMixin, "validate_appointment_date_and_slot", validate_then_lose_race), \
+             patch.object(AppointmentValidationMixin, "_get_appointment_conflict", return_value=None):
+            resp = self.client.post(url, data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("booked concurrently", str(resp.data["detail"]))
+
+        self.assertFalse(Appointment.objects.filter(client=self.client_user).exists())
+
+
+    def test_review_changes_keep_barber_rating_aggregates_in_sync(self):
+        """
+        Creating, editing and deleting reviews updates the barber's count, sum and histogram in place.
+        """
+        from io import StringIO
+        from django.core.management import call_command
+
+        service = Service.objects.create(barber=self.barber_user, name="Fade", price=12)
+        appointment = Appointment.objects.create(
+            client=self.client_user,
+            barber=self.barber_user,
+            date=datetime.date.today(),
+            slot=datetime.time(17, 0),
+            status=AppointmentStatus.COMPLETED.value
+        )
+        self.add_services(appointment, [service])
+        Review.objects.create(client=self.client_user_other, barber=self.barber_user, rating=2)
+
+        self.login_as_client()
+        resp = self.client.post(reverse("create_client_review", kwargs={"barber_id": self.barber_user.id}), {"rating": 5}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.barber_user.refresh_from_db()
+        self.assertEqual((self.barber_user.review_count, self.barber_user.rating_sum), (2, 7))
+        self.assertEqual(self.barber_user.average_rating, 3.5)
+        self.assertEqual(self.barber_user.rating_histogram, {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1})
+
+        review = Review.objects.get(client=self.client_user, barber=self.barber_user)
+        url = reverse("manage_client_reviews", kwargs={"review_id": review.id})
+        resp = self.client.patch(url, {"rating": 4}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.barber_user.refresh_from_db()
+        self.assertEqual((self.barber_user.review_count, self.barber_user.rating_sum), (2, 6))
+        self.assertEqual(self.barber_user.rating_histogram, {"1": 0, "2": 1, "3": 0, "4": 1, "5": 0})
+
+        resp = self.client.delete(url)
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.barber_user.refresh_from_db()
+        self.assertEqual((self.barber_user.review_count, self.barber_user.rating_sum), (1, 2))
+        self.assertEqual(self.barber_user.average_rating, 2.0)
+
+        # Drifted aggregates (e.g. after a raw SQL fix) are recomputed from the reviews table
+        Barber.objects.filter(pk=self.barber_user.pk).update(review_count=10, rating_sum=0, rating_5_count=3)
+        out = StringIO()
+        call_command("rebuild_rating_aggregates", stdout=out)
+        self.assertIn("Rebuilt the rating aggregates", out.getvalue())
+        self.barber_user.refresh_from_db()
+        self.assertEqual((self.barber_user.review_count, self.barber_user.rating_sum), (1, 2))
+        self.assertEqual(self.barber_user.rating_histogram, {"1": 0, "2": 1, "3": 0, "4": 0, "5": 0})
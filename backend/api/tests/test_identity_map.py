@@ -0,0 +1,139 @@
+import datetime
+from celery.signals import task_prerun, task_postrun
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.backends.tokens import RoleRefreshToken
+from api.middleware import IdentityMapMiddleware
+from api.models import User, Barber, Client, Service, Appointment, AppointmentService, AppointmentStatus, RevenueEntry
+from api.utils import get_identity_map, get_instance, identity_map_scope, request_metrics
+
+
+class IdentityMapTest(APITestCase):
+    """
+    Tests that rows looked up by primary key are fetched at most once per request or task.
+    """
+    def setUp(self):
+        self.barber = Barber.objects.create_user(username='mapbarber', email='mapbarber@example.com', password='StrongPassw0rd!', is_active=True)
+        self.service = Service.objects.create(barber=self.barber, name='Cut', price=10)
+
+
+    def test_rows_are_fetched_once_per_scope(self):
+        """
+        A second lookup of the same row returns the same instance without a query, and counts as a saved fetch.
+        """
+        with identity_map_scope() as identity_map:
+            with self.assertNumQueries(1):
+                first = get_instance(Barber, self.barber.pk, is_active=True)
+                second = get_instance(Barber, str(self.barber.pk), is_active=True)
+
+            self.assertIs(first, second)
+            self.assertEqual((identity_map.hits, identity_map.misses), (1, 1))
+
+            # Another model is another identity
+            with self.assertNumQueries(1):
+                self.assertIs(type(get_instance(User, self.barber.pk)), User)
+
+        self.assertIsNone(get_identity_map())
+
+        # Outside of a scope, every lookup queries
+        with self.assertNumQueries(2):
+            get_instance(Barber, self.barber.pk)
+            get_instance(Barber, self.barber.pk)
+
+
+    def test_filters_are_checked_on_loaded_rows(self):
+        """
+        A loaded row not matching the filters of a later lookup is reported missing, as the query would.
+        """
+        with identity_map_scope():
+            get_instance(Service, self.service.pk, barber_id=self.barber.pk)
+
+            with self.assertNumQueries(0), self.assertRaises(Service.DoesNotExist):
+                get_instance(Service, self.service.pk, barber_id=self.barber.pk + 1)
+
+
+    def test_saved_and_deleted_rows_are_fetched_again(self):
+        """
+        Saving or deleting a row drops it from the identity map, along with its parent User row.
+        """
+        with identity_map_scope():
+            get_instance(Barber, self.barber.pk)
+            get_instance(User, self.barber.pk)
+
+            Barber.objects.get(pk=self.barber.pk).save()
+
+            with self.assertNumQueries(2):
+                get_instance(Barber, self.barber.pk)
+                get_instance(User, self.barber.pk)
+
+            get_instance(Service, self.service.pk)
+            self.service.delete()
+
+            with self.assertRaises(Service.DoesNotExist):
+                get_instance(Service, self.service.pk)
+
+
+    def test_requests_and_tasks_get_their_own_identity_map(self):
+        """
+        Each request and Celery task runs with a fresh identity map, dropped when it ends. The fetches saved by the
+        requests are reported in the metrics.
+        """
+        def view(request):
+            get_instance(Barber, self.barber.pk)
+            get_instance(Barber, self.barber.pk)
+            return HttpResponse()
+
+        saved = request_metrics.identity_map_hits
+        IdentityMapMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(request_metrics.identity_map_hits, saved + 1)
+
+        token = RoleRefreshToken.for_user(self.barber).access_token
+        response = self.client.get(reverse('manage_barber_services'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(get_identity_map())
+
+        task_prerun.send(sender=None, task_id='id', task=None)
+        identity_map = get_identity_map()
+        self.assertIsNotNone(identity_map)
+
+        get_instance(Barber, self.barber.pk)
+        get_instance(Barber, self.barber.pk)
+        self.assertEqual(identity_map.hits, 1)
+
+        task_postrun.send(sender=None, task_id='id', task=None)
+        self.assertIsNone(get_identity_map())
+
+
+    def test_tasks_restore_the_identity_map_they_replaced(self):
+        """
+        A task run eagerly inside a request gets its own identity map, and gives the request's back when it ends.
+        """
+        with identity_map_scope() as identity_map:
+            task_prerun.send(sender=None, task_id='eager', task=None)
+            self.assertIsNot(get_identity_map(), identity_map)
+
+            task_postrun.send(sender=None, task_id='eager', task=None)
+            self.assertIs(get_identity_map(), identity_map)
+
+
+    def test_counter_updates_drop_rows(self):
+        """
+        The rating and revenue counters are updated in the database only, their rows are fetched again afterwards.
+        """
+        client = Client.objects.create_user(username='mapclient', email='mapclient@example.com', password='StrongPassw0rd!', is_active=True)
+        appointment = Appointment.objects.create(client=client, barber=self.barber, date=datetime.date.today(), slot=datetime.time(10, 0), status=AppointmentStatus.COMPLETED.value)
+        AppointmentService.objects.create(appointment=appointment, original_service=self.service, name=self.service.name, price=self.service.price)
+
+        with identity_map_scope():
+            get_instance(Barber, self.barber.pk)
+            get_instance(Client, client.pk)
+
+            Barber.update_rating_aggregates(self.barber.pk, added=5)
+            self.assertEqual(get_instance(Barber, self.barber.pk).review_count, 1)
+
+            RevenueEntry.record_completed([appointment.pk])
+            self.assertEqual(get_instance(Barber, self.barber.pk).revenue_total, 10)
+            self.assertEqual(get_instance(Client, client.pk).spent_total, 10)
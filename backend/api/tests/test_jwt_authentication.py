@@ -0,0 +1,206 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from api.backends.tokens import LazyTokenUser, RoleJWTAuthentication, RoleRefreshToken
+from api.models import User, Admin, Barber, Client, Roles
+from api.utils import IsAdminRole, IsBarberRole, IsClientRole, user_cache, load_revoked_tokens
+
+
+class RoleJWTAuthenticationTest(APITestCase):
+    """
+    Tests that the JWT authentication trusts the token claims for the permissions, and loads users as their role
+    model, in a single query, only when needed.
+    """
+    def setUp(self):
+        user_cache.clear()
+        cache.clear()
+        load_revoked_tokens()
+        self.password = 'StrongPassw0rd!'
+        self.barber = Barber.objects.create_user(username='jwtbarber', email='jwtbarber@example.com', password=self.password, is_active=True)
+        self.client_user = Client.objects.create_user(username='jwtclient', email='jwtclient@example.com', password=self.password, is_active=True)
+        self.admin = User.objects.create_superuser(username='jwtadmin', password=self.password)
+
+
+    def authenticate(self, token, method='get'):
+        request = getattr(APIRequestFactory(), method)('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _token = RoleJWTAuthentication().authenticate(request)
+        return user
+
+
+    def test_login_and_refreshed_tokens_carry_the_claims(self):
+        """
+        The access tokens issued at login, and the ones refreshed from its refresh token, carry the user's role and
+        active status.
+        """
+        response = self.client.post(reverse('login_user'), {'username': 'jwtbarber', 'password': self.password}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = AccessToken(response.data['token']['access_token'])
+        self.assertEqual((token['role'], token['is_active']), (Roles.BARBER.value, True))
+
+        response = self.client.post(reverse('refresh_token'), {'refresh_token': response.data['token']['refresh_token']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = AccessToken(response.data['access_token'])
+        self.assertEqual((token['role'], token['is_active']), (Roles.BARBER.value, True))
+
+
+    def test_permission_checks_run_no_query(self):
+        """
+        The role permissions are decided from the token claims, without loading the user.
+        """
+        request = APIRequestFactory().get('/')
+
+        permissions = {Roles.BARBER.value: IsBarberRole, Roles.CLIENT.value: IsClientRole, Roles.ADMIN.value: IsAdminRole}
+
+        for user in [self.barber, self.client_user, self.admin]:
+            token = RoleRefreshToken.for_user(user).access_token
+
+            with self.subTest(role=user.role), self.assertNumQueries(0):
+                request.user = self.authenticate(token)
+
+                for role, permission in permissions.items():
+                    self.assertEqual(permission().has_permission(request, None), role == user.role)
+                self.assertEqual(request.user.pk, user.pk)
+
+
+    def test_role_model_is_loaded_in_one_query(self):
+        """
+        Barbers, clients and admins are loaded as their own model, with a single query, on first use.
+        """
+        for user, model in [(self.barber, Barber), (self.client_user, Client), (self.admin, Admin)]:
+            authenticated = self.authenticate(RoleRefreshToken.for_user(user).access_token)
+            self.assertIs(type(authenticated), LazyTokenUser)
+
+            with self.subTest(role=user.role), self.assertNumQueries(1):
+                self.assertIsInstance(authenticated, model)
+
+            self.assertIs(type(authenticated.resolve()), model)
+            self.assertEqual(authenticated.username, user.username)
+
+
+    def test_loaded_users_are_cached_until_saved(self):
+        """
+        Requests with the same token reuse the loaded user, until it is saved.
+        """
+        token = RoleRefreshToken.for_user(self.barber).access_token
+        self.authenticate(token).resolve()
+
+        with self.assertNumQueries(0):
+            cached = self.authenticate(token).resolve()
+        self.assertEqual(cached.name, self.barber.name)
+
+        # Copies, a request's changes don't leak into the next ones
+        cached.name = 'Changed'
+        self.assertNotEqual(self.authenticate(token).resolve().name, 'Changed')
+
+        self.barber.name = 'Renamed'
+        self.barber.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(token).resolve().name, 'Renamed')
+
+        with override_settings(USER_CACHE_TIMEOUT=0):
+            user_cache.clear()
+            self.authenticate(token).resolve()
+
+            with self.assertNumQueries(1):
+                self.authenticate(token).resolve()
+
+
+    def test_inactive_claim_is_rejected(self):
+        """
+        Tokens of inactive users are rejected without querying.
+        """
+        self.barber.is_active = False
+        token = RoleRefreshToken.for_user(self.barber).access_token
+
+        with self.assertNumQueries(0), self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+
+    def test_role_claim_saves_a_query_per_request(self):
+        """
+        Serializers reuse the authenticated role model, a request runs one query less than with a token without role,
+        which loads a plain User the serializer has to JOIN to its role model.
+        """
+        url = reverse('get_barber_reviews')
+
+        counts = []
+        tokens = [AccessToken.for_user(self.barber), RoleRefreshToken.for_user(self.barber).access_token]
+
+        for token in tokens:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[1], counts[0] - 1)
+
+
+    def test_user_without_role_row_falls_back_to_user(self):
+        """
+        A user whose role has no row in the role's table (e.g. an admin created as a plain User) still authenticates.
+        """
+        user = User.objects.create_user(username='plainadmin', password=self.password, role=Roles.ADMIN.value, is_active=True)
+
+        authenticated = self.authenticate(RoleRefreshToken.for_user(user).access_token).resolve()
+
+        self.assertIs(type(authenticated), User)
+        self.assertEqual(authenticated.pk, user.pk)
+
+
+    def test_writes_load_the_user_from_the_database(self):
+        """
+        Unsafe methods never get a cached user, which may be up to USER_CACHE_TIMEOUT seconds old.
+        """
+        token = RoleRefreshToken.for_user(self.barber).access_token
+        self.authenticate(token).resolve()
+
+        with self.assertNumQueries(0):
+            self.authenticate(token).resolve()
+
+        for method in ['post', 'put', 'patch', 'delete']:
+            with self.subTest(method=method), self.assertNumQueries(1):
+                self.authenticate(token, method).resolve()
+
+
+    def test_deactivated_or_deleted_users_tokens_are_revoked(self):
+        """
+        Access tokens issued before their user was deactivated or deleted are rejected, even by views trusting the
+        claims, including once the cache was emptied.
+        """
+        url = reverse('get_all_clients')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RoleRefreshToken.for_user(self.admin).access_token}'}
+        self.assertEqual(self.client.get(url, **headers).status_code, status.HTTP_200_OK)
+
+        self.admin.is_active = False
+        self.admin.save()
+
+        self.assertEqual(self.client.get(url, **headers).status_code, status.HTTP_401_UNAUTHORIZED)
+        cache.clear()
+        self.assertEqual(self.client.get(url, **headers).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        token = RoleRefreshToken.for_user(self.barber).access_token
+        self.barber.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+
+    def test_users_are_checked_in_the_database_without_cache(self):
+        """
+        If the cache is unavailable, the user is loaded right away, so a deactivated user is still rejected.
+        """
+        token = RoleRefreshToken.for_user(self.barber).access_token
+        User.objects.filter(pk=self.barber.pk).update(is_active=False)
+
+        with patch('api.utils.cache.cache.get_many', side_effect=ConnectionError), self.assertLogs('api.utils.cache', 'ERROR'):
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(token)
@@ -0,0 +1,65 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase
+from api.models import (
+    Barber,
+    Client,
+    Appointment,
+    AppointmentService,
+    AppointmentStatus,
+    Review,
+    RevenueEntry,
+)
+
+
+class LoadCommandsTest(TestCase):
+    """
+    Tests for the `seed_load` synthetic data generator and the `bench` endpoint benchmark.
+    """
+
+    def seed(self, **options):
+        options = {"barbers": 3, "clients": 20, "appointments": 200, "reviews": 30, "batch_size": 50, **options}
+        call_command("seed_load", stdout=StringIO(), **options)
+
+    def test_seed_load_creates_consistent_volumes(self):
+        """
+        Generates the requested volumes without breaking the booking constraints, with aggregates and ledger filled.
+        """
+        self.seed()
+
+        self.assertEqual(Barber.objects.filter(username__startswith="load_").count(), 3)
+        self.assertEqual(Client.objects.filter(username__startswith="load_").count(), 20)
+        self.assertEqual(Appointment.objects.count(), 200)
+        self.assertEqual(Review.objects.count(), 30)
+        self.assertFalse(Appointment.objects.filter(line_items__isnull=True).exists())
+
+        completed = Appointment.objects.filter(status=AppointmentStatus.COMPLETED.value)
+        revenue = AppointmentService.objects.filter(appointment__in=completed).aggregate(total=Sum("price"))["total"]
+        self.assertEqual(RevenueEntry.objects.count(), completed.count())
+        self.assertEqual(Barber.objects.aggregate(total=Sum("revenue_total"))["total"], revenue)
+        self.assertEqual(Barber.objects.aggregate(total=Sum("review_count"))["total"], 30)
+
+        # Seeded usernames can't be reused
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_bench_reports_every_read_only_endpoint(self):
+        """
+        Benchmarks the readable endpoints as the seeded users, and lists the ones that would modify data as skipped.
+        """
+        self.seed()
+        out = StringIO()
+        call_command("bench", repeat=2, warmup=0, stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+
+        for name in ["get_barbers_list", "manage_admin_profile", "manage_barber_profile", "manage_client_profile", "get_barber_slots_public", "login_user"]:
+            self.assertEqual(report["endpoints"][name]["status"], 200, name)
+            self.assertGreater(report["endpoints"][name]["queries"], 0)
+            self.assertGreaterEqual(report["endpoints"][name]["p95_ms"], report["endpoints"][name]["p50_ms"])
+            self.assertGreater(report["endpoints"][name]["peak_memory_kb"], 0)
+
+        self.assertIn("create_client_appointment", report["skipped"])
+        self.assertNotIn("create_client_appointment", report["endpoints"])
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import User, Client, Roles
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginTest(APITestCase):
+    """
+    Tests that logins look the user up with a single query, hash the password once and return a lightweight payload.
+    """
+    def setUp(self):
+        self.login_url = reverse('login_user')
+        self.password = 'StrongPassw0rd!'
+        self.client_user = Client.objects.create_user(username='logintest', email='logintest@example.com', password=self.password, is_active=True)
+
+
+    def login(self, **credentials):
+        return self.client.post(self.login_url, {'password': self.password, **credentials}, format='json')
+
+
+    def count_hashes(self, **credentials):
+        """
+        Logs in, returns the response and the number of times the password was hashed.
+        """
+        with patch.object(MD5PasswordHasher, 'encode', autospec=True, side_effect=MD5PasswordHasher.encode) as encode:
+            response = self.login(**credentials)
+
+        return response, encode.call_count
+
+
+    def test_login_payload_is_lightweight(self):
+        """
+        The login returns the tokens and only what identifies the user.
+        """
+        response = self.login(email='logintest@example.com')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], {'id': self.client_user.id, 'role': Roles.CLIENT.value, 'username': 'logintest'})
+        self.assertEqual(set(response.data['token']), {'access_token', 'refresh_token', 'expires_in', 'refresh_expires_in', 'token_type'})
+
+
+    def test_user_is_looked_up_in_one_query(self):
+        """
+        Logging in runs the user lookup and the outstanding token insert, whether by username or email.
+        """
+        for credentials in [{'username': 'logintest'}, {'email': 'logintest@example.com'}]:
+            with self.subTest(**credentials), self.assertNumQueries(2):
+                response = self.login(**credentials)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+    def test_username_takes_precedence_over_email(self):
+        """
+        An identifier matching both a username and another user's email logs in the username's owner.
+        """
+        other = User.objects.create_user(username='otheruser', email='logintest', password='OtherPassw0rd!', is_active=True)
+
+        self.assertEqual(authenticate(username='logintest', password=self.password).pk, self.client_user.pk)
+        self.assertIsNone(authenticate(username='logintest', password='OtherPassw0rd!'))
+        self.assertEqual(authenticate(username='otheruser', password='OtherPassw0rd!').pk, other.pk)
+
+
+    def test_password_is_hashed_once_per_attempt(self):
+        """
+        Successful and failed logins hash the password once, also for unknown users (no fallback backend hashing again).
+        """
+        cases = [
+            ({'username': 'logintest'}, status.HTTP_200_OK),
+            ({'username': 'logintest', 'password': 'WrongPassw0rd!'}, status.HTTP_403_FORBIDDEN),
+            ({'username': 'nobody'}, status.HTTP_403_FORBIDDEN),
+        ]
+
+        for credentials, expected in cases:
+            with self.subTest(**credentials):
+                response, hashes = self.count_hashes(**credentials)
+
+                self.assertEqual(response.status_code, expected)
+                self.assertEqual(hashes, 1)
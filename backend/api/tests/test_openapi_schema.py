@@ -0,0 +1,88 @@
+import os
+import tempfile
+from unittest import mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.views import SpectacularJSONAPIView
+
+
+class OpenAPISchemaTests(APITestCase):
+    """
+    Tests that the OpenAPI schema is generated once and served with HTTP caching headers.
+    """
+
+    def setUp(self):
+        self.url = reverse('schema')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'openapi.json')
+
+        # Served schema is kept in memory across requests (and tests)
+        SpectacularJSONAPIView._schema = None
+        self.addCleanup(setattr, SpectacularJSONAPIView, '_schema', None)
+
+    def count_generations(self):
+        return mock.patch.object(SpectacularJSONAPIView, 'generate_schema', autospec=True, side_effect=SpectacularJSONAPIView.generate_schema)
+
+    def test_schema_is_generated_once_into_the_file(self):
+        """
+        The first request writes the schema file, the next ones serve it without introspecting the views again.
+        """
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path), self.count_generations() as generate:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertIn(b'"openapi"', first.content)
+
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), first.content)
+
+    def test_schema_is_regenerated_when_the_file_is_deleted(self):
+        """
+        Deleting the file (e.g. on deployment) refreshes the schema served.
+        """
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path), self.count_generations() as generate:
+            self.client.get(self.url)
+            os.remove(self.path)
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(generate.call_count, 2)
+        self.assertTrue(os.path.exists(self.path))
+
+    @override_settings(OPENAPI_SCHEMA_FILE='', OPENAPI_SCHEMA_MAX_AGE=3600)
+    def test_schema_is_served_with_caching_headers(self):
+        """
+        The schema has an ETag, a Last-Modified and a long max-age, revalidating it returns an empty 304.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=3600', response['Cache-Control'])
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b'')
+
+        not_modified = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        modified = self.client.get(self.url, HTTP_IF_NONE_MATCH='"outdated"')
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+
+    @override_settings(OPENAPI_SCHEMA_FILE='')
+    def test_authenticated_endpoints_declare_the_bearer_scheme(self):
+        """
+        Endpoints authenticated with `RoleJWTAuthentication` are documented with the JWT bearer security scheme.
+        """
+        schema = self.client.get(self.url).json()
+
+        self.assertEqual(schema['components']['securitySchemes']['jwtAuth'], {'type': 'http', 'scheme': 'bearer', 'bearerFormat': 'JWT'})
+        self.assertIn({'jwtAuth': []}, schema['paths']['/auth/me/']['get']['security'])
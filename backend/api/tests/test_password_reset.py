@@ -8,6 +8,7 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 import re
 from api.models import User
+from api.tasks import drain_email_outbox
 
 
 class PasswordResetTest(APITestCase):
@@ -39,6 +40,7 @@ class PasswordResetTest(APITestCase):
         response = self.client.post(self.reset_request_url, {'email': self.user_email}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('detail', response.data)
+        drain_email_outbox()
 
         # Look for a link of the form: FRONTEND_URL/reset-password/UID/TOKEN
         match = re.search(re.escape(settings.FRONTEND_URL) + r'/reset-password/(?P<uidb64>[^/]+)/(?P<token>[^/\s]+)', mail.outbox[0].body)
@@ -1,5 +1,9 @@
+import asyncio
 import datetime
+import re
+from asgiref.sync import sync_to_async
 from decimal import Decimal
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -84,6 +88,8 @@ class PublicEndpointsTest(APITestCase):
             rating=4,
             comment="Awesome cut!"
         )
+        # Rating aggregates are updated in the database with F expressions
+        self.barber1.refresh_from_db()
 
         # Api endpoints
         self.barber_list_url = reverse("get_barbers_list")
@@ -271,3 +277,223 @@ class PublicEndpointsTest(APITestCase):
             resp = self.client.get(url)
             self.assertNotEqual(resp.status_code, status.HTTP_200_OK)  # Return 400
             self.assertIn("does not exist", str(resp.data["detail"]).lower())
+
+
+    def _create_barber_with_history(self, suffix):
+        """
+        Helper that creates an active barber with services, completed/upcoming appointments and a review.
+        """
+        barber = Barber.objects.create_user(
+            username=f"barber_load_{suffix}",
+            email=f"load{suffix}@barbershop.com",
+            password="pw",
+            name="Load",
+            surname=str(suffix),
+            is_active=True
+        )
+        service = Service.objects.create(barber=barber, name="Cut", price=Decimal("20.00"))
+        client = Client.objects.create_user(
+            username=f"client_load_{suffix}",
+            email=f"client_load{suffix}@foo.com",
+            password="pw",
+            name="C",
+            surname=str(suffix),
+            is_active=True
+        )
+
+        completed = Appointment.objects.create(client=client, barber=barber, date=datetime.date.today() - datetime.timedelta(days=1), slot=datetime.time(10, 0), status=AppointmentStatus.COMPLETED.value)
+        upcoming = Appointment.objects.create(client=client, barber=barber, date=datetime.date.today() + datetime.timedelta(days=1), slot=datetime.time(11, 0))
+        self.add_services(completed, [service])
+        self.add_services(upcoming, [service])
+
+        Review.objects.create(client=client, barber=barber, rating=5, comment="Great")
+        return barber
+
+
+    def test_get_barbers_list_query_count_is_constant(self):
+        """
+        The number of queries for the barber list does not grow with the number of barbers.
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._create_barber_with_history(1)
+
+        with CaptureQueriesContext(connection) as few_barbers:
+            response = self.client.get(self.barber_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for suffix in range(2, 7):
+            self._create_barber_with_history(suffix)
+
+        with CaptureQueriesContext(connection) as many_barbers:
+            response = self.client.get(self.barber_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data["barbers"]), 8)
+        self.assertEqual(len(few_barbers.captured_queries), len(many_barbers.captured_queries))
+
+        # Output must match the per-barber serialization
+        for barber in Barber.objects.filter(is_active=True):
+            self.assertIn(self.barber_to_private(barber.to_dict()), response.data["barbers"])
+
+
+    def test_get_barbers_list_cursor_pagination(self):
+        """
+        Public barber list can be paged with cursor/limit.
+        """
+        response = self.client.get(self.barber_list_url, {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["barbers"], [self.barber_to_private(self.barber1.to_dict())])
+        self.assertIsNotNone(response.data["next_cursor"])
+
+        response = self.client.get(self.barber_list_url, {"limit": 1, "cursor": response.data["next_cursor"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["barbers"], [self.barber_to_private(self.barber2.to_dict())])
+        self.assertIsNone(response.data["next_cursor"])
+
+
+    def test_get_barber_slots_public_removes_booked_slots(self):
+        """
+        Slots are rendered as "HH:MM" strings, booked (non-cancelled) slots are removed.
+        """
+        url = reverse("get_barber_slots_public", kwargs={'barber_id': self.barber1.id})
+        Appointment.objects.create(client=self.client_user, barber=self.barber1, date=self.availability1.date, slot=datetime.time(9, 0))
+
+        resp = self.client.post(url, {"date": str(self.availability1.date)}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["slots"], ["10:00"])
+
+        Appointment.objects.filter(barber=self.barber1, date=self.availability1.date).update(status=AppointmentStatus.CANCELLED.value)
+
+        resp = self.client.post(url, {"date": str(self.availability1.date)}, format="json")
+        self.assertEqual(resp.data["slots"], ["09:00", "10:00"])
+
+
+    def test_availability_slots_bitmask_roundtrip(self):
+        """
+        Slots stored as a minutes bitmask are returned ordered and unchanged.
+        """
+        availability = Availability.objects.create(barber=self.barber2, date=datetime.date.today() + datetime.timedelta(days=5), slots=["23:59", "00:00", "10:10"])
+        availability.refresh_from_db()
+
+        self.assertEqual(availability.slots, ["00:00", "10:10", "23:59"])
+        self.assertTrue(availability.has_slot(datetime.time(10, 10)))
+        self.assertFalse(availability.has_slot(datetime.time(10, 11)))
+
+
+    def test_search_slots_public_earliest_across_barbers(self):
+        """
+        Shop-wide search returns the earliest free slots across active barbers, skipping booked slots and filtering by service.
+        """
+        url = reverse("search_slots_public")
+        day1, day3 = self.availability1.date, self.availability3.date
+        Availability.objects.create(barber=self.barber_inactive, date=day1, slots=["08:00"])
+        Appointment.objects.create(client=self.client_user, barber=self.barber1, date=day1, slot=datetime.time(9, 0))
+
+        resp = self.client.get(url, {"limit": 3})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["slots"], [
+            {"barber_id": self.barber1.id, "date": day1, "slot": "10:00"},
+            {"barber_id": self.barber1.id, "date": self.availability2.date, "slot": "16:00"},
+            {"barber_id": self.barber2.id, "date": day3, "slot": "12:00"},
+        ])
+
+        resp = self.client.get(url, {"service": "kids cut"})
+        self.assertEqual(resp.data["slots"], [{"barber_id": self.barber2.id, "date": day3, "slot": "12:00"}])
+
+        resp = self.client.get(url, {"date": str(datetime.date.today() - datetime.timedelta(days=1))})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_search_slots_public_query_count_is_constant(self):
+        """
+        The number of queries for the shop-wide search does not grow with the number of barbers.
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse("search_slots_public")
+        params = {"date": str(datetime.date.today() + datetime.timedelta(days=30)), "limit": 50}
+
+        with CaptureQueriesContext(connection) as few_barbers:
+            self.client.get(url, params)
+
+        for suffix in range(1, 6):
+            barber = self._create_barber_with_history(suffix)
+            Availability.objects.create(barber=barber, date=datetime.date.today() + datetime.timedelta(days=40), slots=["09:00"])
+
+        with CaptureQueriesContext(connection) as many_barbers:
+            resp = self.client.get(url, params)
+
+        self.assertEqual(len(resp.data["slots"]), 5)
+        self.assertEqual(len(few_barbers.captured_queries), len(many_barbers.captured_queries))
+
+
+    def test_public_responses_are_cached_and_invalidated_by_signals(self):
+        """
+        Public responses are served from the cache until a related model changes.
+        """
+        from django.core.cache import cache
+        from api.utils import get_public_cache_stats
+
+        cache.clear()
+        services_url = reverse("get_barber_services_public", kwargs={'barber_id': self.barber1.id})
+        other_services_url = reverse("get_barber_services_public", kwargs={'barber_id': self.barber2.id})
+        self.client.get(other_services_url)
+
+        resp = self.client.get(services_url)
+        self.assertEqual(resp["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(services_url)
+        self.assertEqual(resp["X-Cache"], "HIT")
+        self.assertEqual(len(resp.data["services"]), 2)
+
+        # Only the barber owning the service is invalidated
+        Service.objects.create(barber=self.barber1, name="Beard", price=Decimal("12.00"))
+        resp = self.client.get(services_url)
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(len(resp.data["services"]), 3)
+        self.assertEqual(self.client.get(other_services_url)["X-Cache"], "HIT")
+
+        # The barbers list embeds every barber, so any barber change invalidates it
+        self.assertEqual(self.client.get(self.barber_list_url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(self.barber_list_url)["X-Cache"], "HIT")
+        Review.objects.create(client=self.client_user, barber=self.barber2, rating=4)
+        self.assertEqual(self.client.get(self.barber_list_url)["X-Cache"], "MISS")
+
+        self.assertEqual(get_public_cache_stats(), {"hits": 3, "misses": 5, "hit_ratio": 0.375})
+
+    @override_settings(PUBLIC_CACHE_TIMEOUT=0)
+    async def test_public_endpoints_served_natively_under_asgi(self):
+        """
+        The async views answer through the ASGI handler with the same data, and their queries are still measured.
+        """
+        urls = [self.barber_list_url, self.barber_1_profile_url, self.barber_client_user_profile_url, self.barber_1_avail_url, self.barber_1_serv_url, reverse("search_slots_public")]
+
+        for url in urls:
+            sync_response = await sync_to_async(self.client.get)(url)
+            response = await self.async_client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertEqual(response.json(), sync_response.json(), url)
+            self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+        response = await self.async_client.post(reverse("get_barber_slots_public", kwargs={'barber_id': self.barber1.id}), {"date": str(self.availability1.date)}, content_type="application/json")
+        self.assertEqual(response.json(), {"slots": ["09:00", "10:00"]})
+
+    @override_settings(PUBLIC_CACHE_TIMEOUT=0)
+    async def test_concurrent_requests_count_their_own_queries(self):
+        """
+        Concurrent async requests, whose ORM calls share one thread, each report only their own queries.
+        """
+        def count_queries(response):
+            return int(re.search(r'desc="(\d+) queries"', response["Server-Timing"]).group(1))
+
+        urls = [self.barber_list_url, self.barber_1_profile_url, self.barber_1_avail_url, self.barber_1_serv_url, reverse("search_slots_public")]
+        expected = [count_queries(await self.async_client.get(url)) for url in urls]
+
+        responses = await asyncio.gather(*[self.async_client.get(url) for url in urls * 4])
+
+        self.assertEqual([count_queries(response) for response in responses], expected * 4)
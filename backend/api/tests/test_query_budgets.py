@@ -0,0 +1,169 @@
+import datetime
+from contextlib import ExitStack
+from decimal import Decimal
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connections, transaction
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APITestCase
+from api.backends.tokens import RoleRefreshToken
+from api.management.commands.bench import iter_api_urls, PREFIX_ROLES
+from api.middleware import QueryTimer
+from api.models import (
+    User,
+    Barber,
+    Client,
+    Roles,
+    Service,
+    Availability,
+    Appointment,
+    AppointmentService,
+    AppointmentStatus,
+    Review,
+    RevenueEntry,
+)
+from api.utils import load_revoked_tokens
+
+
+# Rows of every kind the endpoints are requested with, the query counts must be identical at both sizes
+SMALL_SIZE = 5
+LARGE_SIZE = 500
+
+
+def get_read_views():
+    """
+    Returns (route, URL pattern) for every URL of the API that accepts GET.
+    """
+    return [(route, pattern) for route, pattern in iter_api_urls() if hasattr(pattern.callback.cls, "get")]
+
+
+@override_settings(PUBLIC_CACHE_TIMEOUT=0)
+class QueryBudgetsTest(APITestCase):
+    """
+    Tests that every read endpoint runs a fixed number of SQL queries, within the `@query_budget` declared on its view,
+    whatever the number of barbers, clients, appointments, reviews, availabilities and services.
+    """
+
+    def populate(self, size):
+        """
+        Creates `size` barbers and clients, then gives the first barber and the first client `size` of everything:
+        appointments (past and upcoming, with line items), reviews, availabilities and services.
+        Returns the users and the URL parameters the endpoints are requested with.
+        """
+        today = timezone.localdate()
+        admin = User.objects.create_superuser(username=f"budget_admin_{size}", password="pw")
+        barbers = [
+            Barber.objects.create_user(username=f"budget_barber_{size}_{i}", email=f"barber{i}@budget.test", password="pw", name=f"B{i}", surname="Budget", is_active=True)
+            for i in range(size)
+        ]
+        clients = [
+            Client.objects.create_user(username=f"budget_client_{size}_{i}", email=f"client{i}@budget.test", password="pw", name=f"C{i}", surname="Budget", is_active=True)
+            for i in range(size)
+        ]
+        barber, client = barbers[0], clients[0]
+
+        # Not verified yet, for the email confirmation links
+        pending = Client.objects.create_user(username=f"budget_pending_{size}", email="pending@budget.test", password="pw", name="P", surname="Budget", is_active=False)
+
+        services = Service.objects.bulk_create(
+            [Service(barber=barber, name=f"Service {i}", price=Decimal("10.00")) for i in range(size)]
+            + [Service(barber=other, name="Haircut", price=Decimal("20.00")) for other in barbers[1:]]
+        )
+        service_of = {service.barber_id: service for service in services}
+
+        Availability.objects.bulk_create([
+            Availability(barber=barber, date=today + datetime.timedelta(days=i + 1), slots=["09:00", "10:00", "11:00"])
+            for i in range(size)
+        ])
+
+        # The first barber sees every client once, the first client sees every barber once, half of it in the past
+        def appointment(appointment_client, appointment_barber, offset, slot):
+            date = today + datetime.timedelta(days=offset - size // 2)
+            status = AppointmentStatus.COMPLETED.value if date < today else AppointmentStatus.ONGOING.value
+            return Appointment(client=appointment_client, barber=appointment_barber, date=date, slot=slot, status=status)
+
+        appointments = Appointment.objects.bulk_create(
+            [appointment(other, barber, i, datetime.time(10, 0)) for i, other in enumerate(clients)]
+            + [appointment(client, other, i, datetime.time(11, 0)) for i, other in enumerate(barbers[1:], start=1)]
+        )
+        AppointmentService.objects.bulk_create([
+            AppointmentService(appointment=item, name=service_of[item.barber_id].name, price=service_of[item.barber_id].price, original_service=service_of[item.barber_id])
+            for item in appointments
+        ])
+        RevenueEntry.record_completed([item.pk for item in appointments if item.status == AppointmentStatus.COMPLETED.value])
+
+        Review.objects.bulk_create(
+            [Review(client=other, barber=barber, rating=5, comment="Great") for other in clients]
+            + [Review(client=client, barber=other, rating=4, comment="Good") for other in barbers[1:]]
+        )
+        Barber.objects.filter(pk__in=[other.pk for other in barbers]).rebuild_rating_aggregates()
+
+        return {
+            Roles.ADMIN: admin,
+            Roles.BARBER: barber,
+            Roles.CLIENT: client,
+            "kwargs": {
+                "barber_id": barber.pk,
+                "client_id": client.pk,
+                "uidb64": urlsafe_base64_encode(force_bytes(pending.pk)),
+                "token": default_token_generator.make_token(pending),
+            },
+        }
+
+    def count_queries(self, route, pattern, sample):
+        """
+        Requests a read endpoint as the user of its URL prefix, returns the number of queries run.
+        """
+        path = reverse(pattern.name, kwargs={key: sample["kwargs"][key] for key in pattern.pattern.converters})
+        user = next((sample[role] for url_prefix, role in PREFIX_ROLES.items() if route.startswith(url_prefix)), None)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {RoleRefreshToken.for_user(user).access_token}"} if user else {}
+
+        timer = QueryTimer()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.client.get(path, **headers)
+
+        self.assertEqual(response.status_code, 200, f"{pattern.name}: {response.content[:200]}")
+        return timer.count
+
+    def measure(self, size):
+        """
+        Returns {URL name: query count} of every budgeted read endpoint, against a fresh dataset of the given size.
+        """
+        with transaction.atomic():
+            sample = self.populate(size)
+            # The revoked tokens are loaded into the cache once, not by every request
+            load_revoked_tokens()
+            counts = {
+                pattern.name: self.count_queries(route, pattern, sample)
+                for route, pattern in get_read_views()
+                if hasattr(pattern.callback, "query_budget")
+            }
+            transaction.set_rollback(True)
+
+        return counts
+
+    def test_every_read_endpoint_declares_a_budget(self):
+        """
+        New read endpoints can't skip the budget check.
+        """
+        missing = [pattern.name for _route, pattern in get_read_views() if not hasattr(pattern.callback, "query_budget")]
+        self.assertEqual(missing, [])
+
+    def test_query_counts_do_not_grow_with_data(self):
+        """
+        Every read endpoint runs the same number of queries with 5 and 500 rows, and stays within its budget.
+        """
+        small, large = self.measure(SMALL_SIZE), self.measure(LARGE_SIZE)
+        budgets = {pattern.name: pattern.callback.query_budget for _route, pattern in get_read_views() if hasattr(pattern.callback, "query_budget")}
+
+        self.assertEqual(set(small), set(budgets))
+
+        for name, budget in budgets.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(large[name], small[name], f"{name} runs {small[name]} queries with {SMALL_SIZE} rows, {large[name]} with {LARGE_SIZE}")
+                self.assertLessEqual(large[name], budget, f"{name} runs {large[name]} queries, over its budget of {budget}")
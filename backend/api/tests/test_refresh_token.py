@@ -1,7 +1,14 @@
+from unittest.mock import patch
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from api.backends.tokens import RoleRefreshToken
 from api.models import User
+from api.utils import load_revoked_tokens, REVOKED_TOKENS_LOADED_KEY, REVOKED_TOKENS_RELOAD_INTERVAL
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
@@ -48,3 +55,96 @@ class RefreshTokenTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data.get('refresh_token')[0], 'Token is invalid')
 
+
+
+class RefreshTokenRevocationTest(APITestCase):
+    """
+    Tests that revoked refresh tokens are rejected from the cache, without querying the blacklist table.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='revoketest', email='revoketest@example.com', password='StrongPassw0rd!', is_active=True)
+        self.refresh_token = str(RoleRefreshToken.for_user(self.user))
+
+
+    def refresh(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('refresh_token'), {'refresh_token': self.refresh_token}, format='json')
+
+        blacklist_queries = [query['sql'] for query in queries if 'token_blacklist' in query['sql']]
+        return response, blacklist_queries
+
+
+    def test_logged_out_token_is_rejected_from_the_cache(self):
+        """
+        Refreshing checks the revocation in the cache: accepted before logout, rejected after, no blacklist query.
+        """
+        self.refresh()  # Loads the (empty) blacklist into the cache
+
+        response, blacklist_queries = self.refresh()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(blacklist_queries, [])
+
+        access_token = RoleRefreshToken(self.refresh_token).access_token
+        response = self.client.post(reverse('logout_user'), {'refresh_token': self.refresh_token}, format='json', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=RoleRefreshToken(self.refresh_token, verify=False)['jti']).exists())
+
+        response, blacklist_queries = self.refresh()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['refresh_token'][0], 'Token is blacklisted')
+        self.assertEqual(blacklist_queries, [])
+
+
+    def test_emptied_cache_is_reloaded_from_the_blacklist(self):
+        """
+        Revocations survive the cache being emptied, they are reloaded from the blacklist table once.
+        """
+        RoleRefreshToken(self.refresh_token).blacklist()
+        cache.clear()
+
+        response, blacklist_queries = self.refresh()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(blacklist_queries), 1)
+
+        response, blacklist_queries = self.refresh()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(blacklist_queries, [])
+
+
+    def test_unavailable_cache_falls_back_to_the_blacklist(self):
+        """
+        Without the cache, revocations are checked in the blacklist table.
+        """
+        RoleRefreshToken(self.refresh_token).blacklist()
+
+        with patch('api.utils.cache.cache.get_many', side_effect=ConnectionError), self.assertLogs('api.utils.cache', 'ERROR'):
+            response, blacklist_queries = self.refresh()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(blacklist_queries), 1)
+
+
+    def test_failed_revocation_write_reloads_the_blacklist(self):
+        """
+        Revocation fails closed: if the token can't be marked revoked in the cache, the next check reloads the
+        blacklist table instead of trusting the missing key.
+        """
+        self.refresh()  # Loads the (empty) blacklist into the cache
+
+        with patch('api.utils.cache.cache.set_many', side_effect=ConnectionError), self.assertLogs('api.utils.cache', 'ERROR'):
+            RoleRefreshToken(self.refresh_token).blacklist()
+
+        response, blacklist_queries = self.refresh()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(blacklist_queries), 1)
+
+
+    def test_loaded_revocations_are_reloaded_periodically(self):
+        """
+        The loaded marker expires, so keys lost without the cache being emptied can't be trusted forever.
+        """
+        with patch('api.utils.cache.cache.set') as cache_set:
+            load_revoked_tokens()
+
+        cache_set.assert_called_once_with(REVOKED_TOKENS_LOADED_KEY, 1, timeout=REVOKED_TOKENS_RELOAD_INTERVAL)
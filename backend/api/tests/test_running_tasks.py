@@ -3,14 +3,22 @@ from unittest.mock import patch
 from django.db.models import Q
 from django.test import TestCase
 from django.utils import timezone
-from api.tasks import complete_ongoing_appointments, send_appointment_reminders
+from django.core import mail
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from api.tasks import complete_ongoing_appointments, send_appointment_reminders, dispatch_appointment_events, drain_email_outbox, prune_expired_tokens
+from api.utils import APPOINTMENT_SCHEDULE_KEY, REMINDER_EVENT, COMPLETION_EVENT
 from api.models import (
     Barber,
     Client,
     Service,
     AppointmentService,
     Appointment,
-    AppointmentStatus
+    AppointmentStatus,
+    EmailOutbox,
+    EmailStatus,
+    RevenueEntry,
+    DailyRevenue,
+    PlatformStatistics,
 )
 
 @patch('django.core.mail.send_mail', return_value=1)
@@ -152,6 +160,41 @@ class RunningTasksTestCase(TestCase):
         self.assertEqual(appt_completed.status, AppointmentStatus.COMPLETED.value)
         self.assertEqual(appt_cancelled.status, AppointmentStatus.CANCELLED.value)
 
+
+    @patch("api.tasks.timezone")
+    def test_complete_ongoing_appointments_writes_revenue_ledger(self, mocked_tz, mock_send_mail):
+        """
+        Completed appointments are written to the ledger from their line items, feeding the barber/client/day totals.
+        """
+        fake_now = timezone.make_aware(datetime.datetime.combine(self.today, datetime.time(14, 0)))
+        mocked_tz.now.return_value = fake_now
+        mocked_tz.localtime.return_value = fake_now
+
+        beard = Service.objects.create(barber=self.barber, name="Beard", price=10)
+        other_client = self._fresh_client("l1")
+        appt_yest = self.create_appointment(date=self.yesterday, slot=datetime.time(9, 0))
+        self.add_services(appt_yest, [beard])
+        appt_today = self.create_appointment(client=other_client, date=self.today, slot=datetime.time(13, 0))
+        self.create_appointment(date=self.tomorrow, slot=datetime.time(9, 0))
+
+        # Live price changes after booking don't affect the revenue, the line items snapshot does
+        Service.objects.filter(pk=self.service.pk).update(price=99)
+
+        self.assertEqual(complete_ongoing_appointments(), 2)
+        self.assertEqual(complete_ongoing_appointments(), 0)  # Nothing recorded twice
+
+        self.assertEqual({entry.appointment_id: float(entry.amount) for entry in RevenueEntry.objects.all()}, {appt_yest.id: 25.0, appt_today.id: 15.0})
+        self.assertEqual(DailyRevenue.objects.get(date=self.yesterday).to_dict(), {"date": self.yesterday, "total": 25.0, "appointments_count": 1})
+        self.assertEqual(DailyRevenue.objects.get(date=self.today).to_dict(), {"date": self.today, "total": 15.0, "appointments_count": 1})
+
+        self.barber.refresh_from_db()
+        self.client.refresh_from_db()
+        other_client.refresh_from_db()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.barber.total_revenue, 40.0)
+            self.assertEqual(self.client.total_spent, 25.0)
+            self.assertEqual(other_client.total_spent, 15.0)
+        self.assertEqual(PlatformStatistics.compute()["total_revenue"], 40.0)
     
     @patch("api.tasks.timezone")
     def test_send_appointment_reminders_only_targets_window(self, mocked_tz, mock_send_mail):
@@ -251,4 +294,197 @@ class RunningTasksTestCase(TestCase):
         self.assertTrue(appt_ok.reminder_email_sent)
         self.assertTrue(appt_sent.reminder_email_sent)
         self.assertFalse(appt_cancel.reminder_email_sent)
-        self.assertFalse(appt_not_today.reminder_email_sent)
\ No newline at end of file
+        self.assertFalse(appt_not_today.reminder_email_sent)
+
+    @patch("api.tasks.timezone")
+    def test_send_appointment_reminders_claims_in_bulk_and_queues_in_outbox(self, mocked_tz, mock_send_mail):
+        """
+        Due appointments are claimed with a single UPDATE and their emails queued in the outbox in the same transaction,
+        then delivered by the outbox drain over one connection.
+        """
+        fake_now = timezone.make_aware(datetime.datetime.combine(self.today, datetime.time(10, 0)))
+        mocked_tz.now.return_value = fake_now
+        mocked_tz.localtime.return_value = fake_now
+        appt_1 = self.create_appointment(date=self.today, slot=datetime.time(10, 30))
+        appt_2 = self.create_appointment(date=self.today, slot=datetime.time(10, 45), client=self._fresh_client("b1"))
+
+        with patch("api.tasks.drain_email_outbox.delay") as mock_drain:
+            with self.captureOnCommitCallbacks(execute=True):
+                claimed = send_appointment_reminders()
+
+            # Already claimed appointments are not claimed again
+            self.assertEqual(send_appointment_reminders(), 0)
+
+        self.assertEqual(claimed, 2)
+        mock_drain.assert_called_once()
+        recipients = ["alice@example.com", "aliceb1@example.com", "bob@example.com", "bob@example.com"]
+        self.assertCountEqual([email.recipients[0] for email in EmailOutbox.objects.all()], recipients)
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.open") as mock_open:
+            self.assertEqual(drain_email_outbox(), 4)
+
+        mock_open.assert_called_once()
+        self.assertCountEqual([message.to[0] for message in mail.outbox], recipients)
+
+    @patch("api.tasks.timezone")
+    def test_reminders_survive_smtp_errors(self, mocked_tz, mock_send_mail):
+        """
+        A claimed reminder whose delivery fails stays in the outbox, and is sent by a later drain.
+        """
+        fake_now = timezone.make_aware(datetime.datetime.combine(self.today, datetime.time(10, 0)))
+        mocked_tz.now.return_value = fake_now
+        mocked_tz.localtime.return_value = fake_now
+        self.create_appointment(date=self.today, slot=datetime.time(10, 30))
+
+        with patch("api.tasks.drain_email_outbox.delay"):
+            self.assertEqual(send_appointment_reminders(), 1)
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("Connection refused")):
+            self.assertEqual(drain_email_outbox(), 0)
+
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailStatus.PENDING.value, attempts=1).count(), 2)
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_email_outbox(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_dispatch_appointment_events_handles_only_due_events(self, mock_send_mail):
+        """
+        The dispatcher costs no queries when nothing is due, and completes/reminds only the popped appointments.
+        """
+        start = timezone.localtime(timezone.now()).replace(second=0, microsecond=0)
+        appt_started = self.create_appointment(date=start.date(), slot=start.time())
+        appt_soon = self.create_appointment(date=self.tomorrow, slot=datetime.time(9, 0), client=self._fresh_client("d1"))
+        appt_cancelled = self.create_appointment(date=self.tomorrow, slot=datetime.time(10, 0), client=self._fresh_client("d2"), status=AppointmentStatus.CANCELLED.value)
+
+        with patch("api.tasks.pop_due_appointment_events", return_value={REMINDER_EVENT: [], COMPLETION_EVENT: []}), \
+             patch("api.tasks.get_next_appointment_event_at", return_value=None):
+            with self.assertNumQueries(0):
+                self.assertEqual(dispatch_appointment_events(), {"completed": 0, "reminded": 0})
+
+        due = {REMINDER_EVENT: [appt_soon.id, appt_cancelled.id], COMPLETION_EVENT: [appt_started.id]}
+        next_due = timezone.now().timestamp() + 20
+        with patch("api.tasks.pop_due_appointment_events", return_value=due), \
+             patch("api.tasks.get_next_appointment_event_at", return_value=next_due), \
+             patch("api.tasks.dispatch_appointment_events.apply_async") as mock_rearm, \
+             patch("api.tasks.drain_email_outbox.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(dispatch_appointment_events(), {"completed": 1, "reminded": 1})
+
+        # The next event is due before the following beat tick, so it's dispatched on time
+        mock_rearm.assert_called_once()
+        self.assertLessEqual(mock_rearm.call_args.kwargs["countdown"], 20)
+        self.assertCountEqual([email.recipients[0] for email in EmailOutbox.objects.all()], ["bob@example.com", "aliced1@example.com"])
+
+        appt_started.refresh_from_db()
+        appt_cancelled.refresh_from_db()
+        self.assertEqual(appt_started.status, AppointmentStatus.COMPLETED.value)
+        self.assertTrue(RevenueEntry.objects.filter(appointment=appt_started).exists())
+        self.assertFalse(appt_cancelled.reminder_email_sent)
+
+    def test_appointment_events_are_scheduled_on_booking_and_removed_on_cancel(self, mock_send_mail):
+        """
+        Booking records the reminder (start - 1h) and completion (start) instants in the schedule once committed,
+        cancelling removes them.
+        """
+        from unittest.mock import MagicMock
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from api.models import Availability
+
+        client = MagicMock()
+        date = self.tomorrow + datetime.timedelta(days=1)
+        Availability.objects.create(barber=self.barber, date=date, slots=["11:00"])
+        api = APIClient()
+        api.force_authenticate(self.client)
+
+        with patch("api.utils.scheduler.get_schedule_client", return_value=client):
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = api.post(reverse("create_client_appointment", kwargs={"barber_id": self.barber.id}), {"date": date, "slot": "11:00", "services": [self.service.id]}, format="json")
+            self.assertEqual(resp.status_code, 201)
+
+            start = timezone.make_aware(datetime.datetime.combine(date, datetime.time(11, 0)))
+            appointment_id = Appointment.objects.get(client=self.client).id
+            client.zadd.assert_called_once_with(APPOINTMENT_SCHEDULE_KEY, {
+                f"remind:{appointment_id}": (start - datetime.timedelta(hours=1)).timestamp(),
+                f"complete:{appointment_id}": start.timestamp(),
+            })
+
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = api.delete(reverse("delete_client_appointment", kwargs={"appointment_id": appointment_id}))
+            self.assertEqual(resp.status_code, 200)
+            client.zrem.assert_called_once_with(APPOINTMENT_SCHEDULE_KEY, f"remind:{appointment_id}", f"complete:{appointment_id}")
+
+    def test_drain_email_outbox_sends_and_retries_with_backoff(self, mock_send_mail):
+        """
+        Pending emails are delivered over one connection; failures are retried later and given up after MAX_ATTEMPTS.
+        """
+        ok = EmailOutbox.objects.create(subject="Hi", body="Body", from_email="from@example.com", recipients=["ok@example.com"])
+        broken = EmailOutbox.objects.create(subject="Hi", body="Body", from_email="from@example.com", recipients=["broken@example.com"])
+
+        original_send = mail.get_connection().__class__.send_messages
+
+        def flaky_send(backend, messages):
+            if messages[0].to == ["broken@example.com"]:
+                raise OSError("Connection refused")
+            return original_send(backend, messages)
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", flaky_send):
+            self.assertEqual(drain_email_outbox(), 1)
+
+            ok.refresh_from_db()
+            broken.refresh_from_db()
+            self.assertEqual(ok.status, EmailStatus.SENT.value)
+            self.assertEqual([message.to for message in mail.outbox], [["ok@example.com"]])
+            self.assertEqual(broken.status, EmailStatus.PENDING.value)
+            self.assertEqual(broken.attempts, 1)
+            self.assertIn("Connection refused", broken.last_error)
+            self.assertGreater(broken.next_attempt_at, timezone.now())
+
+            # Not due yet, nothing to do
+            self.assertEqual(drain_email_outbox(), 0)
+
+            # Give up after the last allowed attempt
+            EmailOutbox.objects.filter(id=broken.id).update(attempts=EmailOutbox.MAX_ATTEMPTS - 1, next_attempt_at=timezone.now())
+            drain_email_outbox()
+            broken.refresh_from_db()
+            self.assertEqual(broken.status, EmailStatus.FAILED.value)
+
+    def test_drain_email_outbox_records_connection_errors(self, mock_send_mail):
+        """
+        A mail server that can't be reached counts as a failed attempt of every claimed email, retried after the backoff.
+        """
+        emails = [EmailOutbox.objects.create(subject="Hi", body="Body", from_email="from@example.com", recipients=[f"user{i}@example.com"]) for i in range(2)]
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.open", side_effect=OSError("Connection refused")):
+            self.assertEqual(drain_email_outbox(), 0)
+
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), (EmailStatus.PENDING.value, 1))
+            self.assertIn("Connection refused", email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Not due yet, nothing to do
+        self.assertEqual(drain_email_outbox(), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_prune_expired_tokens_in_batches(self, mock_send_mail):
+        """
+        Expired outstanding tokens and their blacklist entries are deleted in bounded batches, the unexpired ones kept.
+        """
+        now = timezone.now()
+        expired = [OutstandingToken.objects.create(jti=f"expired-{i}", token="t", expires_at=now - datetime.timedelta(hours=1)) for i in range(3)]
+        valid = OutstandingToken.objects.create(jti="valid", token="t", expires_at=now + datetime.timedelta(hours=1))
+        BlacklistedToken.objects.create(token=expired[0])
+        BlacklistedToken.objects.create(token=valid)
+
+        with patch("api.tasks.TOKEN_PRUNE_BATCH_SIZE", 2), patch("api.tasks.prune_expired_tokens.delay") as delay:
+            self.assertEqual(prune_expired_tokens(), {"outstanding": 2, "blacklisted": 1})
+            delay.assert_called_once_with()
+
+            self.assertEqual(prune_expired_tokens(), {"outstanding": 1, "blacklisted": 0})
+            delay.assert_called_once_with()
+
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["valid"])
+        self.assertEqual(BlacklistedToken.objects.get().token_id, valid.id)
@@ -1,4 +1,5 @@
 from django.urls import path, include
+from ..views import get_metrics
 
 urlpatterns = [
     path('auth/', include('api.urls.auth_urls')),
@@ -7,4 +8,7 @@ urlpatterns = [
     path('client/', include('api.urls.client_urls')),
     path('public/', include('api.urls.public_urls')),
     path('image/', include('api.urls.image_urls')),
+
+    # Prometheus metrics of the requests served (admin only)
+    path('metrics/', get_metrics, name='get_metrics'),
 ]
\ No newline at end of file
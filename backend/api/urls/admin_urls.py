@@ -6,8 +6,10 @@ from ..views import (
     invite_barber,
     delete_barber,
     create_barber_availability,
+    create_barbers_availability,
     manage_barber_availability,
     get_all_appointments,
+    get_public_cache_statistics,
 )
 
 urlpatterns = [
@@ -19,6 +21,7 @@ urlpatterns = [
     path('barbers/<int:barber_id>/', delete_barber, name='delete_barber'),
 
     # Barber Availability management
+    path('barbers/availabilities/', create_barbers_availability, name='create_barbers_availability'),
     path('barbers/<int:barber_id>/availabilities/', create_barber_availability, name='create_barber_availability'),
     path('barbers/<int:barber_id>/availabilities/<int:availability_id>/', manage_barber_availability, name='manage_barber_availability'),
 
@@ -26,4 +29,7 @@ urlpatterns = [
     path('barbers/', get_all_barbers, name='get_all_barbers'),
     path('clients/', get_all_clients, name='get_all_clients'),
     path('appointments/', get_all_appointments, name='get_all_appointments'),
+
+    # Public response cache monitoring
+    path('cache/', get_public_cache_statistics, name='get_public_cache_statistics'),
 ]
\ No newline at end of file
@@ -6,6 +6,7 @@ from ..views import (
     get_barber_services_public,
     get_barber_profile_public,
     get_client_profile_public,
+    search_slots_public,
 )
 
 urlpatterns = [
@@ -16,4 +17,7 @@ urlpatterns = [
     path('barbers/<int:barber_id>/availabilities/', get_barber_availabilities_public, name='get_barber_availabilities_public'),
     path('barbers/<int:barber_id>/slots/', get_barber_slots_public, name='get_barber_slots_public'),
     path('barbers/<int:barber_id>/services/', get_barber_services_public, name='get_barber_services_public'),
+
+    # Shop-wide search
+    path('slots/search/', search_slots_public, name='search_slots_public'),
 ]
@@ -1,5 +1,10 @@
 from .utils import *
 from .validators import *
+from .slots import *
+from .cache import *
+from .scheduler import *
+from .metrics import *
+from .identity import *
 from .mixins import *
 from .permissions import *
 from .emails import *
\ No newline at end of file
@@ -0,0 +1,423 @@
+import copy
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import transaction
+from rest_framework.response import Response
+
+
+logger = logging.getLogger(__name__)
+
+# Public responses are cached under the versions of the scopes they depend on: bumping a scope's version invalidates them all
+PUBLIC_CACHE_PREFIX = 'public'
+PUBLIC_CACHE_HITS_KEY = f'{PUBLIC_CACHE_PREFIX}:stats:hits'
+PUBLIC_CACHE_MISSES_KEY = f'{PUBLIC_CACHE_PREFIX}:stats:misses'
+
+
+# Scope of the public barbers list, which embeds every barber's profile
+BARBERS_CACHE_SCOPE = 'barbers'
+
+
+def barber_cache_scope(barber_id):
+    """
+    Utility function that returns the cache scope of the public responses about a single barber.
+    """
+    return f'barber:{barber_id}' if barber_id else None
+
+
+def client_cache_scope(client_id):
+    """
+    Utility function that returns the cache scope of the public responses about a single client.
+    """
+    return f'client:{client_id}' if client_id else None
+
+
+def _version_key(scope):
+    return f'{PUBLIC_CACHE_PREFIX}:version:{scope}'
+
+
+def _bump_versions(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:  # No version yet, nothing cached for this scope
+            cache.set(_version_key(scope), 1, timeout=None)
+        except Exception:
+            logger.exception('Could not invalidate the public cache scope "%s".', scope)
+
+
+def invalidate_public_cache(*scopes):
+    """
+    Utility function that invalidates every cached public response depending on the given scopes.
+    Inside a transaction, it runs again on commit so readers can't re-cache the uncommitted state in between.
+    """
+    scopes = {scope for scope in scopes if scope}
+    _bump_versions(scopes)
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_versions(scopes))
+
+
+def invalidate_appointments_cache(appointments):
+    """
+    Utility function that invalidates the public responses of the barbers and clients of bulk updated appointments,
+    given as dicts with their barber_id and client_id.
+    """
+    scopes = [BARBERS_CACHE_SCOPE]
+    for appointment in appointments:
+        scopes += [barber_cache_scope(appointment['barber_id']), client_cache_scope(appointment['client_id'])]
+
+    if len(scopes) > 1:
+        invalidate_public_cache(*scopes)
+
+
+def get_public_cache_stats():
+    """
+    Utility function that returns the hit/miss counters of the public response cache.
+    """
+    try:
+        counters = cache.get_many([PUBLIC_CACHE_HITS_KEY, PUBLIC_CACHE_MISSES_KEY])
+    except Exception:
+        logger.exception('Could not read the public cache counters.')
+        counters = {}
+
+    hits = counters.get(PUBLIC_CACHE_HITS_KEY, 0)
+    misses = counters.get(PUBLIC_CACHE_MISSES_KEY, 0)
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+    }
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:  # First hit/miss, counters never expire
+        cache.add(key, 1, timeout=None)
+    except Exception:
+        logger.exception('Could not update the public cache counter "%s".', key)
+
+
+def _get_cached_response(endpoint, scopes, request, kwargs):
+    """
+    Returns the cache key of a public response and its cached data (None on a miss).
+    """
+    version_keys = [_version_key(scope) for scope in sorted(scopes(kwargs))]
+    versions = cache.get_many(version_keys)
+    query = hashlib.md5(request.META.get('QUERY_STRING', '').encode()).hexdigest()
+    key = ':'.join([PUBLIC_CACHE_PREFIX, endpoint, *(f'{k}={versions.get(k, 0)}' for k in version_keys), query])
+    cached = cache.get(key)
+
+    if cached is not None:
+        _count(PUBLIC_CACHE_HITS_KEY)
+
+    return key, cached
+
+
+def _set_cached_response(endpoint, key, response, timeout):
+    if response.status_code == 200:
+        try:
+            cache.set(key, response.data, timeout=timeout)
+            _count(PUBLIC_CACHE_MISSES_KEY)
+        except Exception:
+            logger.exception('Could not cache the public response of "%s".', endpoint)
+        response['X-Cache'] = 'MISS'
+
+    return response
+
+
+def _hit_response(cached):
+    response = Response(cached)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def cache_public_response(endpoint, scopes):
+    """
+    Decorator for public views that caches their successful responses in the default cache (Redis).
+
+    - `scopes` is a function receiving the view kwargs and returning the scopes the response depends on.
+    - Responses are keyed by endpoint, scope versions and query string, and expire after PUBLIC_CACHE_TIMEOUT seconds.
+    - Falls back to the view if the cache is unreachable, and sets the `X-Cache` header to HIT or MISS.
+    - Async views get an async wrapper, the cache is then accessed from a worker thread.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                timeout = settings.PUBLIC_CACHE_TIMEOUT
+
+                if not timeout:
+                    return await view(request, *args, **kwargs)
+
+                try:
+                    key, cached = await sync_to_async(_get_cached_response)(endpoint, scopes, request, kwargs)
+                except Exception:
+                    logger.exception('Public cache unavailable, serving "%s" uncached.', endpoint)
+                    return await view(request, *args, **kwargs)
+
+                if cached is not None:
+                    return _hit_response(cached)
+
+                response = await view(request, *args, **kwargs)
+                return await sync_to_async(_set_cached_response)(endpoint, key, response, timeout)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.PUBLIC_CACHE_TIMEOUT
+
+            if not timeout:
+                return view(request, *args, **kwargs)
+
+            try:
+                key, cached = _get_cached_response(endpoint, scopes, request, kwargs)
+            except Exception:
+                logger.exception('Public cache unavailable, serving "%s" uncached.', endpoint)
+                return view(request, *args, **kwargs)
+
+            if cached is not None:
+                return _hit_response(cached)
+
+            response = view(request, *args, **kwargs)
+            return _set_cached_response(endpoint, key, response, timeout)
+        return wrapper
+    return decorator
+
+
+# Revoked (blacklisted) refresh tokens, one key per token expiring along with it, and revoked users (deactivated or
+# deleted), whose access tokens issued up to the stored timestamp are rejected. The marker tells the keys were loaded
+# from the blacklist and revocation tables since the cache was last emptied, so a missing key means nothing is revoked.
+# Fails closed: a revocation that can't be cached drops the marker, which also expires, so the keys are reloaded at
+# least every RELOAD_INTERVAL seconds (hourly, along with `prune_expired_tokens`). Redis must not evict keys (noeviction)
+REVOKED_TOKEN_PREFIX = 'revoked'
+REVOKED_TOKENS_LOADED_KEY = f'{REVOKED_TOKEN_PREFIX}:loaded'
+REVOKED_TOKENS_RELOAD_INTERVAL = 60 * 60
+
+
+def _revoked_token_key(jti):
+    return f'{REVOKED_TOKEN_PREFIX}:token:{jti}'
+
+
+def _revoked_user_key(pk):
+    return f'{REVOKED_TOKEN_PREFIX}:user:{pk}'
+
+
+def _access_token_lifetime():
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    return int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()) + 1
+
+
+def _cache_revocations(values, timeout):
+    """
+    Writes revocation keys to the cache, right away and, inside a transaction, again once it commits, so a reload of
+    the uncommitted tables in between can't miss them. If they can't be written, drops the loaded marker: the next
+    check reloads the tables, or falls back to them if the cache is unavailable.
+    """
+    def write():
+        try:
+            if not cache.set_many(values, timeout=timeout):
+                return
+        except Exception:
+            logger.exception('Could not cache the revocations %s.', list(values))
+
+        try:
+            cache.delete(REVOKED_TOKENS_LOADED_KEY)
+        except Exception:
+            logger.exception('Could not drop the revoked tokens marker.')
+
+    write()
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(write)
+
+
+def revoke_token(jti, expires_at):
+    """
+    Utility function that marks a refresh token revoked in the cache until it expires, given its `exp` timestamp.
+    The blacklist table stays the reference, reloaded on the next check if the cache write fails.
+    """
+    timeout = int(expires_at - time.time()) + 1
+
+    if timeout > 0:
+        _cache_revocations({_revoked_token_key(jti): 1}, timeout)
+
+
+def revoke_user_tokens(*pks):
+    """
+    Utility function that revokes the access tokens already issued to the given users, e.g. once deactivated or
+    deleted: they can't rely on the `is_active` claim until their tokens expire. Written to the revocation table in the
+    caller's transaction, and to the cache.
+    """
+    from django.utils import timezone
+    from ..models import UserRevocation
+
+    now = timezone.now()
+    UserRevocation.objects.bulk_create(
+        [UserRevocation(user_id=pk, revoked_at=now) for pk in pks],
+        update_conflicts=True,
+        unique_fields=['user_id'],
+        update_fields=['revoked_at'],
+    )
+
+    _cache_revocations({_revoked_user_key(pk): now.timestamp() for pk in pks}, _access_token_lifetime())
+
+
+def load_revoked_tokens():
+    """
+    Utility function that copies the unexpired blacklisted tokens and user revocations into the cache, then marks it
+    loaded. Returns the number of revocations loaded.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+    from ..models import UserRevocation
+
+    # A single timeout per batch: keys outliving their token are harmless, expired tokens are rejected anyway
+    timeout = int(jwt_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    jtis = list(BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list('token__jti', flat=True))
+
+    for start in range(0, len(jtis), 1000):
+        cache.set_many({_revoked_token_key(jti): 1 for jti in jtis[start:start + 1000]}, timeout=timeout)
+
+    since = timezone.now() - timedelta(seconds=_access_token_lifetime())
+    revocations = list(UserRevocation.objects.filter(revoked_at__gt=since).values_list('user_id', 'revoked_at'))
+
+    for start in range(0, len(revocations), 1000):
+        cache.set_many(
+            {_revoked_user_key(pk): revoked_at.timestamp() for pk, revoked_at in revocations[start:start + 1000]},
+            timeout=_access_token_lifetime(),
+        )
+
+    cache.set(REVOKED_TOKENS_LOADED_KEY, 1, timeout=REVOKED_TOKENS_RELOAD_INTERVAL)
+    return len(jtis) + len(revocations)
+
+
+def is_token_revoked(jti):
+    """
+    Utility function that tells whether a refresh token is revoked, from the cache: one lookup, loading the blacklist
+    table first if the cache was emptied since. Returns None if the cache is unavailable, check the table then.
+    """
+    key = _revoked_token_key(jti)
+
+    try:
+        values = cache.get_many([REVOKED_TOKENS_LOADED_KEY, key])
+
+        if REVOKED_TOKENS_LOADED_KEY not in values:
+            load_revoked_tokens()
+            return cache.get(key) is not None
+
+        return key in values
+    except Exception:
+        logger.exception('Revoked tokens cache unavailable, checking the blacklist table.')
+        return None
+
+
+def is_user_token_revoked(pk, authenticated_at):
+    """
+    Utility function that tells whether the access tokens of a user who logged in at the `authenticated_at` timestamp
+    are revoked, from the cache: one lookup, loading the tables first if the cache was emptied since. Returns None if
+    the cache is unavailable, or needs a reload from async code, load the user from the database then.
+    """
+    key = _revoked_user_key(pk)
+
+    try:
+        values = cache.get_many([REVOKED_TOKENS_LOADED_KEY, key])
+
+        if REVOKED_TOKENS_LOADED_KEY not in values:
+            load_revoked_tokens()
+            revoked_at = cache.get(key)
+        else:
+            revoked_at = values.get(key)
+    except SynchronousOnlyOperation:
+        return None
+    except Exception:
+        logger.exception('Revoked tokens cache unavailable, loading the user "%s".', pk)
+        return None
+
+    return revoked_at is not None and authenticated_at <= revoked_at
+
+
+class UserCache:
+    """
+    Per-process cache of the users loaded by the JWT authentication, for USER_CACHE_TIMEOUT seconds.
+
+    - Entries are keyed by user and access token (`jti`): a token only ever gets the user it was issued to.
+    - Invalidated by the user save/delete signals and the counter updates (ratings, revenue) of this process,
+      other processes (e.g. the Celery workers) can only rely on the short timeout.
+    - Stores and returns copies, requests can't see each other's changes to their instance.
+    """
+    # Distinct users kept, the expired entries are purged (then everything, if still full) beyond it
+    MAX_USERS = 1024
+
+    def __init__(self):
+        self._users = {}  # {user pk: {token jti: (expiry, user)}}
+        self._lock = threading.Lock()
+
+    def get(self, pk, jti):
+        with self._lock:
+            expiry, user = self._users.get(pk, {}).get(jti, (0, None))
+
+        if user is None or expiry <= time.monotonic():
+            return None
+
+        return copy.deepcopy(user)
+
+    def set(self, pk, jti, user):
+        timeout = settings.USER_CACHE_TIMEOUT
+
+        if timeout <= 0:
+            return
+
+        now = time.monotonic()
+        entry = (now + timeout, copy.deepcopy(user))
+
+        with self._lock:
+            if pk not in self._users and len(self._users) >= self.MAX_USERS:
+                self._purge(now)
+
+            self._users.setdefault(pk, {})[jti] = entry
+
+    def invalidate(self, *pks):
+        """
+        Drops the cached users with the given PKs. Inside a transaction, it runs again on commit so readers can't
+        re-cache the uncommitted state in between.
+        """
+        self._drop(pks)
+
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._drop(pks))
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def _drop(self, pks):
+        with self._lock:
+            for pk in pks:
+                self._users.pop(pk, None)
+
+    def _purge(self, now):
+        for pk in list(self._users):
+            tokens = {jti: entry for jti, entry in self._users[pk].items() if entry[0] > now}
+
+            if tokens:
+                self._users[pk] = tokens
+            else:
+                del self._users[pk]
+
+        if len(self._users) >= self.MAX_USERS:
+            self._users.clear()
+
+
+user_cache = UserCache()
@@ -1,10 +1,43 @@
 from django.urls import reverse
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+
+
+def queue_email(subject, message, from_email, recipient_list):
+    """
+    Writes the email to the outbox, in the caller's transaction, and wakes up the outbox drain once it commits.
+    The request never waits on SMTP, the periodic drain picks up the email if the broker can't be reached.
+    """
+    from django.db import transaction
+    from ..models import EmailOutbox
+    from ..tasks import drain_email_outbox
+
+    email = EmailOutbox.objects.create(subject=subject, body=message, from_email=from_email, recipients=recipient_list)
+    transaction.on_commit(drain_email_outbox.delay, robust=True)
+    return email
+
+
+def queue_emails(messages):
+    """
+    Writes many EmailMessages to the outbox in a single INSERT, in the caller's transaction, like `queue_email()`.
+    """
+    from django.db import transaction
+    from ..models import EmailOutbox
+    from ..tasks import drain_email_outbox
+
+    emails = EmailOutbox.objects.bulk_create([
+        EmailOutbox(subject=message.subject, body=message.body, from_email=message.from_email, recipients=message.to)
+        for message in messages
+    ])
+
+    if emails:
+        transaction.on_commit(drain_email_outbox.delay, robust=True)
+
+    return emails
 
 
 def send_client_verify_email(email, uid, token, domain):
     """
-    Sends email confirmation link to client after registration.
+    Queues email confirmation link to client after registration.
     """
     link = f'{domain}/verify/{uid}/{token}'
 
@@ -15,12 +48,12 @@ def send_client_verify_email(email, uid, token, domain):
         f'{link}\n\n'
         'If you did not register, please ignore this email.'
     )
-    send_mail(subject, message, 'barber.manager.verify@gmail.com', [email])
+    queue_email(subject, message, 'barber.manager.verify@gmail.com', [email])
 
 
 def send_barber_invite_email(email, uid, token, domain):
     """
-    Sends barber invitation email with registration link.
+    Queues barber invitation email with registration link.
     """
     link = f'{domain}/register/{uid}/{token}'
 
@@ -31,12 +64,12 @@ def send_barber_invite_email(email, uid, token, domain):
         f'{link}\n\n'
         'If you did not expect this invitation, please ignore this email.'
     )
-    send_mail(subject, message, 'barber.manager.verify@gmail.com', [email])
+    queue_email(subject, message, 'barber.manager.verify@gmail.com', [email])
 
 
 def send_password_reset_email(email, uid, token, domain):
     """
-    Sends password reset email with reset link.
+    Queues password reset email with reset link.
     """
     link = f'{domain}/reset-password/{uid}/{token}'
 
@@ -47,12 +80,12 @@ def send_password_reset_email(email, uid, token, domain):
         f'{link}\n\n'
         'If you did not request a password reset, please ignore this email.'
     )
-    send_mail(subject, message, 'barber.manager.verify@gmail.com', [email])
+    queue_email(subject, message, 'barber.manager.verify@gmail.com', [email])
 
 
-def send_client_reminder_email(client, barber, appointment_datetime):
+def build_client_reminder_email(client, barber, appointment_datetime):
     """
-    Sends a reminder email to the client 1 hour before their appointment.
+    Builds the reminder email sent to the client 1 hour before their appointment.
     """
     subject = '[BarberManager] Appointment Reminder'
     message = (
@@ -62,12 +95,12 @@ def send_client_reminder_email(client, barber, appointment_datetime):
         'Please arrive on time.\n'
         'Thank you for using BarberManager!'
     )
-    send_mail(subject, message, 'barber.manager.verify@gmail.com', [client.email])
+    return EmailMessage(subject, message, 'barber.manager.verify@gmail.com', [client.email])
 
 
-def send_barber_reminder_email(barber, client, appointment_datetime):
+def build_barber_reminder_email(barber, client, appointment_datetime):
     """
-    Sends a reminder email to the barber 1 hour before an appointment.
+    Builds the reminder email sent to the barber 1 hour before an appointment.
     """
     subject = '[BarberManager] Upcoming Appointment Reminder'
     message = (
@@ -77,4 +110,36 @@ def send_barber_reminder_email(barber, client, appointment_datetime):
         'Get ready to provide great service!\n'
         'BarberManager Team'
     )
-    send_mail(subject, message, 'barber.manager.verify@gmail.com', [barber.email])
\ No newline at end of file
+    return EmailMessage(subject, message, 'barber.manager.verify@gmail.com', [barber.email])
+
+
+def send_client_reminder_email(client, barber, appointment_datetime):
+    """
+    Sends a reminder email to the client 1 hour before their appointment.
+    """
+    build_client_reminder_email(client, barber, appointment_datetime).send()
+
+
+def send_barber_reminder_email(barber, client, appointment_datetime):
+    """
+    Sends a reminder email to the barber 1 hour before an appointment.
+    """
+    build_barber_reminder_email(barber, client, appointment_datetime).send()
+
+
+def queue_appointment_reminder_emails(appointments):
+    """
+    Queues the client and barber reminders of many appointments in the outbox, which delivers them in batches over a
+    single mail connection and retries failed ones. Appointments must have their client and barber loaded
+    (select_related). Returns the number of emails queued.
+    """
+    from django.utils import timezone
+    from datetime import datetime
+
+    messages = []
+    for appointment in appointments:
+        appointment_datetime = timezone.make_aware(datetime.combine(appointment.date, appointment.slot), timezone.get_current_timezone())
+        messages.append(build_client_reminder_email(appointment.client, appointment.barber, appointment_datetime))
+        messages.append(build_barber_reminder_email(appointment.barber, appointment.client, appointment_datetime))
+
+    return len(queue_emails(messages))
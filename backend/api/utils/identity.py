@@ -0,0 +1,162 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Identity map of the request or Celery task being run, None outside of one
+_identity_map = ContextVar('identity_map', default=None)
+
+
+class IdentityMap:
+    """
+    Instances loaded by primary key during a single request or Celery task, so each (model, pk) is fetched at most once.
+
+    - Opened by `IdentityMapMiddleware` for requests and by the Celery `task_prerun`/`task_postrun` signals for tasks.
+    - Kept in a context variable: the threads `sync_to_async` runs the ORM calls of async views in share it.
+    - `hits` counts the fetches it saved, reported in the `/api/metrics/` endpoint (and the task logs).
+    """
+    __slots__ = ('instances', 'hits', 'misses')
+
+    def __init__(self):
+        self.instances = {}  # (model, pk) -> instance
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model, pk):
+        instance = self.instances.get((model, pk))
+
+        if instance is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return instance
+
+    def add(self, instance):
+        self.instances[(type(instance), instance.pk)] = instance
+
+    def discard(self, instance):
+        """
+        Forgets an instance under its own model and, for multi-table inheritance, its parents' (e.g. a Barber's User).
+        """
+        self.forget(type(instance), instance.pk)
+
+    def forget(self, model, *pks):
+        """
+        Forgets the instances of a model with the given PKs, also under its parents' models.
+        """
+        for model in (model, *model._meta.get_parent_list()):
+            for pk in pks:
+                self.instances.pop((model, pk), None)
+
+
+@contextmanager
+def identity_map_scope():
+    """
+    Utility context manager that runs its block with a fresh identity map, returned by `as`.
+    """
+    identity_map = IdentityMap()
+    token = _identity_map.set(identity_map)
+
+    try:
+        yield identity_map
+    finally:
+        _identity_map.reset(token)
+
+
+def open_identity_map():
+    """
+    Utility function that starts a fresh identity map in the current context, for hooks that can't wrap a block
+    (the Celery task signals). Returns the token to pass to `close_identity_map()`.
+    """
+    return _identity_map.set(IdentityMap())
+
+
+def close_identity_map(token):
+    """
+    Utility function that drops the identity map opened with the given token, restoring the one it replaced (e.g. the
+    request's, for a task run eagerly). Returns the dropped identity map.
+    """
+    identity_map = _identity_map.get()
+    _identity_map.reset(token)
+    return identity_map
+
+
+def get_identity_map():
+    """
+    Utility function that returns the identity map of the current request or task, None outside of one.
+    """
+    return _identity_map.get()
+
+
+def remember_instance(instance):
+    """
+    Utility function that adds an instance loaded otherwise (e.g. the authenticated user) to the current identity map.
+    """
+    identity_map = _identity_map.get()
+
+    if identity_map is not None and instance is not None:
+        identity_map.add(instance)
+
+
+def forget_instances(model, *pks):
+    """
+    Utility function that drops rows from the current identity map, for writes that bypass the model signals
+    (`queryset.update()`), the next lookups fetch them again.
+    """
+    identity_map = _identity_map.get()
+
+    if identity_map is not None:
+        identity_map.forget(model, *pks)
+
+
+def _lookup(model, pk, filters):
+    """
+    Returns the normalized (pk, identity map, instance or None) of a lookup, the instance checked against `filters`.
+    """
+    identity_map = _identity_map.get()
+
+    if identity_map is None:
+        return pk, None, None
+
+    try:
+        pk = model._meta.pk.to_python(pk)
+    except Exception:  # Left to the query to reject
+        return pk, None, None
+
+    instance = identity_map.get(model, pk)
+
+    if instance is not None and any(getattr(instance, field) != value for field, value in filters.items()):
+        raise model.DoesNotExist(f'{model.__name__} matching query does not exist.')
+
+    return pk, identity_map, instance
+
+
+def get_instance(model, pk, **filters):
+    """
+    Utility function that returns `model.objects.get(pk=pk, **filters)`, fetched at most once per request or task.
+    `filters` must be plain field values (e.g. `is_active=True`), checked on the instance when it is already loaded.
+    """
+    pk, identity_map, instance = _lookup(model, pk, filters)
+
+    if instance is None:
+        instance = model.objects.get(pk=pk, **filters)
+
+        if identity_map is not None:
+            identity_map.add(instance)
+
+    return instance
+
+
+async def aget_instance(model, pk, **filters):
+    """
+    Async version of `get_instance()`.
+    """
+    pk, identity_map, instance = _lookup(model, pk, filters)
+
+    if instance is None:
+        instance = await model.objects.aget(pk=pk, **filters)
+
+        if identity_map is not None:
+            identity_map.add(instance)
+
+    return instance
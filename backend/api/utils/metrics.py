@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+
+# Upper bounds of the histogram buckets, per recorded measure (+Inf is implicit)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # Seconds
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)  # Bytes
+
+UNMATCHED_ENDPOINT = 'unmatched'
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus format: per-bucket counts, plus the sum and count of the observations.
+    """
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def buckets(self):
+        """
+        Returns the cumulative (upper bound, count) pairs, ending with +Inf.
+        """
+        cumulative = 0
+        for bound, count in zip((*self.bounds, '+Inf'), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class RequestMetrics:
+    """
+    In-process registry of the per-endpoint request histograms, filled by `RequestMetricsMiddleware`.
+    Each worker process keeps its own registry, so scrape each worker (the backend runs a single one).
+    """
+    HISTOGRAMS = {
+        'request_duration_seconds': ('Total time spent serving the request.', DURATION_BUCKETS),
+        'request_db_duration_seconds': ('Time spent in database queries while serving the request.', DURATION_BUCKETS),
+        'request_python_duration_seconds': ('Time spent outside database queries while serving the request.', DURATION_BUCKETS),
+        'request_db_queries': ('Number of database queries run while serving the request.', QUERY_COUNT_BUCKETS),
+        'response_size_bytes': ('Size of the response body.', RESPONSE_SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.connections_opened = 0  # Outside of a connection pool, which counts its own
+            self.identity_map_hits = 0
+            self.requests = defaultdict(int)  # (endpoint, method, status) -> count
+            self.histograms = {name: {} for name in self.HISTOGRAMS}  # name -> endpoint -> Histogram
+
+    def record(self, endpoint, method, status, duration, db_duration, db_queries, response_size):
+        """
+        Records the measures of a single served request.
+        """
+        values = {
+            'request_duration_seconds': duration,
+            'request_db_duration_seconds': db_duration,
+            'request_python_duration_seconds': max(duration - db_duration, 0.0),
+            'request_db_queries': db_queries,
+            'response_size_bytes': response_size,
+        }
+
+        with self.lock:
+            self.requests[(endpoint, method, status)] += 1
+
+            for name, value in values.items():
+                histogram = self.histograms[name].get(endpoint)
+
+                if histogram is None:
+                    histogram = self.histograms[name][endpoint] = Histogram(self.HISTOGRAMS[name][1])
+
+                histogram.observe(value)
+
+    def record_connection(self):
+        """
+        Records a database connection opened outside of a connection pool.
+        """
+        with self.lock:
+            self.connections_opened += 1
+
+    def record_identity_map(self, identity_map):
+        """
+        Records the fetches saved by the identity map of a served request.
+        """
+        if identity_map.hits:
+            with self.lock:
+                self.identity_map_hits += identity_map.hits
+
+    def render(self, extra_gauges=None):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        `extra_gauges` is an optional {name: (help, value)} dict of gauges appended to the output.
+        """
+        lines = [
+            '# HELP barbermanager_requests_total Number of served requests.',
+            '# TYPE barbermanager_requests_total counter',
+        ]
+
+        with self.lock:
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'barbermanager_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+            for name, (description, _bounds) in self.HISTOGRAMS.items():
+                metric = f'barbermanager_{name}'
+                lines += [f'# HELP {metric} {description}', f'# TYPE {metric} histogram']
+
+                for endpoint, histogram in sorted(self.histograms[name].items()):
+                    for bound, count in histogram.buckets():
+                        lines.append(f'{metric}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                    lines.append(f'{metric}_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+            started_at = self.started_at
+
+        gauges = {'metrics_started_at_seconds': ('UNIX time the metrics started being collected.', started_at), **(extra_gauges or {})}
+        for name, (description, value) in gauges.items():
+            lines += [f'# HELP barbermanager_{name} {description}', f'# TYPE barbermanager_{name} gauge', f'barbermanager_{name} {value}']
+
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+def get_database_gauges(connection):
+    """
+    Utility function that returns the {name: (help, value)} gauges of a database connection for `RequestMetrics.render`:
+    the usage and wait statistics of its psycopg pool if pooled, otherwise the number of connections opened.
+    """
+    pool = getattr(connection, 'pool', None)
+
+    if pool is None:
+        return {'db_connections_opened': ('Database connections opened.', request_metrics.connections_opened)}
+
+    stats = pool.get_stats()
+    return {
+        'db_connections_opened': ('Database connections opened by the pool.', stats.get('connections_num', 0)),
+        'db_connect_seconds': ('Time spent opening the connections of the pool.', stats.get('connections_ms', 0) / 1000),
+        'db_pool_max_size': ('Maximum number of connections in the pool.', stats['pool_max']),
+        'db_pool_size': ('Connections in the pool, in use or idle.', stats['pool_size']),
+        'db_pool_available': ('Idle connections in the pool.', stats['pool_available']),
+        'db_pool_requests': ('Connections taken from the pool.', stats.get('requests_num', 0)),
+        'db_pool_requests_queued': ('Connections taken from the pool after waiting for one to be free.', stats.get('requests_queued', 0)),
+        'db_pool_requests_waiting': ('Requests currently waiting for a free connection.', stats['requests_waiting']),
+        'db_pool_wait_seconds': ('Time spent waiting for a free connection.', stats.get('requests_wait_ms', 0) / 1000),
+        'db_pool_usage_seconds': ('Time the connections were in use.', stats.get('usage_ms', 0) / 1000),
+        'db_pool_timeouts': ('Requests that got no connection within DB_POOL_TIMEOUT.', stats.get('requests_errors', 0)),
+    }
+
+
+def format_server_timing(duration, db_duration, db_queries):
+    """
+    Utility function that returns the `Server-Timing` header value of a request, durations in milliseconds.
+    """
+    return (
+        f'db;dur={db_duration * 1000:.1f};desc="{db_queries} queries", '
+        f'app;dur={max(duration - db_duration, 0.0) * 1000:.1f}, '
+        f'total;dur={duration * 1000:.1f}'
+    )
+
+
+def query_budget(queries):
+    """
+    Decorator for read views that declares the number of SQL queries their GET requests run, whatever the data size.
+    Only sets the `query_budget` attribute on the view, enforced by `api/tests/test_query_budgets.py`.
+    Must be the outermost decorator, so the attribute ends up on the view the URLs route to.
+    """
+    def decorator(view):
+        view.query_budget = queries
+        return view
+
+    return decorator
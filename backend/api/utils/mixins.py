@@ -100,14 +100,177 @@ class UIDTokenValidationSerializer(serializers.Serializer):
         return attrs
 
 
+class AsyncSerializerMixin:
+    """
+    Utility mixin for the serializers of async views, which can't run the (sync) ORM from `is_valid()` or `data`:
+
+    - ais_valid(): runs the field validation (no database), then the async object-level `avalidate()`
+    - adata():     returns the async `ato_representation()` of the instance, or of the validated data
+    """
+    async def avalidate(self, attrs):
+        return attrs
+
+    async def ato_representation(self, instance):
+        raise NotImplementedError('`ato_representation()` must be implemented.')
+
+    async def ais_valid(self, raise_exception=False):
+        from django.core.exceptions import ValidationError as DjangoValidationError
+
+        try:
+            attrs = self.to_internal_value(self.initial_data)
+            self._validated_data = await self.avalidate(attrs)
+        except (serializers.ValidationError, DjangoValidationError) as exc:
+            self._validated_data = {}
+            self._errors = serializers.as_serializer_error(exc)
+        else:
+            self._errors = {}
+
+        if self._errors and raise_exception:
+            raise serializers.ValidationError(self.errors)
+
+        return not bool(self._errors)
+
+    async def adata(self):
+        return await self.ato_representation(self.instance if self.instance is not None else self.validated_data)
+
+
+class CursorPaginationSerializer(serializers.Serializer):
+    """
+    Utility serializer that handles opt-in keyset pagination for list endpoints, from which other serializers inherit.
+
+    - cursor (OPTIONAL): opaque cursor returned as `next_cursor` by the previous page
+    - limit  (OPTIONAL): page size, pagination is only applied if either cursor or limit is provided
+
+    Pages are selected by filtering on the ordering columns of the last returned row (no OFFSET scans),
+    so the ordering must be unique and should be backed by an index, e.g. ('date', 'slot', 'id').
+    """
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT)
+
+    def is_paginated(self):
+        return 'cursor' in self.validated_data or 'limit' in self.validated_data
+
+    def _encode_cursor(self, values):
+        import base64
+        import json
+
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode_cursor(self, cursor, ordering):
+        import base64
+        import binascii
+        import json
+
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (ValueError, binascii.Error):
+            raise serializers.ValidationError('Invalid cursor.')
+
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise serializers.ValidationError('Invalid cursor.')
+
+        return values
+
+    def _get_keyset_filter(self, ordering, values):
+        """
+        Builds the filter selecting rows strictly after `values` on the given ordering:
+        a >= va AND ((a > va) OR (a = va AND b > vb) OR (a = va AND b = vb AND c > vc) ...)
+        The leading bound on the first column lets the database start the index scan at the cursor, it can't use the
+        OR chain alone as a range.
+        """
+        from django.db.models import Q
+
+        keyset = Q()
+        for index, field in enumerate(ordering):
+            condition = Q(**{f'{field}__gt': values[index]})
+
+            for previous_field, previous_value in zip(ordering[:index], values[:index]):
+                condition &= Q(**{previous_field: previous_value})
+
+            keyset |= condition
+
+        if len(ordering) > 1:
+            keyset &= Q(**{f'{ordering[0]}__gte': values[0]})
+
+        return keyset
+
+    def _get_page_queryset(self, queryset, ordering):
+        """
+        Returns the queryset of the requested page, with one extra row telling if there is a next page.
+        """
+        from django.core.exceptions import ValidationError
+
+        limit = self.validated_data.get('limit', self.DEFAULT_LIMIT)
+        cursor = self.validated_data.get('cursor')
+
+        queryset = queryset.order_by(*ordering)
+
+        if cursor:
+            values = self._decode_cursor(cursor, ordering)
+
+            try:
+                queryset = queryset.filter(self._get_keyset_filter(ordering, values))
+            except (ValidationError, ValueError, TypeError):
+                raise serializers.ValidationError('Invalid cursor.')
+
+        return queryset[:limit + 1]
+
+    def _split_page(self, page, ordering):
+        limit = self.validated_data.get('limit', self.DEFAULT_LIMIT)
+
+        if len(page) <= limit:
+            return page, None
+
+        page = page[:limit]
+        last = page[-1]
+        return page, self._encode_cursor([getattr(last, field) for field in ordering])
+
+    def paginate_queryset(self, queryset, ordering):
+        """
+        Returns the requested page of the queryset and the cursor for the next page (None if it's the last one).
+        """
+        return self._split_page(list(self._get_page_queryset(queryset, ordering)), ordering)
+
+    async def apaginate_queryset(self, queryset, ordering):
+        """
+        Async version of `paginate_queryset()`, for async views.
+        """
+        return self._split_page([obj async for obj in self._get_page_queryset(queryset, ordering)], ordering)
+
+    def get_list_representation(self, key, queryset, ordering, to_dict):
+        """
+        Serializes the queryset under `key`, paginated when requested, otherwise as the full list.
+        """
+        if not self.is_paginated():
+            return {key: [to_dict(obj) for obj in queryset]}
+
+        page, next_cursor = self.paginate_queryset(queryset, ordering)
+        return {key: [to_dict(obj) for obj in page], 'next_cursor': next_cursor}
+
+    async def aget_list_representation(self, key, queryset, ordering, to_dict):
+        """
+        Async version of `get_list_representation()`, for async views. `to_dict` must not query the database.
+        """
+        if not self.is_paginated():
+            return {key: [to_dict(obj) async for obj in queryset]}
+
+        page, next_cursor = await self.apaginate_queryset(queryset, ordering)
+        return {key: [to_dict(obj) for obj in page], 'next_cursor': next_cursor}
+
+
 class ModelInstanceOrIDValidationMixin:
     """
     Mixin to fetch and validate a user model instance from either an instance or a PK in context.
     """
-    def validate_user_model(self, model, attrs, check_active):
-        from ..models import User
-        model_name = model.__name__
-        out_key = model_name.lower()
+    def _get_user_reference(self, model, attrs):
+        """
+        Returns the instance or PK of the model given in `context` or `attrs`.
+        """
+        out_key = model.__name__.lower()
         context_keys = [out_key, f"{out_key}_id"]
         found = None
         
@@ -124,7 +287,20 @@ class ModelInstanceOrIDValidationMixin:
                 break
             
         if not found:
-            raise serializers.ValidationError(f"No {model_name} or ID provided in context.")
+            raise serializers.ValidationError(f"No {model.__name__} or ID provided in context.")
+
+        return found
+
+    def validate_user_model(self, model, attrs, check_active):
+        from ..backends.tokens import LazyTokenUser
+        from ..models import User
+        model_name = model.__name__
+        out_key = model_name.lower()
+        found = self._get_user_reference(model, attrs)
+
+        # `request.user` is only loaded (from the user cache or the database) once a serializer needs it
+        if isinstance(found, LazyTokenUser):
+            found = found.resolve()
         
         # If it's the correct model instance, return directly
         if isinstance(found, model):
@@ -134,11 +310,12 @@ class ModelInstanceOrIDValidationMixin:
             attrs[out_key] = found
             return attrs
         
-        # If instance of User, get the correct related model (client/barber/admin):
+        # If instance of User, get the correct related model (client/barber/admin). `request.user` is already loaded
+        # as its role model by the JWT authentication, so this JOIN is only left for tokens without a role claim
         if isinstance(found, User):
             user_type_name = model_name.lower()
 
-            if hasattr(found, user_type_name):
+            if User.get_role_model(found.role) is model and hasattr(found, user_type_name):
                 user_type = getattr(found, user_type_name, None)
 
                 if user_type:
@@ -150,10 +327,12 @@ class ModelInstanceOrIDValidationMixin:
                 
             raise serializers.ValidationError(f"User does not have a {user_type_name} profile.")
 
-        # If it's a valid integer pk, query for instance
+        # If it's a valid integer pk, query for instance (once per request)
         if isinstance(found, int):
+            from .identity import get_instance
+
             try:
-                user = model.objects.get(pk=found, is_active=True)
+                user = get_instance(model, found, is_active=True)
             except model.DoesNotExist:
                 raise serializers.ValidationError(f'{model_name} with ID: "{found}" does not exist or is inactive.')
             
@@ -163,6 +342,40 @@ class ModelInstanceOrIDValidationMixin:
         # If it's neither, fallback error
         raise serializers.ValidationError(f"{model_name} must be provided as an instance or a primary key, not '{found}'.")
 
+    async def avalidate_user_model(self, model, attrs, check_active, queryset=None):
+        """
+        Async version of `validate_user_model()`, for async views. Primary keys are looked up with the async ORM,
+        in `queryset` if given (e.g. to load the profile data along).
+        """
+        from asgiref.sync import sync_to_async
+        from ..backends.tokens import LazyTokenUser
+
+        model_name = model.__name__
+        found = self._get_user_reference(model, attrs)
+
+        # Loaded in a thread, `validate_user_model()` below reads it back from `attrs`
+        if isinstance(found, LazyTokenUser):
+            found = attrs[model_name.lower()] = await found.aresolve()
+
+        if isinstance(found, int):
+            from .identity import aget_instance
+
+            try:
+                if queryset is not None:
+                    attrs[model_name.lower()] = await queryset.aget(pk=found, is_active=True)
+                else:
+                    attrs[model_name.lower()] = await aget_instance(model, found, is_active=True)
+            except model.DoesNotExist:
+                raise serializers.ValidationError(f'{model_name} with ID: "{found}" does not exist or is inactive.')
+
+            return attrs
+
+        # Instances are checked without querying, except to resolve a User into its role model
+        if isinstance(found, model):
+            return self.validate_user_model(model, attrs, check_active)
+
+        return await sync_to_async(self.validate_user_model)(model, attrs, check_active)
+
 
 class UserValidationMixin(ModelInstanceOrIDValidationMixin):
     """
@@ -172,6 +385,10 @@ class UserValidationMixin(ModelInstanceOrIDValidationMixin):
         from ..models import User
         return self.validate_user_model(User, attrs, check_active)
 
+    async def avalidate_user(self, attrs, check_active=True):
+        from ..models import User
+        return await self.avalidate_user_model(User, attrs, check_active)
+
 
 class AdminValidationMixin(ModelInstanceOrIDValidationMixin):
     """
@@ -190,6 +407,10 @@ class ClientValidationMixin(ModelInstanceOrIDValidationMixin):
         from ..models import Client
         return self.validate_user_model(Client, attrs, check_active)
 
+    async def avalidate_client(self, attrs, check_active=True, queryset=None):
+        from ..models import Client
+        return await self.avalidate_user_model(Client, attrs, check_active, queryset)
+
 
 class BarberValidationMixin(ModelInstanceOrIDValidationMixin):
     """
@@ -199,6 +420,10 @@ class BarberValidationMixin(ModelInstanceOrIDValidationMixin):
         from ..models import Barber
         return self.validate_user_model(Barber, attrs, check_active)
 
+    async def avalidate_barber(self, attrs, check_active=True, queryset=None):
+        from ..models import Barber
+        return await self.avalidate_user_model(Barber, attrs, check_active, queryset)
+
 
 class AppointmentValidationMixin:
     """
@@ -208,33 +433,62 @@ class AppointmentValidationMixin:
     - Verifies provided services all belong to the specified barber before creating or modifying an appointment.
     - Checks that an availability entry exists for the barber on the desired date, and that the requested time slot is included in the barber's available slots.
     - Confirms the existence of a specific appointment for the client and ensures it is ONGOING before allowing cancellation.
+    - Books appointments in a single transaction, serialized per barber and date by a lock on the availability row.
     """
     def validate_services_belong_to_barber(self, attrs):
+        from ..models import Service
+
         barber = attrs['barber']
-        services = attrs['services']
+        service_ids = list(dict.fromkeys(attrs['services']))  # Drops duplicates, keeps order
 
-        for service in services:
-            if service.barber_id != barber.id:
-                raise serializers.ValidationError(f'Service with ID "{service.id}" for the barber "{barber}" does not exist.')
-            
+        # All the requested services are resolved with a single query
+        services = Service.objects.in_bulk(service_ids, field_name='id') if service_ids else {}
+
+        for service_id in service_ids:
+            if service_id not in services or services[service_id].barber_id != barber.id:
+                raise serializers.ValidationError(f'Service with ID "{service_id}" for the barber "{barber}" does not exist.')
+
+        attrs['services'] = [services[service_id] for service_id in service_ids]
         return attrs
 
+    def _get_appointment_conflict(self, client, barber, appointment_date, appointment_slot):
+        """
+        Returns the error message of the first conflicting appointment, checked with a single query, or None.
+        """
+        from django.db.models import Q
+        from ..models import Appointment, AppointmentStatus
+
+        conflicts = Appointment.objects.filter(
+            Q(client=client, status=AppointmentStatus.ONGOING.value) |
+            Q(client=client, date=appointment_date) |
+            Q(barber=barber, date=appointment_date, slot=appointment_slot)
+        ).exclude(status=AppointmentStatus.CANCELLED.value).values('client_id', 'barber_id', 'date', 'slot', 'status')
+
+        conflicts = list(conflicts)
+
+        if any(conflict['client_id'] == client.id and conflict['status'] == AppointmentStatus.ONGOING.value for conflict in conflicts):
+            return f'Client: "{client}" already has an ONGOING appointment.'
+
+        if any(conflict['client_id'] == client.id and conflict['date'] == appointment_date for conflict in conflicts):
+            return f'Appointment for the date "{appointment_date}" for the client: "{client}" already exists.'
+
+        if conflicts:
+            return f'Appointment for the date: "{appointment_date}" in the slot: "{appointment_slot}" for the barber: "{barber}" already exists.'
+
+        return None
+
     def validate_appointment_date_and_slot(self, attrs):
-        from ..models import Appointment, Availability, AppointmentStatus
+        from ..models import Availability
 
         client = attrs['client']
         barber = attrs['barber']
         appointment_date = attrs['date']
         appointment_slot = attrs['slot']
 
-        if Appointment.objects.filter(client=client, status=AppointmentStatus.ONGOING.value).exists():
-            raise serializers.ValidationError(f'Client: "{client}" already has an ONGOING appointment.')
+        conflict = self._get_appointment_conflict(client, barber, appointment_date, appointment_slot)
 
-        if Appointment.objects.filter(client=client, date=appointment_date).exclude(status=AppointmentStatus.CANCELLED.value).exists():
-            raise serializers.ValidationError(f'Appointment for the date "{appointment_date}" for the client: "{client}" already exists.')
-
-        if Appointment.objects.filter(barber=barber, date=appointment_date, slot=appointment_slot).exclude(status=AppointmentStatus.CANCELLED.value).exists():
-            raise serializers.ValidationError(f'Appointment for the date: "{appointment_date}" in the slot: "{appointment_slot}" for the barber: "{barber}" already exists.')
+        if conflict:
+            raise serializers.ValidationError(conflict)
 
         try:
             availability = Availability.objects.get(barber=barber, date=appointment_date)
@@ -243,11 +497,55 @@ class AppointmentValidationMixin:
         
         slot_str = appointment_slot.strftime('%H:%M')
 
-        if slot_str not in availability.slots:
+        if not availability.has_slot(appointment_slot):
             raise serializers.ValidationError(f'Barber: "{barber}" is not available at "{slot_str}" on "{appointment_date}".')
 
+        attrs['availability'] = availability
         return attrs
-    
+
+    def book_appointment(self, validated_data):
+        """
+        Books the appointment and its line items in one transaction, holding a lock on the barber's availability row
+        for that date, so concurrent bookings of the same barber and date are serialized and re-checked.
+        Raises ConflictError (409) if the slot was taken in the meantime, or a uniqueness constraint is violated.
+        """
+        from django.db import transaction, IntegrityError
+        from ..models import Appointment, AppointmentService, Availability
+        from ..backends.exceptions import ConflictError
+        from .scheduler import schedule_appointment_events
+
+        client = validated_data['client']
+        barber = validated_data['barber']
+        appointment_date = validated_data['date']
+        appointment_slot = validated_data['slot']
+        services = validated_data['services']
+
+        try:
+            with transaction.atomic():
+                availability = Availability.objects.select_for_update().filter(pk=validated_data['availability'].pk).first()
+
+                if availability is None or not availability.has_slot(appointment_slot):
+                    raise ConflictError(f'Barber: "{barber}" is no longer available at "{appointment_slot.strftime("%H:%M")}" on "{appointment_date}".')
+
+                conflict = self._get_appointment_conflict(client, barber, appointment_date, appointment_slot)
+
+                if conflict:
+                    raise ConflictError(conflict)
+
+                appointment = Appointment.objects.create(client=client, barber=barber, date=appointment_date, slot=appointment_slot)
+                AppointmentService.objects.bulk_create([
+                    AppointmentService(appointment=appointment, name=service.name, price=service.price, original_service=service)
+                    for service in services
+                ])
+
+                # Reminder and completion are popped from the schedule when due, once the booking commits
+                schedule_appointment_events(appointment)
+
+        except IntegrityError:
+            raise ConflictError(f'Appointment for the date: "{appointment_date}" in the slot: "{appointment_slot}" was booked concurrently.')
+
+        return appointment
+
     def validate_find_appointment(self, attrs):
         from ..models import Appointment, AppointmentStatus
 
@@ -273,6 +571,7 @@ class AvailabilityValidationMixin:
     - Ensures a barber does not already have an availability set for the same date, preventing duplicate availabilities on a single day.
     - Validates the existence of an availability entry for the given barber and specified ID before allowing retrieval or update operations.
     - Built in util function that generates the slots based on input start/end time and interval
+    - Built in util functions that expand a date range and upsert the availabilities of one or more barbers in bulk
     """
     def validate_availability_date(self, attrs, availability_instance=None):
         from ..models import Availability
@@ -304,6 +603,66 @@ class AvailabilityValidationMixin:
         attrs['availability'] = availability
         return attrs
     
+    def validate_availability_range(self, attrs):
+        start_date = attrs['start_date']
+        end_date = attrs.get('end_date', start_date) # Defaults back to start_date if omitted
+
+        if end_date < start_date:
+            raise serializers.ValidationError("end_date cannot be before start_date")
+        
+        attrs['end_date'] = end_date  # ensure always present and >= start
+        attrs['slot_interval'] = attrs.get('slot_interval', 30)
+
+        return attrs
+
+    def get_target_dates(self, start_date, end_date, days_of_week=None):
+        from datetime import timedelta
+
+        # Single day mode, ignores days_of_week
+        if start_date == end_date:
+            return [start_date]
+
+        # Multi day mode, filters by days_of_week if provided
+        span = (end_date - start_date).days + 1
+        raw_dates = [start_date + timedelta(days=days) for days in range(span)]
+
+        if days_of_week:
+            return [day for day in raw_dates if day.weekday() in days_of_week]
+        
+        return raw_dates
+
+    def upsert_availabilities(self, barbers, validated_data):
+        """
+        Creates or overwrites the availabilities of the given barbers for every target date,
+        with a single bulk INSERT ... ON CONFLICT (barber, date) DO UPDATE inside one transaction.
+        """
+        from django.db import transaction
+        from ..models import Availability
+        from .cache import invalidate_public_cache, barber_cache_scope, BARBERS_CACHE_SCOPE
+
+        target_dates = self.get_target_dates(validated_data['start_date'], validated_data['end_date'], validated_data.get('days_of_week'))
+        slots = self.generate_slots(validated_data['start_time'], validated_data['end_time'], validated_data['slot_interval'])
+
+        if not slots or not target_dates:
+            return []
+
+        availabilities = [Availability(barber=barber, date=date, slots=slots) for barber in barbers for date in target_dates]
+
+        # Uniqueness enforced by the conflict on (barber, date) (overwrite for admin)
+        with transaction.atomic():
+            availabilities = Availability.objects.bulk_create(
+                availabilities,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['barber', 'date'],
+                update_fields=['slot_mask'],
+            )
+
+            # Bulk writes send no signals
+            invalidate_public_cache(BARBERS_CACHE_SCOPE, *(barber_cache_scope(barber.id) for barber in barbers))
+
+        return availabilities
+
     def generate_slots(self, start_time, end_time, interval):
         from datetime import timedelta, datetime
 
@@ -343,12 +702,13 @@ class ServiceValidationMixin:
 
     def validate_find_service(self, attrs):
         from ..models import Service
+        from .identity import get_instance
 
         barber = attrs['barber']
         service_id = self.context.get('service_id')
 
         try:
-            service = Service.objects.get(barber=barber, pk=service_id)
+            service = get_instance(Service, service_id, barber_id=barber.pk)
         except Service.DoesNotExist:
             raise serializers.ValidationError(f'Service with the ID: "{service_id}" for the barber: "{barber}" does not exist.')
         
@@ -421,14 +781,16 @@ class GetBarbersMixin:
     Mixin for retrieving and serializing Barber models.
     """
     _PUBLIC_EXCLUDES = ['email', 'completed_appointments',  'upcoming_appointments', 'availabilities', 'is_active', 'total_revenue']
+    _CURSOR_ORDERING = ('id',)
 
     def get_barbers_queryset(self, show_all=False):
         """
-        Returns Barber queryset in the system.
+        Returns Barber queryset in the system, with the profile data loaded in bulk.
         If show_all is True, returns all barbers.
         """
         from ..models import Barber
-        return Barber.objects.filter(is_active=True) if not show_all else Barber.objects.all()
+        barbers = Barber.objects.filter(is_active=True) if not show_all else Barber.objects.all()
+        return barbers.with_profile_data()
     
     def get_barber_public(self, barber):
         """
@@ -468,7 +830,7 @@ class GetBarbersMixin:
         barber_ids = client.appointments_created.filter(status=AppointmentStatus.COMPLETED.value).values_list('barber_id', flat=True).distinct()
 
         # Only active barbers (is_active=True), matching get_barbers_public
-        return [self.get_barber_public(barber) for barber in Barber.objects.filter(id__in=barber_ids, is_active=True)]
+        return [self.get_barber_public(barber) for barber in Barber.objects.filter(id__in=barber_ids, is_active=True).with_profile_data()]
 
 
 class GetClientsMixin:
@@ -476,14 +838,16 @@ class GetClientsMixin:
     Mixin for retrieving and serializing Client models.
     """
     _PUBLIC_EXCLUDES = ['email', 'phone_number', 'is_active', 'total_appointments', 'completed_appointments', 'next_appointment', 'total_spent']
+    _CURSOR_ORDERING = ('id',)
 
     def get_clients_queryset(self, show_all=False):
         """
-        Returns Client queryset in the system.
+        Returns Client queryset in the system, with the profile data loaded in bulk.
         If show_all is True, returns all clients.
         """
         from ..models import Client
-        return Client.objects.filter(is_active=True) if not show_all else Client.objects.all()
+        clients = Client.objects.filter(is_active=True) if not show_all else Client.objects.all()
+        return clients.with_profile_data()
     
     def get_client_public(self, client):
         """
@@ -526,58 +890,76 @@ class GetAvailabilitiesMixin:
         import datetime
         return Availability.objects.filter(barber_id=barber_id, date__gte=datetime.date.today()) if not show_all else Availability.objects.all()
 
-    def _remove_booked_slots(self, barber, date, slots):
+    def _get_booked_mask(self, barber_id, date):
         """
-        Given a barber, date, and a list of slots, return list of slots which are not already booked.
+        Given a barber and date, returns the bitmask of the slots already booked (non-cancelled appointments).
         """
         from ..models import Appointment, AppointmentStatus
+        from .slots import times_to_mask
+
+        booked_slots = Appointment.objects.filter(barber_id=barber_id, date=date).exclude(status=AppointmentStatus.CANCELLED.value).values_list('slot', flat=True)
+        return times_to_mask(booked_slots)
+
+    def _get_booked_slots_queryset(self, availabilities):
+        """
+        Given Availability instances, returns the (barber_id, date, slot) of their non-cancelled appointments.
+        """
+        from ..models import Appointment, AppointmentStatus
+
+        return Appointment.objects.filter(
+            barber_id__in={availability.barber_id for availability in availabilities},
+            date__in={availability.date for availability in availabilities},
+        ).exclude(status=AppointmentStatus.CANCELLED.value).values_list('barber_id', 'date', 'slot')
+
+    def _group_booked_masks(self, booked):
+        """
+        Given (barber_id, date, slot) rows, returns {(barber_id, date): bitmask of the booked slots}.
+        """
+        from .slots import time_to_minute
+
+        booked_masks = {}
+        for barber_id, date, slot in booked:
+            booked_masks[(barber_id, date)] = booked_masks.get((barber_id, date), 0) | 1 << time_to_minute(slot)
 
-        # Get all non-cancelled appointments for this barber/date, get their slots
-        booked_slots = set(Appointment.objects.filter(barber=barber, date=date,).exclude(status=AppointmentStatus.CANCELLED.value).values_list('slot', flat=True))
+        return booked_masks
 
-        # Convert booked_slots to string format for comparison (slot is a time object, slots are strings: "HH:MM")
-        booked_slots_str = {s.strftime("%H:%M") for s in booked_slots}
+    def _get_booked_masks(self, availabilities):
+        """
+        Given Availability instances, returns {(barber_id, date): bitmask of the slots already booked} with a single query.
+        """
+        return self._group_booked_masks(self._get_booked_slots_queryset(availabilities))
 
-        # Only keep slots that are not in the booked slots
-        return [slot for slot in slots if slot not in booked_slots_str]
+    async def _aget_booked_masks(self, availabilities):
+        """
+        Async version of `_get_booked_masks()`, for async views.
+        """
+        return self._group_booked_masks([row async for row in self._get_booked_slots_queryset(availabilities)])
     
-    def _filter_slots(self, availability):
+    def _filter_slots(self, availability, booked_mask=None):
         """
         Given an Availability instance, filter out:
         - slots that are in the past (if today)
-        - slots that are already booked (non-cancelled appointment)
+        - slots that are already booked (non-cancelled appointment), given as `booked_mask` or queried
         """
         import datetime
+        from .slots import mask_after, mask_to_slots
 
         today = datetime.date.today()
         now = datetime.datetime.now().time()
 
-        slots = availability.slots
+        mask = availability.mask
         
         # If today, filter out past slots
         if availability.date == today:
-            slots = [slot for slot in slots if self._slot_str_is_future(slot, now)]
+            mask &= mask_after(now)
         
         # Then always filter out booked slots
-        slots = self._remove_booked_slots(availability.barber, availability.date, slots)
+        if booked_mask is None:
+            booked_mask = self._get_booked_mask(availability.barber_id, availability.date)
 
-        return slots
-
-    def _slot_str_is_future(self, slot_str, now_time):
-        """
-        slot_str: e.g. "14:00"
-        now_time: a datetime.time object
-        Returns True if slot_str represents a time strictly AFTER now_time.
-        """
-        import datetime
+        mask &= ~booked_mask
 
-        try:
-            hour, minute = map(int, slot_str.split(':'))
-            slot_time = datetime.time(hour=hour, minute=minute)
-            return slot_time > now_time
-        
-        except Exception:
-            return False
+        return mask_to_slots(mask)
 
     def get_availability_public(self, availability):
         """
@@ -592,9 +974,20 @@ class GetAvailabilitiesMixin:
         Returns list of availability dicts ONLY with future-dated availabilities, and with slots filtered for "today".
         Removes any today-availabilities that have zero remaining slots.
         """
+        availabilities = list(self._get_availabilities_queryset(barber_id=barber_id, show_all=show_all))
+        return self._build_availabilities_public(availabilities, self._get_booked_masks(availabilities))
+
+    async def aget_availabilities_public(self, barber_id, show_all=False):
+        """
+        Async version of `get_availabilities_public()`, for async views.
+        """
+        availabilities = [availability async for availability in self._get_availabilities_queryset(barber_id=barber_id, show_all=show_all)]
+        return self._build_availabilities_public(availabilities, await self._aget_booked_masks(availabilities))
+
+    def _build_availabilities_public(self, availabilities, booked_masks):
         result = []
-        for availability in self._get_availabilities_queryset(barber_id=barber_id, show_all=show_all):
-            filtered_slots = self._filter_slots(availability)
+        for availability in availabilities:
+            filtered_slots = self._filter_slots(availability, booked_masks.get((availability.barber_id, availability.date), 0))
 
             if filtered_slots:
                 availability_data = availability.to_dict()
@@ -603,6 +996,94 @@ class GetAvailabilitiesMixin:
 
         return result
 
+    def search_free_slots(self, start_date, limit, service_name=None, horizon_days=60, chunk_days=7):
+        """
+        Returns the earliest `limit` free slots from start_date across all active barbers, ordered by (date, slot, barber).
+        Optionally only considers barbers offering a service with the given name (case insensitive).
+
+        The horizon is scanned in chunks of days, each answered with two set-based queries (availabilities, booked slots)
+        over the date indexes, so the cost doesn't grow with the number of barbers and usually stops after the first chunk.
+        """
+        results = []
+        for rows, booked in self._iter_search_chunks(start_date, service_name, horizon_days, chunk_days):
+            results.extend(self._get_free_slot_candidates(rows, booked)[:limit - len(results)])
+
+            if len(results) >= limit:
+                break
+
+        return self._format_free_slots(results)
+
+    async def asearch_free_slots(self, start_date, limit, service_name=None, horizon_days=60, chunk_days=7):
+        """
+        Async version of `search_free_slots()`, for async views.
+        """
+        results = []
+        for rows, booked in self._iter_search_chunks(start_date, service_name, horizon_days, chunk_days):
+            rows, booked = [row async for row in rows], [row async for row in booked]
+            results.extend(self._get_free_slot_candidates(rows, booked)[:limit - len(results)])
+
+            if len(results) >= limit:
+                break
+
+        return self._format_free_slots(results)
+
+    def _iter_search_chunks(self, start_date, service_name, horizon_days, chunk_days):
+        """
+        Yields the (availabilities, booked slots) querysets of each chunk of days of the search horizon.
+        """
+        import datetime
+        from django.db.models import Exists, OuterRef
+        from ..models import Availability, Appointment, AppointmentStatus, Service
+
+        end_date = start_date + datetime.timedelta(days=horizon_days - 1)
+
+        availabilities = Availability.objects.filter(barber__is_active=True)
+        if service_name:
+            availabilities = availabilities.filter(Exists(Service.objects.filter(barber_id=OuterRef('barber_id'), name__iexact=service_name)))
+
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + datetime.timedelta(days=chunk_days - 1), end_date)
+
+            yield (
+                availabilities.filter(date__range=(chunk_start, chunk_end)).values_list('barber_id', 'date', 'slot_mask'),
+                Appointment.objects.filter(date__range=(chunk_start, chunk_end), barber__isnull=False).exclude(status=AppointmentStatus.CANCELLED.value).values_list('barber_id', 'date', 'slot'),
+            )
+
+            chunk_start = chunk_end + datetime.timedelta(days=1)
+
+    def _get_free_slot_candidates(self, rows, booked):
+        """
+        Returns the free slots of every barber/date as (date, minute, barber_id), sorted into booking order.
+        """
+        import datetime
+        from .slots import bytes_to_mask, mask_after
+
+        today = datetime.date.today()
+        now = datetime.datetime.now().time()
+        booked_masks = self._group_booked_masks(booked)
+
+        candidates = []
+        for barber_id, date, slot_mask in rows:
+            mask = bytes_to_mask(slot_mask) & ~booked_masks.get((barber_id, date), 0)
+
+            if date == today:
+                mask &= mask_after(now)
+
+            while mask:
+                lowest = mask & -mask
+                candidates.append((date, lowest.bit_length() - 1, barber_id))
+                mask ^= lowest
+
+        candidates.sort()
+        return candidates
+
+    def _format_free_slots(self, results):
+        return [
+            {'barber_id': barber_id, 'date': date, 'slot': f'{minute // 60:02d}:{minute % 60:02d}'}
+            for date, minute, barber_id in results
+        ]
+
 
 class GetServicesMixin:
     """
@@ -628,20 +1109,28 @@ class GetServicesMixin:
         """
         return [self.get_service_public(b) for b in self.get_services_queryset(barber_id=barber_id, show_all=show_all)]
 
+    async def aget_services_public(self, barber_id, show_all=False):
+        """
+        Async version of `get_services_public()`, for async views.
+        """
+        return [self.get_service_public(b) async for b in self.get_services_queryset(barber_id=barber_id, show_all=show_all)]
+
 
 class GetAppointmentsMixin:
     """
     Mixin for retrieving and serializing Appointment models.
     """
+    _CURSOR_ORDERING = ('date', 'slot', 'id')
+
     def get_appointments_queryset(self, barber_id=None, client_id=None, show_all=False):
         """
-        Returns Appointment queryset filtered by barber or client.
+        Returns Appointment queryset filtered by barber or client, with the line items loaded in bulk.
         If show_all is True, returns all appointments. (For admin use only!)
         """
         from ..models import Appointment
 
         if show_all:
-            return Appointment.objects.all()
+            return Appointment.objects.with_line_items()
         
         if barber_id and client_id:
             raise serializers.ValidationError('Appointments Queryset Error: Provide only a barber_id or a client_id, not both.')
@@ -650,9 +1139,9 @@ class GetAppointmentsMixin:
             raise serializers.ValidationError('Appointments Queryset Error: Provide either a barber_id or a client_id.')
         
         if barber_id:
-            return Appointment.objects.filter(barber_id=barber_id)
+            return Appointment.objects.filter(barber_id=barber_id).with_line_items()
         
-        return Appointment.objects.filter(client_id=client_id)
+        return Appointment.objects.filter(client_id=client_id).with_line_items()
     
     def get_appointment_public(self, appointment):
         """
@@ -672,6 +1161,8 @@ class GetReviewsMixin:
     """
     Mixin for retrieving and serializing Review models.
     """
+    _CURSOR_ORDERING = ('created_at', 'id')
+
     def get_reviews_queryset(self, barber_id=None, client_id=None, show_all=False):
         """
         Returns Review queryset filtered by barber or client.
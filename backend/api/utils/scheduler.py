@@ -0,0 +1,153 @@
+import datetime
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# Due instants of the appointment lifecycle events, stored in a Redis sorted set scored by UNIX timestamp
+APPOINTMENT_SCHEDULE_KEY = 'appointments:schedule'
+
+REMINDER_EVENT = 'remind'
+COMPLETION_EVENT = 'complete'
+
+# How long before the appointment its reminder is due
+REMINDER_LEAD_TIME = datetime.timedelta(hours=1)
+
+# Maximum number of due events popped by one dispatch
+DISPATCH_BATCH_SIZE = 500
+
+_client = None
+
+
+def get_schedule_client():
+    """
+    Utility function that returns the Redis client of the appointment schedule, or None if the scheduler is disabled.
+    """
+    global _client
+
+    if not settings.APPOINTMENT_SCHEDULE_URL:
+        return None
+
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.APPOINTMENT_SCHEDULE_URL, socket_timeout=5)
+
+    return _client
+
+
+def get_appointment_events(appointment):
+    """
+    Utility function that returns the {member: due timestamp} lifecycle events of an appointment:
+    its reminder one hour before it starts, and its completion when it starts.
+    """
+    start = timezone.make_aware(datetime.datetime.combine(appointment.date, appointment.slot), timezone.get_current_timezone())
+
+    return {
+        f'{REMINDER_EVENT}:{appointment.id}': (start - REMINDER_LEAD_TIME).timestamp(),
+        f'{COMPLETION_EVENT}:{appointment.id}': start.timestamp(),
+    }
+
+
+def _schedule(appointment):
+    client = get_schedule_client()
+
+    if client is None:
+        return
+
+    events = get_appointment_events(appointment)
+
+    try:
+        client.zadd(APPOINTMENT_SCHEDULE_KEY, events)
+    except Exception:
+        logger.exception('Could not schedule the events of appointment %s, left to the sweep tasks.', appointment.id)
+        return
+
+    # Events already (or almost) due are dispatched right away instead of at the next beat tick
+    wait = min(events.values()) - timezone.now().timestamp()
+    if wait < settings.APPOINTMENT_DISPATCH_INTERVAL:
+        from ..tasks import dispatch_appointment_events
+        dispatch_appointment_events.apply_async(countdown=max(wait, 0))
+
+
+def _unschedule(appointment_id):
+    client = get_schedule_client()
+
+    if client is None:
+        return
+
+    try:
+        client.zrem(APPOINTMENT_SCHEDULE_KEY, f'{REMINDER_EVENT}:{appointment_id}', f'{COMPLETION_EVENT}:{appointment_id}')
+    except Exception:
+        logger.exception('Could not unschedule the events of appointment %s.', appointment_id)
+
+
+def schedule_appointment_events(appointment):
+    """
+    Utility function that records the reminder and completion instants of a booked appointment in the schedule,
+    once the booking transaction commits.
+    """
+    transaction.on_commit(lambda: _schedule(appointment))
+
+
+def unschedule_appointment_events(appointment_id):
+    """
+    Utility function that removes the pending events of a cancelled appointment from the schedule,
+    once the cancellation transaction commits.
+    """
+    transaction.on_commit(lambda: _unschedule(appointment_id))
+
+
+def pop_due_appointment_events(now=None):
+    """
+    Utility function that removes the due events from the schedule and returns them as {event: [appointment IDs]}.
+    An event is returned only by the call that removed it, so concurrent dispatchers never handle it twice.
+    """
+    client = get_schedule_client()
+    due = {REMINDER_EVENT: [], COMPLETION_EVENT: []}
+
+    if client is None:
+        return due
+
+    now = (now or timezone.now()).timestamp()
+
+    try:
+        members = client.zrangebyscore(APPOINTMENT_SCHEDULE_KEY, '-inf', now, start=0, num=DISPATCH_BATCH_SIZE)
+
+        if not members:
+            return due
+
+        pipeline = client.pipeline(transaction=False)
+        for member in members:
+            pipeline.zrem(APPOINTMENT_SCHEDULE_KEY, member)
+        removed = pipeline.execute()
+    except Exception:
+        logger.exception('Could not read the appointment schedule, left to the sweep tasks.')
+        return due
+
+    for member, was_removed in zip(members, removed):
+        event, _, appointment_id = (member.decode() if isinstance(member, bytes) else member).partition(':')
+        if was_removed and event in due:
+            due[event].append(int(appointment_id))
+
+    return due
+
+
+def get_next_appointment_event_at():
+    """
+    Utility function that returns the UNIX timestamp of the next scheduled event, or None if the schedule is empty.
+    """
+    client = get_schedule_client()
+
+    if client is None:
+        return None
+
+    try:
+        first = client.zrange(APPOINTMENT_SCHEDULE_KEY, 0, 0, withscores=True)
+    except Exception:
+        logger.exception('Could not read the appointment schedule.')
+        return None
+
+    return first[0][1] if first else None
@@ -0,0 +1,77 @@
+# Availability slots are stored as a bitmask over the minutes of the day: bit N set = slot starting at minute N
+MINUTES_PER_DAY = 24 * 60
+FULL_DAY_MASK = (1 << MINUTES_PER_DAY) - 1
+
+
+def slot_str_to_minute(slot_str):
+    """
+    Utility function that converts a "HH:MM" slot string to its minute of the day.
+    Raises ValueError if the string is not a valid time.
+    """
+    hour, minute = map(int, slot_str.split(':'))
+
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f'Invalid slot "{slot_str}".')
+
+    return hour * 60 + minute
+
+
+def time_to_minute(time):
+    """
+    Utility function that converts a datetime.time to its minute of the day.
+    """
+    return time.hour * 60 + time.minute
+
+
+def slots_to_mask(slots):
+    """
+    Utility function that encodes a list of "HH:MM" slot strings as a minutes bitmask.
+    """
+    mask = 0
+    for slot_str in slots:
+        mask |= 1 << slot_str_to_minute(slot_str)
+    return mask
+
+
+def times_to_mask(times):
+    """
+    Utility function that encodes an iterable of datetime.time as a minutes bitmask.
+    """
+    mask = 0
+    for time in times:
+        mask |= 1 << time_to_minute(time)
+    return mask
+
+
+def mask_to_slots(mask):
+    """
+    Utility function that decodes a minutes bitmask to the ordered list of "HH:MM" slot strings.
+    """
+    slots = []
+    while mask:
+        lowest = mask & -mask
+        minute = lowest.bit_length() - 1
+        slots.append(f'{minute // 60:02d}:{minute % 60:02d}')
+        mask ^= lowest
+    return slots
+
+
+def mask_after(time):
+    """
+    Utility function that returns the mask of all the slots starting strictly after the given datetime.time.
+    """
+    return FULL_DAY_MASK & ~((1 << (time_to_minute(time) + 1)) - 1)
+
+
+def mask_to_bytes(mask):
+    """
+    Utility function that serializes a minutes bitmask to bytes for storage (little endian, no trailing zeros).
+    """
+    return mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+
+
+def bytes_to_mask(data):
+    """
+    Utility function that deserializes stored bytes (or memoryview) to a minutes bitmask.
+    """
+    return int.from_bytes(bytes(data or b''), 'little')
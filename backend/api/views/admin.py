@@ -3,13 +3,20 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
 from rest_framework import status
+from .openapi import PAGINATION_PARAMETERS
 from ..utils import (
     IsAdminRole,
     send_barber_invite_email,
+    get_public_cache_stats,
+    request_metrics,
+    get_database_gauges,
+    query_budget,
 )
 from ..serializers import (
     GetAdminProfileSerializer,
@@ -20,11 +27,13 @@ from ..serializers import (
     InviteBarberSerializer,
     DeleteBarberSerializer,
     CreateBarberAvailabilitySerializer,
+    CreateBarbersAvailabilitySerializer,
     UpdateBarberAvailabilitySerializer,
     DeleteBarberAvailabilitySerializer,
     GetAllAppointmentsSerializer,
 )
 
+@query_budget(5)
 @extend_schema(
     methods=['GET'],
     responses={200: GetAdminProfileSerializer},
@@ -73,8 +82,10 @@ def manage_admin_profile(request):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@query_budget(4)
 @extend_schema(
     responses={200: GetAllBarbersSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Admin only: Returns all barbers registered and their data .",
 )
 @api_view(['GET'])
@@ -84,14 +95,16 @@ def get_all_barbers(request):
     """
     Admin only: Returns all barbers registered and their data 
     """
-    serializer = GetAllBarbersSerializer(data={}, instance={}) 
+    serializer = GetAllBarbersSerializer(data=request.query_params, instance={})
     serializer.is_valid(raise_exception=True)
     
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@query_budget(6)
 @extend_schema(
     responses={200: GetAllClientsSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Admin only: Returns all clients registered and their data .",
 )
 @api_view(['GET'])
@@ -101,15 +114,17 @@ def get_all_clients(request):
     """
     Admin only: Returns all clients registered and their data 
     """
-    serializer = GetAllClientsSerializer(data={}, instance={}) 
+    serializer = GetAllClientsSerializer(data=request.query_params, instance={})
     serializer.is_valid(raise_exception=True)
     
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@query_budget(2)
 @extend_schema(
     methods=['GET'],
     responses={200: GetAllAppointmentsSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Admin only: Get all appointments present in the system.",
 )
 @api_view(['GET'])
@@ -118,7 +133,7 @@ def get_all_appointments(request):
     """
     Admin only: Get all appointments present in the system
     """
-    serializer = GetAllAppointmentsSerializer(data={}, instance={})
+    serializer = GetAllAppointmentsSerializer(data=request.query_params, instance={})
     serializer.is_valid(raise_exception=True)
     
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -139,11 +154,14 @@ def invite_barber(request):
     """
     serializer = InviteBarberSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    barber = serializer.save()
 
-    uid = urlsafe_base64_encode(force_bytes(barber.pk))
-    token = default_token_generator.make_token(barber)
-    send_barber_invite_email(barber.email, uid, token, settings.FRONTEND_URL)
+    # The email is written to the outbox in the same transaction as the user
+    with transaction.atomic():
+        barber = serializer.save()
+
+        uid = urlsafe_base64_encode(force_bytes(barber.pk))
+        token = default_token_generator.make_token(barber)
+        send_barber_invite_email(barber.email, uid, token, settings.FRONTEND_URL)
 
     return Response({'detail': 'Barber invited successfully.'}, status=status.HTTP_201_CREATED)
 
@@ -186,6 +204,26 @@ def create_barber_availability(request, barber_id):
     return Response({"detail": "Availability created successfully."}, status=status.HTTP_201_CREATED)
 
 
+@extend_schema(
+    methods=['POST'],
+    request=CreateBarbersAvailabilitySerializer,
+    responses={201: OpenApiResponse(description="Availabilities created successfully.")},
+    description="Admin only: Creates the same availability for many barbers at once (all active barbers if no barber_ids are given).",
+)
+@api_view(['POST'])
+@permission_classes([IsAdminRole])
+@parser_classes([JSONParser]) 
+def create_barbers_availability(request):
+    """
+    Admin only: Creates the same availability for many barbers at once.
+    """
+    serializer = CreateBarbersAvailabilitySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    
+    return Response({"detail": "Availabilities created successfully."}, status=status.HTTP_201_CREATED)
+
+
 @extend_schema(
     methods=['PATCH'],
     request=UpdateBarberAvailabilitySerializer,
@@ -221,3 +259,38 @@ def manage_barber_availability(request, barber_id, availability_id):
         serializer.delete() 
         
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@query_budget(0)
+@extend_schema(
+    responses={200: OpenApiResponse(description="Returns the hit/miss counters of the public response cache.")},
+    description="Admin only: Gets the hit/miss counters of the public response cache.",
+)
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def get_public_cache_statistics(request):
+    """
+    Admin only: Gets the hit/miss counters of the public response cache.
+    """
+    return Response(get_public_cache_stats(), status=status.HTTP_200_OK)
+
+
+@query_budget(0)
+@extend_schema(
+    responses={200: OpenApiResponse(description="Returns the per-endpoint request metrics in the Prometheus text format.")},
+    description="Admin only: Gets the per-endpoint request counts and latency, database and response size histograms, the database connection pool usage and the fetches saved by the identity map, for Prometheus.",
+)
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def get_metrics(request):
+    """
+    Admin only: Gets the per-endpoint request metrics of this worker, in the Prometheus text exposition format.
+    """
+    cache_stats = get_public_cache_stats()
+    content = request_metrics.render({
+        'public_cache_hits': ('Public response cache hits.', cache_stats['hits']),
+        'public_cache_misses': ('Public response cache misses.', cache_stats['misses']),
+        **get_database_gauges(connection),
+        'identity_map_saved_fetches': ('Fetches saved by the identity maps of the requests.', request_metrics.identity_map_hits),
+    })
+    return HttpResponse(content, content_type='text/plain; version=0.0.4; charset=utf-8', status=status.HTTP_200_OK)
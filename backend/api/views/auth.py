@@ -1,8 +1,10 @@
+from adrf.decorators import api_view as async_api_view
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.conf import settings
+from django.db import transaction
 from rest_framework.decorators import api_view, permission_classes, authentication_classes, parser_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
@@ -11,6 +13,7 @@ from rest_framework import status
 from ..utils import(
     send_client_verify_email,
     send_password_reset_email,
+    query_budget,
 )
 from ..serializers import (
     GetCurrentUserSerializer,
@@ -26,22 +29,23 @@ from ..serializers import (
 )
 
 
+@query_budget(1)
 @extend_schema(
     methods=['GET'],
     responses={200: GetCurrentUserSerializer},
     description="Returns the current authenticated user's information.",
 )
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @parser_classes([JSONParser]) 
-def get_current_user(request):
+async def get_current_user(request):
     """
     Returns the current authenticated user's information.
     """
     serializer = GetCurrentUserSerializer(data={}, context={'user': request.user})
-    serializer.is_valid(raise_exception=True)
+    await serializer.ais_valid(raise_exception=True)
 
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
 @extend_schema(
@@ -63,11 +67,14 @@ def register_client(request):
     """
     serializer = RegisterClientSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    client = serializer.save()
 
-    uid = urlsafe_base64_encode(force_bytes(client.pk))
-    token = default_token_generator.make_token(client)
-    send_client_verify_email(client.email, uid, token, settings.FRONTEND_URL)
+    # The email is written to the outbox in the same transaction as the user
+    with transaction.atomic():
+        client = serializer.save()
+
+        uid = urlsafe_base64_encode(force_bytes(client.pk))
+        token = default_token_generator.make_token(client)
+        send_client_verify_email(client.email, uid, token, settings.FRONTEND_URL)
 
     return Response({'detail': 'Client registered, check your email to verify.'}, status=status.HTTP_201_CREATED)
 
@@ -96,6 +103,7 @@ def register_barber(request, uidb64, token):
     return Response({'detail': 'Barber registered and account activated.'}, status=status.HTTP_201_CREATED)
     
 
+@query_budget(1)
 @extend_schema(
     methods=['GET'],
     responses={200: GetEmailFromTokenSerializer},
@@ -115,6 +123,7 @@ def get_email_from_token(request, uidb64, token):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@query_budget(2)
 @extend_schema(
     methods=['GET'],
     responses={
@@ -148,18 +157,18 @@ def verify_client(request, uidb64, token):
     },
     description="Login by email OR username and password. Returns user and JWT tokens.",
 )
-@api_view(['POST'])
+@async_api_view(['POST'])
 @permission_classes([AllowAny])
 @authentication_classes([]) 
 @parser_classes([JSONParser]) 
-def login_user(request):
+async def login_user(request):
     """
     Login with email OR username + password.
     """
     serializer = LoginSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
+    await serializer.ais_valid(raise_exception=True)
 
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
 @extend_schema(
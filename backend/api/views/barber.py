@@ -3,8 +3,10 @@ from rest_framework.decorators import api_view, permission_classes, parser_class
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
 from rest_framework import status
+from .openapi import PAGINATION_PARAMETERS
 from ..utils import (
     IsBarberRole,
+    query_budget,
 )
 from ..serializers import (
     GetBarberProfileSerializer,
@@ -20,6 +22,7 @@ from ..serializers import (
 )
 
 
+@query_budget(5)
 @extend_schema(
     methods=['GET'],
     responses={200: GetBarberProfileSerializer},
@@ -68,6 +71,7 @@ def manage_barber_profile(request):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@query_budget(3)
 @extend_schema(
     responses={200: GetBarberAvailabilitiesSerializer},
     description="Barber only: Get all availabilities for the authenticated barber.",
@@ -84,6 +88,7 @@ def get_barber_availabilities(request):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@query_budget(2)
 @extend_schema(
     methods=['GET'],
     responses={200: GetBarberServicesSerializer},
@@ -156,8 +161,10 @@ def manage_barber_service(request, service_id):
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
+@query_budget(3)
 @extend_schema(
     responses={200: GeBarberAppointmentsSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Barber only: Get all ONGOING appointments for the authenticated barber.",
 )
 @api_view(['GET'])
@@ -167,14 +174,16 @@ def get_barber_appointments(request):
     """
     Barber only: Get all appointments for the authenticated barber.
     """
-    serializer = GeBarberAppointmentsSerializer(data={}, context={'barber': request.user})
+    serializer = GeBarberAppointmentsSerializer(data=request.query_params, context={'barber': request.user})
     serializer.is_valid(raise_exception=True)
 
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@query_budget(2)
 @extend_schema(
     responses={200: GetBarberReviewsSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Barber only: Get all reviews received by the authenticated barber.",
 )
 @api_view(['GET'])
@@ -184,7 +193,7 @@ def get_barber_reviews(request):
     """
     Barber only: Get all reviews received by the authenticated barber.
     """
-    serializer = GetBarberReviewsSerializer(data={}, context={'barber': request.user})
+    serializer = GetBarberReviewsSerializer(data=request.query_params, context={'barber': request.user})
     serializer.is_valid(raise_exception=True)
 
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -3,8 +3,10 @@ from rest_framework.decorators import api_view, permission_classes, parser_class
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
 from rest_framework import status
+from .openapi import PAGINATION_PARAMETERS
 from ..utils import (
     IsClientRole,
+    query_budget,
 )
 from api.serializers.client import (
     GetClientProfileSerializer,
@@ -21,6 +23,7 @@ from api.serializers.client import (
 )
 
 
+@query_budget(8)
 @extend_schema(
     methods=["GET"],
     responses={200: GetClientProfileSerializer},
@@ -69,8 +72,10 @@ def manage_client_profile(request):
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
+@query_budget(3)
 @extend_schema(
     responses={200: GetClientAppointmentsSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Client only: Get all appointments for the authenticated client.",
 )
 @api_view(['GET'])
@@ -80,7 +85,7 @@ def get_client_appointments(request):
     """
     Client only: Get all appointments for the authenticated client.
     """
-    serializer = GetClientAppointmentsSerializer(data={}, context={'client': request.user})
+    serializer = GetClientAppointmentsSerializer(data=request.query_params, context={'client': request.user})
     serializer.is_valid(raise_exception=True)
 
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -123,8 +128,10 @@ def cancel_client_appointment(request, appointment_id):
     return Response({'detail': 'Appointment cancelled successfully.'}, status=status.HTTP_200_OK)
 
 
+@query_budget(2)
 @extend_schema(
     responses={200: GetClientReviewsSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Client only: Get all reviews posted by the authenticated client.",
 )
 @api_view(['GET'])
@@ -134,7 +141,7 @@ def get_client_reviews(request):
     """
     Get all reviews posted by the authenticated client.
     """
-    serializer = GetClientReviewsSerializer(data={}, context={'client': request.user})
+    serializer = GetClientReviewsSerializer(data=request.query_params, context={'client': request.user})
     serializer.is_valid(raise_exception=True)
 
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -196,6 +203,7 @@ def manage_client_reviews(request, review_id):
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
+@query_budget(5)
 @extend_schema(
 responses={200: GetClientCompletedBarbersSerializer},
 description="Client only: Returns all barbers with whom the client has completed appointments.",
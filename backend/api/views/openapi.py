@@ -1,12 +1,111 @@
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.renderers import JSONRenderer
 
+
+# Query parameters shared by all list endpoints supporting cursor pagination
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(name='cursor', type=str, required=False, description="Opaque cursor returned as `next_cursor` by the previous page."),
+    OpenApiParameter(name='limit', type=int, required=False, description="Page size (max 100). If neither cursor nor limit is provided, the full list is returned."),
+]
+
+# Query parameters of the shop-wide free slots search
+SEARCH_SLOTS_PARAMETERS = [
+    OpenApiParameter(name='date', type=str, required=False, description="First date to search from (YYYY-MM-DD), defaults to today."),
+    OpenApiParameter(name='service', type=str, required=False, description="Only barbers offering a service with this name."),
+    OpenApiParameter(name='limit', type=int, required=False, description="Number of slots to return (max 50), defaults to 10."),
+]
+
+# drf-spectacular only documents the authentication classes it knows, not their subclasses: without it, the
+# endpoints would be listed without their bearer token security scheme
+class RoleJWTScheme(SimpleJWTScheme):
+    target_class = 'api.backends.tokens.RoleJWTAuthentication'
+
+
+# Introspecting every view and serializer is expensive, so the schema is generated once, on the first request, into
+# OPENAPI_SCHEMA_FILE (shared by the workers and kept across their restarts) or into the process memory. It is then
+# served as is, with an ETag, a Last-Modified and a max-age of OPENAPI_SCHEMA_MAX_AGE. The docstring below is part
+# of the schema.
 class SpectacularJSONAPIView(SpectacularAPIView):
     """
     OpenAPI JSON view for API documentation
     """
     renderer_classes = [JSONRenderer]
 
+    # (path, file modification time, content, ETag, last modified) of the schema served
+    _schema = None
+    _lock = threading.Lock()
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        content, etag, last_modified = self.get_schema_content()
+
+        response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+
+        return get_conditional_response(request, etag=etag, last_modified=int(last_modified), response=response)
+
+    def get_schema_content(self):
+        """
+        Returns (JSON, ETag, last modified timestamp) of the schema, from memory while the file is unchanged,
+        generating the file first if it doesn't exist.
+        """
+        path = settings.OPENAPI_SCHEMA_FILE
+
+        with self._lock:
+            mtime = self.get_file_mtime(path)
+
+            if self._schema is None or self._schema[:2] != (path, mtime):
+                if mtime is not None:
+                    with open(path, 'rb') as file:
+                        content = file.read()
+                else:
+                    content = self.generate_schema()
+                    if path:
+                        self.write_file(path, content)
+                        mtime = self.get_file_mtime(path)
+
+                etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+                SpectacularJSONAPIView._schema = (path, mtime, content, etag, mtime or time.time())
+
+            schema = self._schema
+
+        return schema[2:]
+
+    def generate_schema(self):
+        generator = self.generator_class(urlconf=self.urlconf, api_version=self.api_version, patterns=self.patterns)
+        return JSONRenderer().render(generator.get_schema(request=None, public=self.serve_public))
+
+    def get_file_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime if path else None
+        except FileNotFoundError:
+            return None
+
+    def write_file(self, path, content):
+        """
+        Writes the schema atomically, workers starting at the same time never read a partial file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+            file.write(content)
+        os.replace(file.name, path)
+
 
 class SpectacularSwaggerViewTopBar(SpectacularSwaggerView):
     """
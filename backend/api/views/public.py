@@ -1,36 +1,50 @@
+from adrf.decorators import api_view
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from rest_framework.decorators import api_view, permission_classes, authentication_classes, parser_classes
+from rest_framework.decorators import permission_classes, authentication_classes, parser_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
 from rest_framework import status
+from .openapi import PAGINATION_PARAMETERS, SEARCH_SLOTS_PARAMETERS
+from ..utils import (
+    cache_public_response,
+    barber_cache_scope,
+    client_cache_scope,
+    BARBERS_CACHE_SCOPE,
+    query_budget,
+)
 from ..serializers import (
     GetBarbersPublicSerializer,
     GetBarberAvailabilitiesSerializer,
     GetBarberSlotsSerializer,
     GetBarberServicesSerializer,
     GetBarberProfilePublicSerializer,
-    GetClientProfilePublicSerializer
+    GetClientProfilePublicSerializer,
+    SearchSlotsPublicSerializer,
 )
 
 
+@query_budget(4)
 @extend_schema(
     responses={200: GetBarbersPublicSerializer},
+    parameters=PAGINATION_PARAMETERS,
     description="Return a list of all active barbers.",
 )
 @api_view(['GET'])
 @permission_classes([AllowAny])
 @authentication_classes([])
 @parser_classes([JSONParser]) 
-def get_barbers_public(request):
+@cache_public_response('barbers', lambda kwargs: [BARBERS_CACHE_SCOPE])
+async def get_barbers_public(request):
     """
     Return a list of all active barbers
     """
-    serializer = GetBarbersPublicSerializer(data={}, instance={}) 
-    serializer.is_valid(raise_exception=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer = GetBarbersPublicSerializer(data=request.query_params, instance={})
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
+@query_budget(4)
 @extend_schema(
     responses={200: GetBarberProfilePublicSerializer},
     description="Get all public profile information for a barber. (Public)",
@@ -39,15 +53,17 @@ def get_barbers_public(request):
 @permission_classes([AllowAny])
 @authentication_classes([]) 
 @parser_classes([JSONParser]) 
-def get_barber_profile_public(request, barber_id):
+@cache_public_response('barber_profile', lambda kwargs: [barber_cache_scope(kwargs['barber_id'])])
+async def get_barber_profile_public(request, barber_id):
     """
     Get all services for the given barber.
     """
     serializer = GetBarberProfilePublicSerializer(data={}, context={'barber_id': barber_id})
-    serializer.is_valid(raise_exception=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
+@query_budget(6)
 @extend_schema(
     responses={200: GetClientProfilePublicSerializer},
     description="Get all public profile information for a client. (Public)",
@@ -56,15 +72,17 @@ def get_barber_profile_public(request, barber_id):
 @permission_classes([AllowAny])
 @authentication_classes([]) 
 @parser_classes([JSONParser]) 
-def get_client_profile_public(request, client_id):
+@cache_public_response('client_profile', lambda kwargs: [client_cache_scope(kwargs['client_id'])])
+async def get_client_profile_public(request, client_id):
     """
     Get all services for the given client.
     """
     serializer = GetClientProfilePublicSerializer(data={}, context={'client_id': client_id})
-    serializer.is_valid(raise_exception=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
+@query_budget(3)
 @extend_schema(
     responses={200: GetBarberAvailabilitiesSerializer},
     description="Get all availabilities for a specific barber. (Public)",
@@ -73,13 +91,14 @@ def get_client_profile_public(request, client_id):
 @permission_classes([AllowAny])
 @authentication_classes([]) 
 @parser_classes([JSONParser]) 
-def get_barber_availabilities_public(request, barber_id):
+@cache_public_response('barber_availabilities', lambda kwargs: [barber_cache_scope(kwargs['barber_id'])])
+async def get_barber_availabilities_public(request, barber_id):
     """
     Get all availabilities for a specific barber.
     """
     serializer = GetBarberAvailabilitiesSerializer(data={}, context={'barber_id': barber_id})
-    serializer.is_valid(raise_exception=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
 @extend_schema(
@@ -92,15 +111,16 @@ def get_barber_availabilities_public(request, barber_id):
 @permission_classes([AllowAny])
 @authentication_classes([])
 @parser_classes([JSONParser])
-def get_barber_slots_public(request, barber_id):
+async def get_barber_slots_public(request, barber_id):
     """
     Get all slots for a given barber and date (date in JSON).
     """
     serializer = GetBarberSlotsSerializer(data=request.data, context={'barber_id': barber_id})
-    serializer.is_valid(raise_exception=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
 
 
+@query_budget(2)
 @extend_schema(
     responses={200: GetBarberServicesSerializer},
     description="Get all services for the given barber. (Public)",
@@ -109,10 +129,30 @@ def get_barber_slots_public(request, barber_id):
 @permission_classes([AllowAny])
 @authentication_classes([]) 
 @parser_classes([JSONParser]) 
-def get_barber_services_public(request, barber_id):
+@cache_public_response('barber_services', lambda kwargs: [barber_cache_scope(kwargs['barber_id'])])
+async def get_barber_services_public(request, barber_id):
     """
     Get all services for the given barber.
     """
     serializer = GetBarberServicesSerializer(data={}, context={'barber_id': barber_id})
-    serializer.is_valid(raise_exception=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
+
+
+@query_budget(2)
+@extend_schema(
+    parameters=SEARCH_SLOTS_PARAMETERS,
+    responses={200: OpenApiResponse(description="Returns the earliest free slots across all active barbers")},
+    description="Search the earliest free slots across all active barbers in the next 60 days. (Public)",
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@authentication_classes([]) 
+@parser_classes([JSONParser]) 
+async def search_slots_public(request):
+    """
+    Search the earliest free slots across all active barbers.
+    """
+    serializer = SearchSlotsPublicSerializer(data=request.query_params, instance={})
+    await serializer.ais_valid(raise_exception=True)
+    return Response(await serializer.adata(), status=status.HTTP_200_OK)
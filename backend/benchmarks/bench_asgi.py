@@ -0,0 +1,178 @@
+"""
+Throughput benchmark of the serving modes: the single sync gunicorn worker (SERVER_MODE=wsgi) vs the single uvicorn
+worker (SERVER_MODE=asgi), under the same concurrent load on the public read endpoints.
+
+Starts gunicorn with `gunicorn.conf.py` once per mode, against the database configured by DJANGO_SETTINGS_MODULE
+(seed it first, e.g. with `manage.py seed_load`), and samples the memory (RSS) of the server processes during the run,
+to check both modes fit in the container limit (`mem_limit: 100m` in docker-compose.prod.yml). Linux only (/proc).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_asgi [--concurrency 20] [--requests 1000] [--path /api/public/barbers/ ...]
+"""
+import argparse
+import http.client
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+DEFAULT_PATHS = ['/api/public/barbers/', '/api/public/slots/search/']
+
+
+def get_rss(pid):
+    """
+    Returns the resident memory in bytes of a process and all its descendants.
+    """
+    total, pending = 0, [pid]
+
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as file:
+                total += next(int(line.split()[1]) * 1024 for line in file if line.startswith('VmRSS:'))
+            with open(f'/proc/{current}/task/{current}/children') as file:
+                pending += [int(child) for child in file.read().split()]
+        except (FileNotFoundError, ProcessLookupError, StopIteration):
+            continue
+
+    return total
+
+
+def start_server(mode, port):
+    """
+    Starts gunicorn in the given SERVER_MODE and waits until it answers.
+    """
+    env = {**os.environ, 'SERVER_MODE': mode, 'GUNICORN_BIND': f'127.0.0.1:{port}'}
+    # The log goes to a file, a pipe nobody reads would block the server once full
+    log = tempfile.NamedTemporaryFile(prefix=f'bench_asgi_{mode}_', suffix='.log', delete=False)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'], env=env, stdout=log, stderr=subprocess.STDOUT)
+    server.log_path = log.name
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', DEFAULT_PATHS[0])
+            connection.getresponse().read()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                with open(server.log_path) as file:
+                    raise RuntimeError(f'gunicorn ({mode}) exited: {file.read()[-2000:]}')
+            time.sleep(0.2)
+
+    server.kill()
+    raise RuntimeError(f'gunicorn ({mode}) did not answer within 30 s.')
+
+
+def load(port, paths, concurrency, requests):
+    """
+    Sends `requests` GETs over `concurrency` keep-alive connections, cycling through the paths.
+    Returns (status codes, latencies, wall time).
+    """
+    counter = itertools.count()
+    statuses, latencies = Counter(), []
+    lock = threading.Lock()
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+        while (index := next(counter)) < requests:
+            began = time.perf_counter()
+
+            # The worker is recycled every `max_requests` and drops its keep-alive connections: reconnect and retry
+            # once, as browsers and proxies do for idempotent requests
+            for attempt in range(2):
+                try:
+                    connection.request('GET', paths[index % len(paths)])
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                    break
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                    status = 'error'
+
+            elapsed = time.perf_counter() - began
+
+            with lock:
+                statuses[status] += 1
+                latencies.append(elapsed)
+
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return statuses, latencies, time.perf_counter() - began
+
+
+def bench(mode, port, paths, concurrency, requests):
+    server = start_server(mode, port)
+    peak, sampling = get_rss(server.pid), True
+
+    def sample():
+        nonlocal peak
+        while sampling:
+            peak = max(peak, get_rss(server.pid))
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+
+    try:
+        statuses, latencies, wall = load(port, paths, concurrency, requests)
+    finally:
+        sampling = False
+        sampler.join()
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        'statuses': dict(statuses),
+        'throughput': len(latencies) / wall,
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[int(len(latencies) * 0.95)],
+        'peak_rss': peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=20, help='concurrent keep-alive connections')
+    parser.add_argument('--requests', type=int, default=1000, help='requests per mode')
+    parser.add_argument('--path', action='append', dest='paths', help='path to request, repeatable (default: %s)' % ', '.join(DEFAULT_PATHS))
+    parser.add_argument('--modes', nargs='+', default=['wsgi', 'asgi'], choices=['wsgi', 'asgi'])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--memory-limit', type=int, default=100, help='container memory limit to check against, in MB')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+    paths = args.paths or DEFAULT_PATHS
+
+    print(f'concurrency={args.concurrency} requests={args.requests} paths={paths}')
+    for mode in args.modes:
+        result = bench(mode, args.port, paths, args.concurrency, args.requests)
+        peak_mb = result['peak_rss'] / 1024 / 1024
+        print(
+            f"{mode:5} throughput {result['throughput']:8.1f} req/s | "
+            f"p50 {result['p50'] * 1000:7.1f} ms  p95 {result['p95'] * 1000:7.1f} ms | "
+            f"peak RSS {peak_mb:6.1f} MB ({'within' if peak_mb <= args.memory_limit else 'OVER'} {args.memory_limit} MB) | "
+            f"statuses {dict(sorted(result['statuses'].items(), key=str))}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Contention benchmark of the booking endpoint: many clients race for the same barber slot at the same time.
+
+Runs against the database configured by DJANGO_SETTINGS_MODULE (row locks need Postgres, SQLite serializes writers),
+creates its own barber/clients/availability and deletes them afterwards.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_booking [--clients 50] [--rounds 5]
+"""
+import argparse
+import datetime
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+
+def setup_django():
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+    django.setup()
+
+
+def create_fixtures(prefix, clients_count, rounds):
+    """
+    Creates a barber with one service, one availability per round (a single slot each) and the competing clients.
+    """
+    from api.models import Barber, Client, Service, Availability
+
+    barber = Barber.objects.create_user(username=f'{prefix}_barber', email=f'{prefix}_barber@bench.local', password='bench', is_active=True)
+    service = Service.objects.create(barber=barber, name='Cut', price=10)
+    start = datetime.date.today() + datetime.timedelta(days=1)
+    dates = [start + datetime.timedelta(days=day) for day in range(rounds)]
+    Availability.objects.bulk_create([Availability(barber=barber, date=date, slots=['10:00']) for date in dates])
+
+    clients = [
+        Client.objects.create_user(username=f'{prefix}_c{i}', email=f'{prefix}_c{i}@bench.local', password='bench', is_active=True)
+        for i in range(clients_count)
+    ]
+    return barber, service, dates, clients
+
+
+def race(barber, service, date, clients):
+    """
+    Starts one booking thread per client behind a barrier, returns (status codes, latencies, wall time).
+    """
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from api.views import create_client_appointment
+
+    factory = APIRequestFactory()
+    data = {'date': str(date), 'slot': '10:00', 'services': [service.id]}
+    barrier = threading.Barrier(len(clients) + 1)
+    statuses, latencies = [], []
+    lock = threading.Lock()
+
+    def book(client):
+        request = factory.post(f'/api/client/appointments/barbers/{barber.id}/', data, format='json')
+        force_authenticate(request, user=client)
+        barrier.wait()
+        began = time.perf_counter()
+        response = create_client_appointment(request, barber_id=barber.id)
+        elapsed = time.perf_counter() - began
+        with lock:
+            statuses.append(response.status_code)
+            latencies.append(elapsed)
+        connection.close()
+
+    threads = [threading.Thread(target=book, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+
+    return statuses, latencies, time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50, help='concurrent clients racing for one slot')
+    parser.add_argument('--rounds', type=int, default=5, help='number of races, one slot each')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from api.models import Barber, Client, Appointment, AppointmentStatus
+
+    prefix = f'bench_{uuid.uuid4().hex[:8]}'
+    barber, service, dates, clients = create_fixtures(prefix, args.clients, args.rounds)
+
+    try:
+        all_statuses, all_latencies, wall = Counter(), [], 0.0
+
+        for date in dates:
+            statuses, latencies, elapsed = race(barber, service, date, clients)
+            booked = Appointment.objects.filter(barber=barber, date=date).exclude(status=AppointmentStatus.CANCELLED.value).count()
+
+            # Exactly one winner per slot, everyone else rejected cleanly (409 under contention, 400 if already visible)
+            assert booked == 1, f'{booked} appointments booked for a single slot on {date}'
+            assert statuses.count(201) == 1, f'{statuses.count(201)} successful bookings on {date}'
+            assert 500 not in statuses, f'server errors on {date}'
+
+            all_statuses.update(statuses)
+            all_latencies += latencies
+            wall += elapsed
+
+            # Winner frees itself for the next round (one ONGOING appointment per client)
+            Appointment.objects.filter(barber=barber, date=date).update(status=AppointmentStatus.COMPLETED.value)
+
+        all_latencies.sort()
+        requests = len(all_latencies)
+        print(f'clients={args.clients} rounds={args.rounds} requests={requests}')
+        print(f'status codes       : {dict(sorted(all_statuses.items()))}')
+        print(f'throughput         : {requests / wall:8.1f} req/s')
+        print(f'latency p50 / p95  : {all_latencies[requests // 2] * 1000:8.1f} ms / {all_latencies[int(requests * 0.95)] * 1000:.1f} ms')
+        print('correctness        : exactly one booking per slot, no 5xx')
+
+    finally:
+        Appointment.objects.filter(barber=barber).delete()
+        Client.objects.filter(username__startswith=prefix).delete()
+        Barber.objects.filter(username__startswith=prefix).delete()
+
+
+if __name__ == '__main__':
+    main()
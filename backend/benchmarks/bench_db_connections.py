@@ -0,0 +1,129 @@
+"""
+Per-request cost of the database connection modes: a new connection per request (the former default), a persistent
+connection (DB_POOL_MAX_SIZE=0, DB_CONN_MAX_AGE>0) and the psycopg connection pool (DB_POOL_MAX_SIZE>0).
+
+Each mode runs in its own process, as the settings read the mode from the environment. A request is emulated as
+Django's handlers do it: `close_old_connections()` when it starts and ends, a few ORM queries in between. Runs
+against the Postgres database configured by DJANGO_SETTINGS_MODULE (the connect cost is what is measured).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_db_connections [--requests 500] [--queries 3] [--threads 1] [--pool-size 4]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+
+# Environment of each mode, on top of the current one
+MODES = {
+    'direct': {'DB_POOL_MAX_SIZE': '0', 'DB_CONN_MAX_AGE': '0'},
+    'persistent': {'DB_POOL_MAX_SIZE': '0', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {},  # DB_POOL_MAX_SIZE from --pool-size
+}
+
+
+def setup_django():
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+    django.setup()
+
+
+def run_requests(requests, queries, threads):
+    """
+    Sends the emulated requests from `threads` threads, returns their latencies.
+    """
+    from django.db import close_old_connections
+    from api.models import Barber, Service
+
+    latencies = []
+    lock = threading.Lock()
+    per_thread = requests // threads
+
+    def worker():
+        for _ in range(per_thread):
+            began = time.perf_counter()
+            close_old_connections()  # request_started
+            for index in range(queries):
+                if index % 2:
+                    Service.objects.filter(barber__is_active=True).count()
+                else:
+                    list(Barber.objects.filter(is_active=True).order_by('id')[:20])
+            close_old_connections()  # request_finished
+            elapsed = time.perf_counter() - began
+
+            with lock:
+                latencies.append(elapsed)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return latencies
+
+
+def child(args):
+    """
+    Benchmarks the mode configured by the environment, prints the results as JSON.
+    """
+    setup_django()
+    from django.db import connection
+    from api.utils import get_database_gauges
+
+    run_requests(args.warmup, args.queries, 1)
+    latencies = sorted(run_requests(args.requests, args.queries, args.threads))
+    gauges = {name: value for name, (_help, value) in get_database_gauges(connection).items()}
+
+    print(json.dumps({
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[int(len(latencies) * 0.95)],
+        'mean': statistics.mean(latencies),
+        'connections': gauges['db_connections_opened'],
+        'wait': gauges.get('db_pool_wait_seconds'),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help='emulated requests per mode')
+    parser.add_argument('--queries', type=int, default=3, help='ORM queries per request')
+    parser.add_argument('--threads', type=int, default=1, help='threads sending the requests')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests per mode')
+    parser.add_argument('--pool-size', type=int, default=4, help='DB_POOL_MAX_SIZE of the pool mode')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    print(f'requests={args.requests} queries={args.queries} threads={args.threads}')
+    baseline = None
+
+    for mode in args.modes:
+        env = {**os.environ, **MODES[mode]}
+        if mode == 'pool':
+            env['DB_POOL_MAX_SIZE'] = str(args.pool_size)
+
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_db_connections', '--child', *sys.argv[1:]], env=env, capture_output=True, text=True)
+        if output.returncode:
+            raise RuntimeError(f'{mode} failed: {output.stderr[-2000:]}')
+
+        result = json.loads(output.stdout.splitlines()[-1])
+        baseline = baseline or result['mean']
+        wait = f" | pool wait {result['wait'] * 1000:.1f} ms total" if result['wait'] is not None else ''
+        print(
+            f"{mode:10} p50 {result['p50'] * 1000:6.2f} ms  p95 {result['p95'] * 1000:6.2f} ms  "
+            f"mean {result['mean'] * 1000:6.2f} ms ({(result['mean'] - baseline) * 1000:+.2f} ms vs {args.modes[0]}) | "
+            f"{result['connections']} connections opened{wait}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Login burst benchmark: how many logins per second a single worker sustains, and how much a burst of logins slows
+down the other requests served meanwhile (the password hashing is CPU bound, PBKDF2 by default).
+
+Creates (or resets) a bench user with the hasher configured by DJANGO_SETTINGS_MODULE, starts gunicorn in the given
+SERVER_MODE (see `bench_asgi`), then sends `--burst` logins over `--concurrency` connections, a share of them with a
+wrong password, while another connection requests `--probe` one at a time. Compare the probe latency against its
+`idle` baseline, measured before the burst.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_login [--burst 200] [--concurrency 20] [--bad-ratio 0.2] [--modes asgi wsgi]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from .bench_asgi import start_server
+
+
+LOGIN_PATH = '/api/auth/login/'
+DEFAULT_PROBE = '/api/public/barbers/'
+USERNAME = 'bench_login'
+PASSWORD = 'BenchLogin123!'
+
+
+def setup_user():
+    """
+    Creates the bench user, or resets its password, hashed with the configured hasher.
+    """
+    import django
+    django.setup()
+    from api.models import Client
+
+    user = Client.objects.filter(username=USERNAME).first() or Client(username=USERNAME, email=f'{USERNAME}@example.com')
+    user.is_active = True
+    user.set_password(PASSWORD)
+    user.save()
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return float('nan'), float('nan')
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def probe(port, path, stop, latencies):
+    """
+    Requests `path` one at a time until `stop` is set, appending the latencies.
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    while not stop.is_set():
+        began = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            connection.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            continue
+        latencies.append(time.perf_counter() - began)
+
+    connection.close()
+
+
+def burst(port, burst, concurrency, bad_ratio):
+    """
+    Sends `burst` logins over `concurrency` keep-alive connections, every 1 / `bad_ratio` one with a wrong password.
+    Returns (status codes, latencies, wall time).
+    """
+    counter = itertools.count()
+    statuses, latencies = Counter(), []
+    lock = threading.Lock()
+    every = round(1 / bad_ratio) if bad_ratio else 0
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+
+        while (index := next(counter)) < burst:
+            password = 'WrongPassword1!' if every and index % every == 0 else PASSWORD
+            body = json.dumps({'username': USERNAME, 'password': password})
+            began = time.perf_counter()
+
+            # A login can be sent again: retry once when the recycled worker drops the connection (see bench_asgi)
+            for attempt in range(2):
+                try:
+                    connection.request('POST', LOGIN_PATH, body, {'Content-Type': 'application/json'})
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                    break
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+                    status = 'error'
+
+            elapsed = time.perf_counter() - began
+
+            with lock:
+                statuses[status] += 1
+                latencies.append(elapsed)
+
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return statuses, latencies, time.perf_counter() - began
+
+
+def bench(mode, port, probe_path, burst_size, concurrency, bad_ratio, idle_seconds):
+    server = start_server(mode, port)
+
+    try:
+        idle, stop = [], threading.Event()
+        prober = threading.Thread(target=probe, args=(port, probe_path, stop, idle))
+        prober.start()
+        time.sleep(idle_seconds)
+        stop.set()
+        prober.join()
+
+        loaded, stop = [], threading.Event()
+        prober = threading.Thread(target=probe, args=(port, probe_path, stop, loaded))
+        prober.start()
+        statuses, latencies, wall = burst(port, burst_size, concurrency, bad_ratio)
+        stop.set()
+        prober.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return {
+        'statuses': dict(statuses),
+        'logins_per_second': len(latencies) / wall,
+        'login': percentiles(latencies),
+        'probe_idle': percentiles(idle),
+        'probe_burst': percentiles(loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--burst', type=int, default=200, help='logins sent per mode')
+    parser.add_argument('--concurrency', type=int, default=20, help='concurrent login connections')
+    parser.add_argument('--bad-ratio', type=float, default=0.2, help='share of logins with a wrong password')
+    parser.add_argument('--probe', default=DEFAULT_PROBE, help=f'path requested during the burst (default: {DEFAULT_PROBE})')
+    parser.add_argument('--idle-seconds', type=float, default=3, help='duration of the probe baseline')
+    parser.add_argument('--modes', nargs='+', default=['asgi', 'wsgi'], choices=['wsgi', 'asgi'])
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+    setup_user()
+
+    print(f'burst={args.burst} concurrency={args.concurrency} bad_ratio={args.bad_ratio} probe={args.probe}')
+    for mode in args.modes:
+        result = bench(mode, args.port, args.probe, args.burst, args.concurrency, args.bad_ratio, args.idle_seconds)
+        print(
+            f"{mode:5} logins {result['logins_per_second']:6.1f}/s "
+            f"(p50 {result['login'][0] * 1000:7.1f} ms  p95 {result['login'][1] * 1000:7.1f} ms) | "
+            f"probe idle p50 {result['probe_idle'][0] * 1000:6.1f} ms, "
+            f"during burst p50 {result['probe_burst'][0] * 1000:7.1f} ms  p95 {result['probe_burst'][1] * 1000:7.1f} ms | "
+            f"statuses {dict(sorted(result['statuses'].items(), key=str))}"
+        )
+
+
+if __name__ == '__main__':
+    main()
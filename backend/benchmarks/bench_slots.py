@@ -0,0 +1,67 @@
+"""
+Micro-benchmark of the availability slot filtering: legacy "HH:MM" string path vs minutes bitmask path.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_slots [--slots 48] [--booked 12] [--repeat 20000]
+"""
+import argparse
+import datetime
+import timeit
+
+
+def legacy_filter(slots, booked_times, now_time):
+    """
+    Baseline implementation: parse each slot string to compare it with the current time, then format
+    every booked time back to a string for set membership.
+    """
+    def slot_str_is_future(slot_str):
+        hour, minute = map(int, slot_str.split(':'))
+        return datetime.time(hour=hour, minute=minute) > now_time
+
+    slots = [slot for slot in slots if slot_str_is_future(slot)]
+    booked_slots_str = {time.strftime("%H:%M") for time in booked_times}
+    return [slot for slot in slots if slot not in booked_slots_str]
+
+
+def bitmask_filter(stored_mask, booked_times, now_time):
+    """
+    Current implementation: past and booked slots are removed with bitwise operations, rendered once at the end.
+    """
+    from api.utils.slots import bytes_to_mask, mask_after, times_to_mask, mask_to_slots
+
+    mask = bytes_to_mask(stored_mask) & mask_after(now_time)
+    mask &= ~times_to_mask(booked_times)
+    return mask_to_slots(mask)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slots', type=int, default=48, help='number of 15 minutes slots in the day')
+    parser.add_argument('--booked', type=int, default=12, help='number of booked slots')
+    parser.add_argument('--repeat', type=int, default=20000, help='iterations per implementation')
+    args = parser.parse_args()
+
+    from api.utils.slots import slots_to_mask, mask_to_bytes
+
+    start = datetime.datetime.combine(datetime.date.today(), datetime.time(8, 0))
+    times = [(start + datetime.timedelta(minutes=15 * i)).time() for i in range(args.slots)]
+    slots = [time.strftime('%H:%M') for time in times]
+    booked_times = times[1::max(1, args.slots // max(1, args.booked))][:args.booked]
+    now_time = times[len(times) // 4].replace(second=30)
+
+    stored_json = slots
+    stored_mask = mask_to_bytes(slots_to_mask(slots))
+
+    assert legacy_filter(stored_json, booked_times, now_time) == bitmask_filter(stored_mask, booked_times, now_time)
+
+    legacy = timeit.timeit(lambda: legacy_filter(stored_json, booked_times, now_time), number=args.repeat)
+    bitmask = timeit.timeit(lambda: bitmask_filter(stored_mask, booked_times, now_time), number=args.repeat)
+
+    print(f'slots={args.slots} booked={args.booked} repeat={args.repeat}')
+    print(f'legacy string path : {legacy / args.repeat * 1e6:8.2f} us/op')
+    print(f'bitmask path       : {bitmask / args.repeat * 1e6:8.2f} us/op ({legacy / bitmask:.1f}x)')
+    print(f'stored size        : json {len(str(stored_json))} bytes, bitmask {len(stored_mask)} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,23 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
+import asyncio
 import os
 
 from django.core.asgi import get_asgi_application
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Requests handled at once by the event loop, the others wait for a free place: each request in flight holds its
+# querysets and response in memory, so this caps the worker's memory within the container limit
+MAX_CONCURRENCY = int(os.environ.get('ASGI_MAX_CONCURRENCY', 8))
+
+concurrency = asyncio.Semaphore(MAX_CONCURRENCY)
+
+
+async def application(scope, receive, send):
+    if scope['type'] != 'http':
+        return await django_application(scope, receive, send)
+
+    async with concurrency:
+        return await django_application(scope, receive, send)
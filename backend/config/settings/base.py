@@ -29,10 +29,10 @@ INSTALLED_APPS = [
 # idk what this means
 SITE_ID = 1
 
-# Custom authentication backend for logging with either email/pass or usrname/pass
+# Custom authentication backend for logging with either email/pass or usrname/pass, the only one: a fallback
+# ModelBackend would hash the password of every failed login a second time (it inherits the permission checks anyway)
 AUTHENTICATION_BACKENDS = [
-    'api.backends.auth.UsernameOrEmailBackend', 
-    'django.contrib.auth.backends.ModelBackend',
+    'api.backends.auth.UsernameOrEmailBackend',
 ]
 
 # Custom user model to be used
@@ -41,7 +41,7 @@ AUTH_USER_MODEL = 'api.User'
 # Setting up default authentication to JWT token
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.backends.tokens.RoleJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -58,6 +58,8 @@ SIMPLE_JWT = {
 
 # Setting up django's hooks
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',  # First, so it times the whole request
+    'api.middleware.IdentityMapMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -90,6 +92,13 @@ TEMPLATES = [
 # Development server location
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Database connections of each process: a psycopg pool of up to DB_POOL_MAX_SIZE connections, or with 0 a single
+# connection kept open DB_CONN_MAX_AGE seconds. Either way, connections are checked before being reused.
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '4'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # Seconds a request waits for a free connection
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+
 # Database settings
 DATABASES = {
     'default': {
@@ -99,6 +108,11 @@ DATABASES = {
         'NAME': os.environ['POSTGRES_DB'],
         'USER': os.environ['POSTGRES_USER'],
         'PASSWORD': os.environ['POSTGRES_PASSWORD'],
+        'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {'min_size': DB_POOL_MIN_SIZE, 'max_size': DB_POOL_MAX_SIZE, 'timeout': DB_POOL_TIMEOUT},
+        } if DB_POOL_MAX_SIZE else {},
     }
 }
 
@@ -127,12 +141,13 @@ MEDIA_ROOT = '/app/media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django's email service settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')  # e.g. console or filebased backend for local runs
 EMAIL_USE_TLS = True
 EMAIL_PORT = os.environ['EMAIL_PORT']
 EMAIL_HOST = os.environ['EMAIL_HOST']
 EMAIL_HOST_USER = os.environ['EMAIL_HOST_USER'] 
 EMAIL_HOST_PASSWORD = os.environ['EMAIL_HOST_PASSWORD'] 
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '10'))  # Seconds, so a slow SMTP server can't hang a worker
 
 # Celery tasks settings
 CELERY_BROKER_URL = 'redis://redis:6379/0'
@@ -143,17 +158,67 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = "Europe/Rome"
+
+# Appointment reminders and completions are scheduled in a Redis sorted set at booking time and popped when due,
+# the table sweeps only catch up on what the schedule missed (empty URL disables it, sweeps then run every minute)
+APPOINTMENT_SCHEDULE_URL = os.getenv('APPOINTMENT_SCHEDULE_URL', CELERY_BROKER_URL)
+APPOINTMENT_DISPATCH_INTERVAL = 60  # Seconds between beat dispatches, events due sooner are dispatched on time by a countdown
+APPOINTMENT_SWEEP_MINUTES = int(os.getenv('APPOINTMENT_SWEEP_MINUTES', '15' if APPOINTMENT_SCHEDULE_URL else '1'))
+
 CELERY_BEAT_SCHEDULE = {
+    'dispatch-appointment-events': {
+        'task': 'api.tasks.dispatch_appointment_events',
+        'schedule': APPOINTMENT_DISPATCH_INTERVAL,
+    },
     'complete-ongoing-appointments': {
         'task': 'api.tasks.complete_ongoing_appointments',
-        'schedule': crontab(minute='*/1'),
+        'schedule': crontab(minute=f'*/{APPOINTMENT_SWEEP_MINUTES}'),
     },
     'send-appointment-reminders': {
         'task': 'api.tasks.send_appointment_reminders',
+        'schedule': crontab(minute=f'*/{APPOINTMENT_SWEEP_MINUTES}'),
+    },
+    'drain-email-outbox': {
+        'task': 'api.tasks.drain_email_outbox',
         'schedule': crontab(minute='*/1'),
     },
+    'refresh-platform-statistics': {
+        'task': 'api.tasks.refresh_platform_statistics',
+        'schedule': crontab(minute='*/5'),
+    },
+    'prune-expired-tokens': {
+        'task': 'api.tasks.prune_expired_tokens',
+        'schedule': crontab(minute=30),
+    },
 }
 
+# Cache shared by the workers, stored in the Redis already running for Celery (locmem backend can be used for tests)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://redis:6379/1'),
+    }
+}
+
+# Seconds the anonymous public responses are cached for, 0 disables the cache (invalidated by model signals anyway)
+PUBLIC_CACHE_TIMEOUT = int(os.getenv('PUBLIC_CACHE_TIMEOUT', '60'))
+
+# Seconds each process reuses the user an access token was authenticated as, 0 disables it (invalidated on save/delete)
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', '30'))
+
+# Per-request query count/timings in the Server-Timing header and the admin-only `/api/metrics/` Prometheus endpoint
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', '1') == '1'
+
+# Admin dashboard reads the statistics snapshot row (refreshed by celery beat) instead of live aggregates
+PLATFORM_STATISTICS_SNAPSHOT = os.getenv('PLATFORM_STATISTICS_SNAPSHOT', '0') == '1'
+
+# File the OpenAPI schema is generated into on the first `/api/schema/` request and served from afterwards,
+# empty keeps it in the memory of each process (it is regenerated when the file is deleted)
+OPENAPI_SCHEMA_FILE = os.getenv('OPENAPI_SCHEMA_FILE', '')
+
+# Seconds browsers and proxies may reuse the schema without revalidating its ETag
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv('OPENAPI_SCHEMA_MAX_AGE', '86400'))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Barber Manager API",
     "DESCRIPTION": "Manage barbershop scheduling, reviews, and users.",
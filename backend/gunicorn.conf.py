@@ -0,0 +1,30 @@
+"""
+Gunicorn settings of the production image (`gunicorn -c gunicorn.conf.py`).
+
+SERVER_MODE selects how the single worker serves the API:
+- wsgi (default): `config.wsgi` on the sync worker, one request at a time.
+- asgi: `config.asgi` on a uvicorn worker, the async views run concurrently on its event loop, up to
+  ASGI_MAX_CONCURRENCY requests at once, so one slow request no longer blocks the others. Only faster than wsgi
+  when the database latency dominates (see `benchmarks/bench_asgi.py`).
+"""
+import os
+
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+elif SERVER_MODE == 'wsgi':
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'sync'
+    threads = 1
+else:
+    raise RuntimeError(f'Unknown SERVER_MODE "{SERVER_MODE}", expected "asgi" or "wsgi".')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = 1
+
+# Recycles the worker to cap memory growth within the container limit
+max_requests = 100
+max_requests_jitter = 10